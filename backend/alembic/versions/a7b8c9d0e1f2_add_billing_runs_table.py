@@ -0,0 +1,46 @@
+"""add billing_runs table
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'billing_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('period_from', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('period_to', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='PENDING'),
+        sa.Column('total_jobs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed_jobs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('statements_created', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_amount', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+    )
+    op.create_index('ix_billing_runs_id', 'billing_runs', ['id'])
+    op.create_index('ix_billing_runs_org_created', 'billing_runs', ['org_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_billing_runs_org_created', table_name='billing_runs')
+    op.drop_index('ix_billing_runs_id', table_name='billing_runs')
+    op.drop_table('billing_runs')
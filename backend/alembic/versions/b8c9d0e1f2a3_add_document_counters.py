@@ -0,0 +1,71 @@
+"""add document_counters and per-org statement numbers
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_counters',
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('doc_type', sa.String(length=20), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('org_id', 'doc_type'),
+        sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    )
+
+    # Statement numbers become unique per org instead of globally
+    op.drop_constraint('statements_number_key', 'statements', type_='unique')
+    op.create_unique_constraint('uq_statements_org_number', 'statements', ['org_id', 'number'])
+
+    # Continue after the highest existing ST-<n> of each org
+    op.execute("""
+        INSERT INTO document_counters (org_id, doc_type, next_value)
+        SELECT org_id, 'ST', COALESCE(MAX(NULLIF(substring(number from '([0-9]+)$'), '')::bigint), 0) + 1
+        FROM statements
+        GROUP BY org_id
+    """)
+
+    # Number the delivery notes that have no number yet in creation order,
+    # after the highest existing DN-<n> of their org, then seed the counter
+    op.execute("""
+        WITH existing AS (
+            SELECT org_id, COALESCE(MAX(NULLIF(substring(note_number from '([0-9]+)$'), '')::bigint), 0) AS max_n
+            FROM delivery_notes
+            GROUP BY org_id
+        ), numbered AS (
+            SELECT id, org_id, ROW_NUMBER() OVER (PARTITION BY org_id ORDER BY id) AS n
+            FROM delivery_notes
+            WHERE note_number IS NULL
+        )
+        UPDATE delivery_notes dn
+        SET note_number = 'DN-' || lpad((existing.max_n + numbered.n)::text, 6, '0')
+        FROM numbered
+        JOIN existing ON existing.org_id = numbered.org_id
+        WHERE dn.id = numbered.id
+    """)
+    op.execute("""
+        INSERT INTO document_counters (org_id, doc_type, next_value)
+        SELECT org_id, 'DN', COALESCE(MAX(NULLIF(substring(note_number from '([0-9]+)$'), '')::bigint), 0) + 1
+        FROM delivery_notes
+        GROUP BY org_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_statements_org_number', 'statements', type_='unique')
+    op.create_unique_constraint('statements_number_key', 'statements', ['number'])
+    op.drop_table('document_counters')
@@ -0,0 +1,31 @@
+"""add jobs keyset pagination index
+
+Revision ID: c3d4e5f6a7b8
+Revises: 9a0b1c2d3e4f, a1b2c3d4e5f6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = ('9a0b1c2d3e4f', 'a1b2c3d4e5f6')
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backs GET /jobs/page: WHERE org_id = ? AND (scheduled_date, id) > (?, ?)
+    # ORDER BY scheduled_date, id
+    op.create_index(
+        'ix_jobs_org_scheduled_id',
+        'jobs',
+        ['org_id', 'scheduled_date', 'id'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_org_scheduled_id', table_name='jobs', if_exists=True)
@@ -0,0 +1,25 @@
+"""add statement summary indexes
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_statements_org_created_id', 'statements', ['org_id', 'created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_payment_allocations_statement_id', 'payment_allocations', ['statement_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_allocations_statement_id', table_name='payment_allocations', if_exists=True)
+    op.drop_index('ix_statements_org_created_id', table_name='statements', if_exists=True)
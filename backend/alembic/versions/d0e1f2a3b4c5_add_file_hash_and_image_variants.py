@@ -0,0 +1,32 @@
+"""add file content hash and image variant columns
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('files', sa.Column('thumbnail_key', sa.String(length=500), nullable=True))
+    op.add_column('files', sa.Column('web_key', sa.String(length=500), nullable=True))
+    op.add_column('files', sa.Column('variants_status', sa.String(length=20), nullable=True))
+    op.create_index('ix_files_org_content_hash', 'files', ['org_id', 'content_hash'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_org_content_hash', table_name='files', if_exists=True)
+    op.drop_column('files', 'variants_status')
+    op.drop_column('files', 'web_key')
+    op.drop_column('files', 'thumbnail_key')
+    op.drop_column('files', 'content_hash')
@@ -0,0 +1,68 @@
+"""add composite and partial indexes for multi-tenant query shapes
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Jobs: org first, then the board filter, then the day
+    op.create_index('ix_jobs_org_status_scheduled', 'jobs', ['org_id', 'status', 'scheduled_date'], if_not_exists=True)
+    op.create_index('ix_jobs_org_driver_scheduled', 'jobs', ['org_id', 'driver_id', 'scheduled_date'], if_not_exists=True)
+    op.create_index('ix_jobs_org_customer_scheduled', 'jobs', ['org_id', 'customer_id', 'scheduled_date'], if_not_exists=True)
+    op.create_index(
+        'ix_jobs_delivered_customer_scheduled',
+        'jobs',
+        ['org_id', 'customer_id', 'scheduled_date'],
+        postgresql_where=sa.text("status = 'DELIVERED'"),
+        if_not_exists=True,
+    )
+
+    op.create_index('ix_job_status_events_job_time', 'job_status_events', ['job_id', 'event_time'], if_not_exists=True)
+
+    op.create_index('ix_statement_lines_statement_id', 'statement_lines', ['statement_id'], if_not_exists=True)
+    op.create_index('ix_statement_lines_job_id', 'statement_lines', ['job_id'], if_not_exists=True)
+
+    # Alerts (idx_alerts_org_user / idx_alerts_expiry exist on databases
+    # created through add_alerts_002 but not on ones built from the models)
+    op.create_index('idx_alerts_org_user', 'alerts', ['org_id', 'created_for_user_id', 'status'], if_not_exists=True)
+    op.create_index('ix_alerts_org_role_status', 'alerts', ['org_id', 'created_for_role', 'status'], if_not_exists=True)
+    op.create_index('ix_alerts_org_created', 'alerts', ['org_id', 'created_at'], if_not_exists=True)
+    op.create_index(
+        'ix_alerts_open_entity',
+        'alerts',
+        ['org_id', 'alert_type', 'entity_type', 'entity_id'],
+        postgresql_where=sa.text("status IN ('UNREAD', 'READ')"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'idx_alerts_expiry',
+        'alerts',
+        ['expires_at'],
+        postgresql_where=sa.text('expires_at IS NOT NULL'),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_open_entity', table_name='alerts', if_exists=True)
+    op.drop_index('ix_alerts_org_created', table_name='alerts', if_exists=True)
+    op.drop_index('ix_alerts_org_role_status', table_name='alerts', if_exists=True)
+    op.drop_index('ix_statement_lines_job_id', table_name='statement_lines', if_exists=True)
+    op.drop_index('ix_statement_lines_statement_id', table_name='statement_lines', if_exists=True)
+    op.drop_index('ix_job_status_events_job_time', table_name='job_status_events', if_exists=True)
+    op.drop_index('ix_jobs_delivered_customer_scheduled', table_name='jobs', if_exists=True)
+    op.drop_index('ix_jobs_org_customer_scheduled', table_name='jobs', if_exists=True)
+    op.drop_index('ix_jobs_org_driver_scheduled', table_name='jobs', if_exists=True)
+    op.drop_index('ix_jobs_org_status_scheduled', table_name='jobs', if_exists=True)
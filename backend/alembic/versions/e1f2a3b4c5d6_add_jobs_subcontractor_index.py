@@ -0,0 +1,30 @@
+"""add partial index for subcontractor job aggregation
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_jobs_subcontractor_scheduled',
+        'jobs',
+        ['org_id', 'subcontractor_id', 'scheduled_date'],
+        postgresql_where=sa.text("is_subcontractor"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_subcontractor_scheduled', table_name='jobs', if_exists=True)
@@ -0,0 +1,50 @@
+"""add partial unique index on open sweep alerts per entity
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+OPEN_SWEEP_ALERTS = "status IN ('UNREAD', 'READ') AND category = 'OPERATIONAL'"
+
+
+def upgrade() -> None:
+    # Resolve duplicate open alerts left by the old per-row sweep, keeping the newest
+    op.execute(f"""
+        UPDATE alerts SET status = 'RESOLVED', resolved_at = now()
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY org_id, alert_type, entity_type, entity_id
+                    ORDER BY created_at DESC, id DESC
+                ) AS rn
+                FROM alerts
+                WHERE {OPEN_SWEEP_ALERTS}
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """)
+
+    op.create_index(
+        'ux_alerts_open_entity',
+        'alerts',
+        ['org_id', 'alert_type', 'entity_type', 'entity_id'],
+        unique=True,
+        postgresql_where=sa.text(OPEN_SWEEP_ALERTS),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_alerts_open_entity', table_name='alerts', if_exists=True)
@@ -0,0 +1,47 @@
+"""make files (org_id, content_hash) unique so concurrent identical uploads dedupe
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Duplicates created by racing uploads keep their rows and links but drop
+    # out of dedup; the oldest copy stays the one new uploads are linked to
+    op.execute("""
+        UPDATE files SET content_hash = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (PARTITION BY org_id, content_hash ORDER BY id) AS rn
+                FROM files
+                WHERE content_hash IS NOT NULL
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """)
+
+    op.drop_index('ix_files_org_content_hash', table_name='files', if_exists=True)
+    op.create_index(
+        'ux_files_org_content_hash',
+        'files',
+        ['org_id', 'content_hash'],
+        unique=True,
+        postgresql_where=sa.text("content_hash IS NOT NULL"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_files_org_content_hash', table_name='files', if_exists=True)
+    op.create_index('ix_files_org_content_hash', 'files', ['org_id', 'content_hash'], if_not_exists=True)
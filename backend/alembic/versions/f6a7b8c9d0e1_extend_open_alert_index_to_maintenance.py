@@ -0,0 +1,58 @@
+"""extend ux_alerts_open_entity to maintenance (expiry) alerts
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+OPEN_SWEEP_ALERTS = "status IN ('UNREAD', 'READ') AND category IN ('OPERATIONAL', 'MAINTENANCE')"
+
+
+def upgrade() -> None:
+    # The old expiry checks could leave several open alerts per document
+    # (one per license threshold, or repeats); keep only the newest
+    op.execute(f"""
+        UPDATE alerts SET status = 'RESOLVED', resolved_at = now()
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY org_id, alert_type, entity_type, entity_id
+                    ORDER BY created_at DESC, id DESC
+                ) AS rn
+                FROM alerts
+                WHERE {OPEN_SWEEP_ALERTS}
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """)
+
+    op.drop_index('ux_alerts_open_entity', table_name='alerts', if_exists=True)
+    op.create_index(
+        'ux_alerts_open_entity',
+        'alerts',
+        ['org_id', 'alert_type', 'entity_type', 'entity_id'],
+        unique=True,
+        postgresql_where=sa.text(OPEN_SWEEP_ALERTS),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_alerts_open_entity', table_name='alerts', if_exists=True)
+    op.create_index(
+        'ux_alerts_open_entity',
+        'alerts',
+        ['org_id', 'alert_type', 'entity_type', 'entity_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('UNREAD', 'READ') AND category = 'OPERATIONAL'"),
+    )
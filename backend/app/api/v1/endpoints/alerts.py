@@ -2,11 +2,18 @@
 Alerts API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
+import asyncio
+import json
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_db, SessionLocal
 from app.middleware.tenant import get_current_org_id, get_current_user_id, get_org_role
+from app.services.alert_hub import alert_hub
 from app.services.alert_service import AlertService
 from app.schemas.alert import (
     AlertResponse, 
@@ -20,14 +27,15 @@ router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
 
 @router.get("", response_model=AlertListResponse)
-def list_alerts(
+async def list_alerts(
     request: Request,
     status: Optional[str] = Query(None, description="Filter by status: UNREAD, READ, DISMISSED, RESOLVED"),
     category: Optional[str] = Query(None, description="Filter by category: OPERATIONAL, MAINTENANCE, FINANCIAL, SYSTEM, REALTIME"),
     severity: Optional[str] = Query(None, description="Filter by severity: CRITICAL, HIGH, MEDIUM, LOW, INFO, SUCCESS"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    adb: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """
     List alerts for current organization/user
@@ -65,26 +73,31 @@ def list_alerts(
         except ValueError:
             raise HTTPException(400, f"Invalid severity: {severity}")
     
-    # Get alerts
-    alerts, total = AlertService.get_alerts(
-        db=db,
+    filters = dict(
         org_id=org_id,
         user_id=user_id,
         user_role=user_role,
-        status=status_enum,
-        category=category_enum,
-        severity=severity_enum,
-        skip=skip,
-        limit=limit
-    )
-    
-    # Get unread count
-    unread = AlertService.get_unread_count(
-        db=db,
-        org_id=org_id,
-        user_id=user_id,
-        user_role=user_role
     )
+    if adb is not None:
+        alerts, total = await AlertService.get_alerts_async(
+            adb, **filters, status=status_enum, category=category_enum, severity=severity_enum, skip=skip, limit=limit
+        )
+        unread = await AlertService.get_unread_count_async(adb, **filters)
+    else:
+        # Get alerts
+        alerts, total = await run_in_threadpool(
+            AlertService.get_alerts,
+            db=db,
+            **filters,
+            status=status_enum,
+            category=category_enum,
+            severity=severity_enum,
+            skip=skip,
+            limit=limit
+        )
+        
+        # Get unread count
+        unread = await run_in_threadpool(AlertService.get_unread_count, db=db, **filters)
     
     # Convert to response
     items = []
@@ -103,9 +116,10 @@ def list_alerts(
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
-def get_unread_count(
+async def get_unread_count(
     request: Request,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    adb: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """
     Get count of unread alerts
@@ -116,12 +130,21 @@ def get_unread_count(
     user_id = get_current_user_id(request)
     user_role = get_org_role(request)
     
-    count = AlertService.get_unread_count(
-        db=db,
-        org_id=org_id,
-        user_id=user_id,
-        user_role=user_role
-    )
+    if adb is not None:
+        count = await AlertService.get_unread_count_async(
+            adb,
+            org_id=org_id,
+            user_id=user_id,
+            user_role=user_role
+        )
+    else:
+        count = await run_in_threadpool(
+            AlertService.get_unread_count,
+            db=db,
+            org_id=org_id,
+            user_id=user_id,
+            user_role=user_role
+        )
     
     return UnreadCountResponse(count=count)
 
@@ -154,6 +177,67 @@ def get_alert_stats(
     return AlertStatsResponse(**stats)
 
 
+def _stream_unread_count(org_id, user_id, user_role) -> int:
+    """Unread count for the stream, on a short-lived session (no pooled connection held per client)"""
+    db = SessionLocal()
+    try:
+        return AlertService.get_unread_count(db=db, org_id=org_id, user_id=user_id, user_role=user_role)
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/stream")
+async def stream_alerts(request: Request):
+    """
+    Server-Sent Events stream of alert changes (replaces badge polling)
+    
+    Events:
+    - unread_count: {"count": N} - sent on connect and whenever the count changes
+    - alert.created / alert.updated: the alert (AlertResponse)
+    
+    EventSource can't send headers, so pass the JWT as ?token=...
+    """
+    org_id = get_current_org_id(request)
+    user_id = get_current_user_id(request)
+    user_role = get_org_role(request)
+    
+    sub = alert_hub.subscribe(org_id, user_id, user_role)
+    
+    async def event_stream():
+        try:
+            last_count = await run_in_threadpool(_stream_unread_count, org_id, user_id, user_role)
+            yield _sse("unread_count", {"count": last_count})
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=settings.ALERT_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                
+                if event.get("alert"):
+                    yield _sse(event["event"], event["alert"])
+                
+                count = await run_in_threadpool(_stream_unread_count, org_id, user_id, user_role)
+                if count != last_count:
+                    last_count = count
+                    yield _sse("unread_count", {"count": count})
+        finally:
+            alert_hub.unsubscribe(sub)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{alert_id}", response_model=AlertResponse)
 def get_alert(
     alert_id: int,
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models import User, File as FileModel, JobFile, Job
-from app.services.storage import get_storage_service
+from app.services.image_variants import PENDING, has_variants, image_variant_service
+from app.services.storage import StorageWriter, async_storage, get_storage_service
 from pydantic import BaseModel
 
 router = APIRouter()
 security = HTTPBearer()
 
+VALID_FILE_TYPES = ["PHOTO", "WEIGH_TICKET", "DELIVERY_NOTE", "OTHER"]
+
+# Bytes read from the request per storage write
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class FileResponse(BaseModel):
     id: int
@@ -22,6 +30,8 @@ class FileResponse(BaseModel):
     uploaded_at: datetime
     uploaded_by_name: str
     url: str
+    thumbnail_url: Optional[str] = None
+    web_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -59,77 +69,238 @@ def get_current_user_from_token(
     return user
 
 
-@router.post("/jobs/{job_id}/files/upload", response_model=FileResponse)
-async def upload_job_file(
-    job_id: int,
-    file: UploadFile = File(...),
-    file_type: str = Form("PHOTO"),
-    current_user: User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db)
-):
-    """Upload a file (photo, PDF, etc.) for a job"""
+class FileTooLarge(Exception):
+    pass
+
+
+def _get_job_or_404(db: Session, job_id: int, org_id: int) -> Job:
     job = db.query(Job).filter(
         Job.id == job_id,
-        Job.org_id == current_user.org_id
+        Job.org_id == org_id
     ).first()
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Validate file type
-    valid_types = ["PHOTO", "WEIGH_TICKET", "DELIVERY_NOTE", "OTHER"]
+    return job
+
+
+def _validate_file_type(file_type: str) -> str:
     file_type_upper = file_type.upper()
-    if file_type_upper not in valid_types:
+    if file_type_upper not in VALID_FILE_TYPES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Must be one of: {', '.join(valid_types)}"
+            detail=f"Invalid file type. Must be one of: {', '.join(VALID_FILE_TYPES)}"
         )
+    return file_type_upper
+
+
+async def _upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _stream_to_storage(chunks: AsyncIterator[bytes], writer: StorageWriter, max_bytes: int) -> None:
+    """
+    Copy chunks into the writer, one storage-pool hop per UPLOAD_CHUNK_SIZE.
+    
+    The upload is aborted on any error, including the size limit.
+    """
+    buffer = bytearray()
+    received = 0
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > max_bytes:
+                raise FileTooLarge()
+            buffer += chunk
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await async_storage.run(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await async_storage.run(writer.write, bytes(buffer))
+        await async_storage.run(writer.commit)
+    except BaseException:
+        await async_storage.run(writer.abort)
+        raise
+
+
+def _file_response(file_record: FileModel, file_type: str, uploaded_by_name: str) -> FileResponse:
+    storage = get_storage_service()
+    return FileResponse(
+        id=file_record.id,
+        filename=file_record.filename,
+        file_type=file_type,
+        size=file_record.size,
+        uploaded_at=file_record.uploaded_at,
+        uploaded_by_name=uploaded_by_name,
+        url=storage.get_presigned_url(file_record.storage_key, expiration=3600),
+        thumbnail_url=storage.get_presigned_url(file_record.thumbnail_key, expiration=3600) if file_record.thumbnail_key else None,
+        web_url=storage.get_presigned_url(file_record.web_key, expiration=3600) if file_record.web_key else None
+    )
+
+
+def _file_by_hash(db: Session, org_id: int, content_hash: str) -> Optional[FileModel]:
+    return db.query(FileModel).filter(
+        FileModel.org_id == org_id,
+        FileModel.content_hash == content_hash
+    ).first()
+
+
+async def _store_upload(
+    db: Session,
+    job_id: int,
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    content_type: Optional[str],
+    file_type: str,
+    current_user: User
+) -> FileResponse:
+    """
+    Stream an upload to storage and link it to the job.
     
+    Files are deduplicated per organization by SHA-256: re-uploading the same
+    photo (e.g. a retried upload from a driver's phone) drops the new copy
+    and links the existing file instead. A file shared by several jobs is
+    only deleted with its last link (see _unlink_file).
+    """
     storage = get_storage_service()
+    writer = storage.open_writer(filename=filename, folder=f"jobs/{job_id}", content_type=content_type)
+    max_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
     
     try:
-        storage_key = storage.upload_file(
-            file=file.file,
-            filename=file.filename,
-            folder=f"jobs/{job_id}",
-            content_type=file.content_type
-        )
-        
-        file_record = FileModel(
-            org_id=current_user.org_id,
-            storage_key=storage_key,
-            filename=file.filename,
-            mime_type=file.content_type,
-            size=file.size or 0,
-            uploaded_by=current_user.id
+        await _stream_to_storage(chunks, writer, max_bytes)
+    except FileTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {settings.MAX_FILE_SIZE_MB} MB"
         )
-        db.add(file_record)
-        db.flush()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    try:
+        file_record = _file_by_hash(db, current_user.org_id, writer.sha256)
+        created = file_record is None
+        if created:
+            file_record = FileModel(
+                org_id=current_user.org_id,
+                storage_key=writer.storage_key,
+                filename=filename,
+                mime_type=content_type,
+                size=writer.size,
+                content_hash=writer.sha256,
+                variants_status=PENDING if has_variants(content_type) else None,
+                uploaded_by=current_user.id
+            )
+            try:
+                with db.begin_nested():
+                    db.add(file_record)
+                    db.flush()
+            except IntegrityError:
+                # An identical upload (e.g. the retry of this one) committed first
+                file_record = _file_by_hash(db, current_user.org_id, writer.sha256)
+                created = False
+        if not created:
+            await async_storage.delete_files([writer.storage_key])
         
-        job_file = JobFile(
-            job_id=job_id,
-            file_id=file_record.id,
-            file_type=file_type_upper
-        )
-        db.add(job_file)
+        linked = db.query(JobFile).filter(
+            JobFile.job_id == job_id,
+            JobFile.file_id == file_record.id
+        ).first()
+        if not linked:
+            db.add(JobFile(
+                job_id=job_id,
+                file_id=file_record.id,
+                file_type=file_type
+            ))
         db.commit()
         db.refresh(file_record)
-        
-        url = storage.get_presigned_url(storage_key, expiration=3600)
-        
-        return FileResponse(
-            id=file_record.id,
-            filename=file_record.filename,
-            file_type=file_type,
-            size=file_record.size,
-            uploaded_at=file_record.uploaded_at,
-            uploaded_by_name=current_user.name,
-            url=url
-        )
-        
     except Exception as e:
         db.rollback()
+        # The object was already published by writer.commit()
+        await async_storage.delete_files([writer.storage_key])
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    if created and file_record.variants_status == PENDING:
+        image_variant_service.submit(file_record.id)
+    
+    uploaded_by_name = current_user.name
+    if file_record.uploaded_by != current_user.id:
+        uploaded_by_name = db.query(User.name).filter(User.id == file_record.uploaded_by).scalar() or "Unknown"
+    return _file_response(file_record, file_type, uploaded_by_name)
+
+
+@router.post("/jobs/{job_id}/files/upload", response_model=FileResponse)
+async def upload_job_file(
+    job_id: int,
+    file: UploadFile = File(...),
+    file_type: str = Form("PHOTO"),
+    current_user: User = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    """Upload a file (photo, PDF, etc.) for a job"""
+    _get_job_or_404(db, job_id, current_user.org_id)
+    file_type_upper = _validate_file_type(file_type)
+    
+    return await _store_upload(
+        db, job_id, _upload_chunks(file), file.filename, file.content_type, file_type_upper, current_user
+    )
+
+
+@router.put("/jobs/{job_id}/files/stream", response_model=FileResponse)
+async def stream_job_file(
+    job_id: int,
+    request: Request,
+    filename: str = Query(...),
+    file_type: str = Query("PHOTO"),
+    current_user: User = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a file as the raw request body.
+    
+    Unlike the multipart endpoint the body is never spooled to a temporary
+    file: chunks go straight to storage as they arrive.
+    """
+    _get_job_or_404(db, job_id, current_user.org_id)
+    file_type_upper = _validate_file_type(file_type)
+    
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {settings.MAX_FILE_SIZE_MB} MB"
+        )
+    
+    content_type = request.headers.get("content-type") or None
+    return await _store_upload(
+        db, job_id, request.stream(), filename, content_type, file_type_upper, current_user
+    )
+
+
+def _files_by_job(db: Session, job_ids: List[int], org_id: int) -> Dict[int, List[FileResponse]]:
+    """
+    Files of each of the org's jobs in job_ids, in upload order.
+    
+    One query: jobs outer-joined to their file links, files and uploaders, so
+    jobs without files (and only the org's jobs) are present as keys.
+    """
+    rows = db.query(Job.id, JobFile.file_type, FileModel, User.name)\
+        .outerjoin(JobFile, JobFile.job_id == Job.id)\
+        .outerjoin(FileModel, FileModel.id == JobFile.file_id)\
+        .outerjoin(User, User.id == FileModel.uploaded_by)\
+        .filter(Job.id.in_(job_ids), Job.org_id == org_id)\
+        .order_by(Job.id, JobFile.id)\
+        .all()
+    
+    files_by_job: Dict[int, List[FileResponse]] = {}
+    for job_id, file_type, file_record, uploader_name in rows:
+        files = files_by_job.setdefault(job_id, [])
+        if file_record is not None:
+            files.append(_file_response(file_record, file_type or "OTHER", uploader_name or "Unknown"))
+    return files_by_job
 
 
 @router.get("/jobs/{job_id}/files", response_model=JobFilesResponse)
@@ -139,35 +310,11 @@ async def get_job_files(
     db: Session = Depends(get_db)
 ):
     """Get all files for a job"""
-    job = db.query(Job).filter(
-        Job.id == job_id,
-        Job.org_id == current_user.org_id
-    ).first()
-    
-    if not job:
+    files_by_job = _files_by_job(db, [job_id], current_user.org_id)
+    if job_id not in files_by_job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job_files = db.query(JobFile).filter(JobFile.job_id == job_id).all()
-    
-    storage = get_storage_service()
-    files_response = []
-    
-    for jf in job_files:
-        file_record = db.query(FileModel).filter(FileModel.id == jf.file_id).first()
-        if file_record:
-            uploader = db.query(User).filter(User.id == file_record.uploaded_by).first()
-            url = storage.get_presigned_url(file_record.storage_key, expiration=3600)
-            
-            files_response.append(FileResponse(
-                id=file_record.id,
-                filename=file_record.filename,
-                file_type=jf.file_type or "OTHER",
-                size=file_record.size,
-                uploaded_at=file_record.uploaded_at,
-                uploaded_by_name=uploader.name if uploader else "Unknown",
-                url=url
-            ))
-    
+    files_response = files_by_job[job_id]
     return JobFilesResponse(
         job_id=job_id,
         files=files_response,
@@ -175,16 +322,96 @@ async def get_job_files(
     )
 
 
+@router.get("/files/jobs", response_model=List[JobFilesResponse])
+async def get_files_for_jobs(
+    job_ids: List[int] = Query(..., description="Repeat per job: ?job_ids=1&job_ids=2"),
+    current_user: User = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    """Get the files of many jobs at once (dispatch board); unknown job ids are skipped"""
+    if len(job_ids) > settings.MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_PAGE_SIZE} jobs per request"
+        )
+    
+    files_by_job = _files_by_job(db, list(dict.fromkeys(job_ids)), current_user.org_id)
+    return [
+        JobFilesResponse(job_id=job_id, files=files_by_job[job_id], total=len(files_by_job[job_id]))
+        for job_id in dict.fromkeys(job_ids)
+        if job_id in files_by_job
+    ]
+
+
+def _require_admin(user: User) -> None:
+    roles = [role.role.value for role in user.roles]
+    if "ADMIN" not in roles:
+        raise HTTPException(status_code=403, detail="Admin only")
+
+
+async def _unlink_file(db: Session, file_record: FileModel, job_id: Optional[int]) -> bool:
+    """
+    Remove the file from one job (or from every job when job_id is None).
+    
+    The file row and its storage objects are deleted only once no job links
+    to it any more. Returns whether the file itself was deleted.
+    """
+    links = db.query(JobFile).filter(JobFile.file_id == file_record.id)
+    if job_id is not None:
+        links = links.filter(JobFile.job_id == job_id)
+    links.delete(synchronize_session=False)
+    
+    deleted = db.query(JobFile.id).filter(JobFile.file_id == file_record.id).first() is None
+    storage_keys = []
+    if deleted:
+        storage_keys = [key for key in (file_record.storage_key, file_record.thumbnail_key, file_record.web_key) if key]
+        db.delete(file_record)
+    db.commit()
+    
+    # After the commit: a storage failure leaves an orphaned object, not a dangling row
+    if storage_keys:
+        await async_storage.delete_files(storage_keys)
+    return deleted
+
+
+@router.delete("/jobs/{job_id}/files/{file_id}")
+async def delete_job_file(
+    job_id: int,
+    file_id: int,
+    current_user: User = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    """Remove a file from a job (admin only); other jobs sharing it keep it"""
+    _require_admin(current_user)
+    _get_job_or_404(db, job_id, current_user.org_id)
+    
+    file_record = db.query(FileModel).join(JobFile, JobFile.file_id == FileModel.id).filter(
+        FileModel.id == file_id,
+        FileModel.org_id == current_user.org_id,
+        JobFile.job_id == job_id
+    ).first()
+    
+    if not file_record:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    deleted = await _unlink_file(db, file_record, job_id)
+    return {"message": "File deleted" if deleted else "File removed from job", "file_id": file_id}
+
+
 @router.delete("/files/{file_id}")
 async def delete_file(
     file_id: int,
+    job_id: Optional[int] = Query(None, description="Remove the file from this job only"),
     current_user: User = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    """Delete a file (admin only)"""
-    roles = [role.role.value for role in current_user.roles]
-    if "ADMIN" not in roles:
-        raise HTTPException(status_code=403, detail="Admin only")
+    """
+    Delete a file (admin only)
+    
+    A file attached to several jobs (deduplicated upload) needs job_id, so
+    removing it from one job never deletes it from the others.
+    """
+    _require_admin(current_user)
     
     file_record = db.query(FileModel).filter(
         FileModel.id == file_id,
@@ -194,11 +421,15 @@ async def delete_file(
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
     
-    storage = get_storage_service()
-    storage.delete_file(file_record.storage_key)
-    
-    db.query(JobFile).filter(JobFile.file_id == file_id).delete()
-    db.delete(file_record)
-    db.commit()
+    if job_id is None:
+        linked_jobs = db.query(JobFile.job_id).filter(JobFile.file_id == file_id).distinct().count()
+        if linked_jobs > 1:
+            raise HTTPException(
+                status_code=409,
+                detail=f"File is attached to {linked_jobs} jobs; pass job_id to remove it from one"
+            )
+    elif not db.query(JobFile.id).filter(JobFile.file_id == file_id, JobFile.job_id == job_id).first():
+        raise HTTPException(status_code=404, detail="File not found")
     
-    return {"message": "File deleted", "file_id": file_id}
+    deleted = await _unlink_file(db, file_record, job_id)
+    return {"message": "File deleted" if deleted else "File removed from job", "file_id": file_id}
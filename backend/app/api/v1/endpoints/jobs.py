@@ -1,20 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import StreamingResponse, RedirectResponse
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from typing import List, Optional, Tuple, Union
 from decimal import Decimal
-from app.core.database import get_db
-from app.models import Job, JobStatus, JobStatusEvent, BillingUnit, ShareUrl, Driver, Organization
+from app.core.database import get_async_db, get_db
+from app.models import (
+    Job, JobStatus, JobStatusEvent, BillingUnit, ShareUrl, Driver, Organization,
+    Customer, Site, Material, Truck, JobFile
+)
 from app.models.alert import AlertType, AlertSeverity, AlertCategory
-from app.middleware.tenant import get_current_org_id, get_current_user_id, get_org_role
+from app.middleware.tenant import get_current_org_id, get_current_user_id
+from app.core.principal import get_principal, get_principal_async
 from app.core.security import create_access_token
-from app.services.pdf_generator import DeliveryNotePDF
+from app.services.delivery_note_cache import delivery_note_cache
 from app.services.email_service import send_email_smtp
+from app.services.share_links import create_share_links, share_link_usable
 from app.services.alert_service import AlertService
 from app.schemas.alert import AlertCreate
 from pydantic import BaseModel
 from datetime import datetime, timedelta, date
 from uuid import UUID
+import base64
+import json
 
 router = APIRouter()
 
@@ -174,6 +183,178 @@ class JobEmailSendRequest(BaseModel):
     attach_pdf: bool = True
 
 
+class JobPage(BaseModel):
+    """Keyset-paginated page of jobs"""
+    items: List[JobResponse]
+    next_cursor: Optional[str] = None
+
+
+class JobBoardRow(BaseModel):
+    """Flat, read-only job row with just the fields the dispatch board renders"""
+    id: int
+    scheduled_date: datetime
+    status: JobStatus
+    priority: Optional[int] = 0
+    customer_id: int
+    customer_name: Optional[str] = None
+    from_site_id: int
+    from_site_name: Optional[str] = None
+    to_site_id: int
+    to_site_name: Optional[str] = None
+    material_id: int
+    material_name: Optional[str] = None
+    planned_qty: float
+    actual_qty: Optional[float] = None
+    unit: BillingUnit
+    driver_id: Optional[int] = None
+    driver_name: Optional[str] = None
+    truck_id: Optional[int] = None
+    truck_plate: Optional[str] = None
+    is_subcontractor: Optional[bool] = False
+    subcontractor_id: Optional[int] = None
+    status_events: Optional[List[JobStatusEventResponse]] = None
+
+
+class JobBoardPage(BaseModel):
+    """Keyset-paginated page of dispatch board rows"""
+    items: List[JobBoardRow]
+    next_cursor: Optional[str] = None
+
+
+def _apply_job_filters(
+    query,
+    date: Optional[str],
+    from_date: Optional[str],
+    to_date: Optional[str],
+    status: Optional[JobStatus],
+    customer_id: Optional[int],
+    driver_id: Optional[int]
+):
+    """Apply the dispatch board date/status/customer/driver filters to a Job query"""
+    # סינון תאריכים: date מנצח על from_date/to_date
+    if date:
+        # תאריך בודד - כל היום
+        date_obj = datetime.strptime(date, '%Y-%m-%d')
+        query = query.filter(Job.scheduled_date >= date_obj, 
+                           Job.scheduled_date < date_obj.replace(hour=23, minute=59))
+    elif from_date or to_date:
+        # טווח תאריכים
+        if from_date:
+            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
+            query = query.filter(Job.scheduled_date >= from_date_obj)
+        if to_date:
+            # כולל את כל היום האחרון
+            to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
+            query = query.filter(Job.scheduled_date < to_date_obj.replace(hour=23, minute=59, second=59))
+    
+    if status:
+        query = query.filter(Job.status == status)
+    if customer_id:
+        query = query.filter(Job.customer_id == customer_id)
+    if driver_id:
+        query = query.filter(Job.driver_id == driver_id)
+    return query
+
+
+def _job_response_options():
+    """Eager loads for every relation JobResponse serializes (required on AsyncSession)"""
+    return (
+        selectinload(Job.status_events),
+        joinedload(Job.customer),
+        joinedload(Job.from_site),
+        joinedload(Job.to_site),
+        joinedload(Job.material),
+        joinedload(Job.driver),
+        joinedload(Job.truck),
+    )
+
+
+def _board_select(org_id):
+    """
+    Column-projected SELECT for the dispatch board
+    
+    Only the columns rendered on the board are fetched, joined to the
+    related names in the same statement. Executed via db.execute() so rows
+    come back as plain mappings and never enter the ORM identity map.
+    """
+    from_site = aliased(Site)
+    to_site = aliased(Site)
+    return (
+        select(
+            Job.id,
+            Job.scheduled_date,
+            Job.status,
+            Job.priority,
+            Job.customer_id,
+            Customer.name.label("customer_name"),
+            Job.from_site_id,
+            from_site.name.label("from_site_name"),
+            Job.to_site_id,
+            to_site.name.label("to_site_name"),
+            Job.material_id,
+            Material.name.label("material_name"),
+            Job.planned_qty,
+            Job.actual_qty,
+            Job.unit,
+            Job.driver_id,
+            Driver.name.label("driver_name"),
+            Job.truck_id,
+            Truck.plate_number.label("truck_plate"),
+            Job.is_subcontractor,
+            Job.subcontractor_id,
+        )
+        .select_from(Job)
+        .outerjoin(Customer, Customer.id == Job.customer_id)
+        .outerjoin(from_site, from_site.id == Job.from_site_id)
+        .outerjoin(to_site, to_site.id == Job.to_site_id)
+        .outerjoin(Material, Material.id == Job.material_id)
+        .outerjoin(Driver, Driver.id == Job.driver_id)
+        .outerjoin(Truck, Truck.id == Job.truck_id)
+        .where(Job.org_id == org_id)
+    )
+
+
+def _load_status_events(db: Session, job_ids: List[int]) -> dict:
+    """Load status events for many jobs in one query, grouped by job_id"""
+    events_by_job = {job_id: [] for job_id in job_ids}
+    if not job_ids:
+        return events_by_job
+    
+    rows = db.execute(
+        select(
+            JobStatusEvent.id,
+            JobStatusEvent.job_id,
+            JobStatusEvent.status,
+            JobStatusEvent.event_time,
+            JobStatusEvent.lat,
+            JobStatusEvent.lng,
+            JobStatusEvent.note,
+        )
+        .where(JobStatusEvent.job_id.in_(job_ids))
+        .order_by(JobStatusEvent.job_id, JobStatusEvent.event_time)
+    ).mappings().all()
+    
+    for row in rows:
+        events_by_job[row["job_id"]].append(dict(row))
+    return events_by_job
+
+
+def _encode_job_cursor(scheduled_date: datetime, job_id: int) -> str:
+    """Encode the (scheduled_date, id) position of the last row into an opaque cursor"""
+    raw = json.dumps({"d": scheduled_date.isoformat(), "id": job_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_job_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by _encode_job_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["d"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("", response_model=List[JobResponse])
 async def list_jobs(
     request: Request,
@@ -185,7 +366,8 @@ async def list_jobs(
     status: Optional[JobStatus] = None,
     customer_id: Optional[int] = None,
     driver_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    adb: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """
     List jobs with filters for dispatch board (filtered by org_id from JWT)
@@ -196,16 +378,52 @@ async def list_jobs(
     - If no dates provided: Returns last 50 jobs by default
     """
     org_id = get_current_org_id(request)
-    user_id = get_current_user_id(request)
-    user_role = get_org_role(request)
-    driver = None
-    if str(user_role).lower() == "driver":
-        driver = db.query(Driver).filter(Driver.user_id == user_id).first()
-        if not driver:
-            return []
+    principal = await get_principal_async(request, adb) if adb is not None else get_principal(request, db)
+    if principal.is_driver and not principal.driver_id:
+        return []
+    
+    stmt = select(Job).options(*_job_response_options()).where(Job.org_id == org_id)
+    stmt = _apply_job_filters(stmt, date, from_date, to_date, status, customer_id, driver_id)
+
+    if principal.is_driver:
+        stmt = stmt.where(Job.driver_id == principal.driver_id)
+    stmt = stmt.offset(skip).limit(limit)
+
+    if adb is not None:
+        return (await adb.execute(stmt)).scalars().all()
+    return db.execute(stmt).scalars().all()
+
+
+@router.get("/page", response_model=JobPage)
+async def list_jobs_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    date: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    customer_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List jobs for the dispatch board using keyset (cursor) pagination
+    
+    Same filters as GET /jobs, but rows are ordered by (scheduled_date, id)
+    and each page continues after the last row of the previous one, so
+    page 50 costs the same as page 1 and rows don't shift when jobs are
+    inserted mid-scroll.
+    - cursor: value of next_cursor from the previous page (omit for first page)
+    - next_cursor is null on the last page
+    """
+    org_id = get_current_org_id(request)
+    principal = get_principal(request, db)
+    if principal.is_driver and not principal.driver_id:
+        return JobPage(items=[])
     
     query = db.query(Job).options(
-        joinedload(Job.status_events),
+        selectinload(Job.status_events),
         joinedload(Job.customer),
         joinedload(Job.from_site),
         joinedload(Job.to_site),
@@ -213,34 +431,79 @@ async def list_jobs(
         joinedload(Job.driver),
         joinedload(Job.truck)
     ).filter(Job.org_id == org_id)
+    query = _apply_job_filters(query, date, from_date, to_date, status, customer_id, driver_id)
+
+    if principal.is_driver:
+        query = query.filter(Job.driver_id == principal.driver_id)
+
+    if cursor:
+        after_date, after_id = _decode_job_cursor(cursor)
+        # Row-value comparison lets Postgres seek ix_jobs_org_scheduled_id directly
+        query = query.filter(tuple_(Job.scheduled_date, Job.id) > tuple_(after_date, after_id))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Job.scheduled_date, Job.id).limit(limit + 1).all()
     
-    # סינון תאריכים: date מנצח על from_date/to_date
-    if date:
-        # תאריך בודד - כל היום
-        date_obj = datetime.strptime(date, '%Y-%m-%d')
-        query = query.filter(Job.scheduled_date >= date_obj, 
-                           Job.scheduled_date < date_obj.replace(hour=23, minute=59))
-    elif from_date or to_date:
-        # טווח תאריכים
-        if from_date:
-            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d')
-            query = query.filter(Job.scheduled_date >= from_date_obj)
-        if to_date:
-            # כולל את כל היום האחרון
-            to_date_obj = datetime.strptime(to_date, '%Y-%m-%d')
-            query = query.filter(Job.scheduled_date < to_date_obj.replace(hour=23, minute=59, second=59))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_job_cursor(last.scheduled_date, last.id)
     
-    if status:
-        query = query.filter(Job.status == status)
-    if customer_id:
-        query = query.filter(Job.customer_id == customer_id)
-    if driver_id:
-        query = query.filter(Job.driver_id == driver_id)
+    return JobPage(items=rows, next_cursor=next_cursor)
+
 
-    if driver:
-        query = query.filter(Job.driver_id == driver.id)
+@router.get("/board", response_model=JobBoardPage)
+async def list_board_jobs(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    date: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    customer_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    include_events: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Slim read-only "board view" of jobs for the dispatch board
+    
+    Same filters and cursor paging as GET /jobs/page, but returns flat rows
+    with related names instead of full job graphs.
+    - include_events: also return status_events, loaded in one batched query
+    """
+    org_id = get_current_org_id(request)
+    principal = get_principal(request, db)
+    if principal.is_driver and not principal.driver_id:
+        return JobBoardPage(items=[])
     
-    return query.offset(skip).limit(limit).all()
+    stmt = _apply_job_filters(_board_select(org_id), date, from_date, to_date, status, customer_id, driver_id)
+
+    if principal.is_driver:
+        stmt = stmt.where(Job.driver_id == principal.driver_id)
+
+    if cursor:
+        after_date, after_id = _decode_job_cursor(cursor)
+        stmt = stmt.where(tuple_(Job.scheduled_date, Job.id) > tuple_(after_date, after_id))
+
+    rows = [
+        dict(row) for row in
+        db.execute(stmt.order_by(Job.scheduled_date, Job.id).limit(limit + 1)).mappings().all()
+    ]
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_job_cursor(rows[-1]["scheduled_date"], rows[-1]["id"])
+    
+    if include_events:
+        events_by_job = _load_status_events(db, [row["id"] for row in rows])
+        for row in rows:
+            row["status_events"] = events_by_job[row["id"]]
+    
+    return JobBoardPage(items=rows, next_cursor=next_cursor)
 
 
 @router.get("/{job_id}", response_model=JobResponse)
@@ -253,11 +516,7 @@ async def get_job(
     Get job by ID (filtered by org_id from JWT)
     """
     org_id = get_current_org_id(request)
-    user_id = get_current_user_id(request)
-    user_role = get_org_role(request)
-    driver = None
-    if str(user_role).lower() == "driver":
-        driver = db.query(Driver).filter(Driver.user_id == user_id).first()
+    principal = get_principal(request, db)
     
     job_query = db.query(Job).options(
         joinedload(Job.status_events)
@@ -266,8 +525,8 @@ async def get_job(
         Job.org_id == org_id
     )
 
-    if driver:
-        job_query = job_query.filter(Job.driver_id == driver.id)
+    if principal.is_driver and principal.driver_id:
+        job_query = job_query.filter(Job.driver_id == principal.driver_id)
 
     job = job_query.first()
     
@@ -437,7 +696,8 @@ async def update_job_status(
     job_id: int,
     status_update: JobStatusUpdate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    adb: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """
     Update job status (driver updates from mobile app)
@@ -445,20 +705,20 @@ async def update_job_status(
     """
     org_id = get_current_org_id(request)
     user_id = get_current_user_id(request)
-    user_role = get_org_role(request)
-    driver = None
-    if str(user_role).lower() == "driver":
-        driver = db.query(Driver).filter(Driver.user_id == user_id).first()
+    principal = await get_principal_async(request, adb) if adb is not None else get_principal(request, db)
     
-    db_job_query = db.query(Job).filter(
+    db_job_query = select(Job).where(
         Job.id == job_id,
         Job.org_id == org_id
     )
 
-    if driver:
-        db_job_query = db_job_query.filter(Job.driver_id == driver.id)
+    if principal.is_driver and principal.driver_id:
+        db_job_query = db_job_query.where(Job.driver_id == principal.driver_id)
 
-    db_job = db_job_query.first()
+    if adb is not None:
+        db_job = (await adb.execute(db_job_query)).scalars().first()
+    else:
+        db_job = db.execute(db_job_query).scalars().first()
     
     if not db_job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -478,8 +738,19 @@ async def update_job_status(
         lng=status_update.lng,
         note=status_update.note
     )
-    db.add(status_event)
     
+    if adb is not None:
+        adb.add(status_event)
+        await adb.commit()
+        # Reload with everything JobResponse serializes - no lazy loads on AsyncSession
+        return (await adb.execute(
+            select(Job)
+            .options(*_job_response_options())
+            .where(Job.id == job_id)
+            .execution_options(populate_existing=True)
+        )).scalars().one()
+
+    db.add(status_event)
     db.commit()
     db.refresh(db_job)
     return db_job
@@ -497,18 +768,17 @@ async def update_job_location(
     """
     org_id = get_current_org_id(request)
     user_id = get_current_user_id(request)
-    user_role = get_org_role(request)
+    principal = get_principal(request, db)
 
     db_job_query = db.query(Job).filter(
         Job.id == job_id,
         Job.org_id == org_id
     )
 
-    if str(user_role).lower() == "driver":
-        driver = db.query(Driver).filter(Driver.user_id == user_id).first()
-        if not driver:
+    if principal.is_driver:
+        if not principal.driver_id:
             raise HTTPException(status_code=404, detail="Driver not found")
-        db_job_query = db_job_query.filter(Job.driver_id == driver.id)
+        db_job_query = db_job_query.filter(Job.driver_id == principal.driver_id)
 
     db_job = db_job_query.first()
     if not db_job:
@@ -597,33 +867,118 @@ async def create_share_url(
     existing_share = db.query(ShareUrl).filter(
         ShareUrl.job_id == job_id,
         ShareUrl.org_id == org_id,
-        ShareUrl.is_active == True
+        *share_link_usable()
     ).first()
     
     if existing_share:
         return {"short_url": f"https://truckflow.site/share/{existing_share.short_id}"}
     
-    # Generate short ID (8 characters)
-    import random
-    import string
-    short_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    short_id = create_share_links(db, org_id, [job_id], user_id)[job_id]
+    db.commit()
     
-    # Ensure uniqueness
-    while db.query(ShareUrl).filter(ShareUrl.short_id == short_id).first():
-        short_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    return {"short_url": f"https://truckflow.site/api/share/{short_id}"}
+
+
+@router.delete("/{job_id}/share")
+async def deactivate_share_url(
+    job_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Deactivate the job's share links; the short URLs stop resolving"""
+    org_id = get_current_org_id(request)
     
-    # Create share URL record
-    share_url = ShareUrl(
-        short_id=short_id,
-        job_id=job_id,
-        org_id=org_id,
-        created_by=user_id,
-        expires_at=datetime.utcnow() + timedelta(days=30)  # Expires in 30 days
-    )
-    db.add(share_url)
+    share_urls = db.query(ShareUrl).filter(
+        ShareUrl.job_id == job_id,
+        ShareUrl.org_id == org_id,
+        ShareUrl.is_active == True
+    ).all()
+    
+    for share_url in share_urls:
+        share_url.is_active = False
     db.commit()
     
-    return {"short_url": f"https://truckflow.site/api/share/{short_id}"}
+    return {"job_id": job_id, "deactivated": len(share_urls)}
+
+
+class BulkShareRequest(BaseModel):
+    date: date
+
+
+class BulkShareLink(BaseModel):
+    job_id: int
+    short_url: str
+
+
+@router.post("/share-links", response_model=List[BulkShareLink])
+async def create_share_urls_for_day(
+    body: BulkShareRequest,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Share links for all of a day's jobs (canceled jobs excluded).
+    
+    Jobs that already have an active, unexpired link keep it; the rest get
+    one, all in a single transaction.
+    """
+    org_id = get_current_org_id(request)
+    user_id = get_current_user_id(request)
+    
+    day_start = datetime.combine(body.date, datetime.min.time())
+    job_ids = [job_id for (job_id,) in db.query(Job.id).filter(
+        Job.org_id == org_id,
+        Job.scheduled_date >= day_start,
+        Job.scheduled_date < day_start + timedelta(days=1),
+        Job.status != JobStatus.CANCELED
+    ).order_by(Job.id).all()]
+    
+    short_ids = dict(db.query(ShareUrl.job_id, ShareUrl.short_id).filter(
+        ShareUrl.org_id == org_id,
+        ShareUrl.job_id.in_(job_ids),
+        *share_link_usable()
+    ).all()) if job_ids else {}
+    
+    missing = [job_id for job_id in job_ids if job_id not in short_ids]
+    if missing:
+        short_ids.update(create_share_links(db, org_id, missing, user_id))
+        db.commit()
+    
+    return [
+        BulkShareLink(job_id=job_id, short_url=f"https://truckflow.site/api/share/{short_ids[job_id]}")
+        for job_id in job_ids
+    ]
+
+
+def _delivery_note_data(db_job: Job) -> dict:
+    """DeliveryNotePDF input for a job loaded with its customer / sites / material / driver / truck / note"""
+    return {
+        'id': db_job.id,
+        'note_number': db_job.delivery_note.note_number if db_job.delivery_note else None,
+        'scheduled_date': db_job.scheduled_date.strftime('%d/%m/%Y') if db_job.scheduled_date else 'N/A',
+        'status': db_job.status.value if db_job.status else 'PLANNED',
+        'customer_name': db_job.customer.name if db_job.customer else None,
+        'from_site_name': db_job.from_site.name if db_job.from_site else 'N/A',
+        'from_site_address': db_job.from_site.address if db_job.from_site else '-',
+        'to_site_name': db_job.to_site.name if db_job.to_site else 'N/A',
+        'to_site_address': db_job.to_site.address if db_job.to_site else '-',
+        'material_name': db_job.material.name if db_job.material else 'N/A',
+        'planned_qty': float(db_job.planned_qty) if db_job.planned_qty else 0,
+        'actual_qty': float(db_job.actual_qty) if db_job.actual_qty else None,
+        'unit': db_job.unit.value if db_job.unit else 'TON',
+        'driver_name': db_job.driver.name if db_job.driver else None,
+        'truck_plate': db_job.truck.plate_number if db_job.truck else None,
+        'notes': db_job.notes,
+        'manual_override_total': float(db_job.manual_override_total) if db_job.manual_override_total else None,
+        'manual_override_reason': db_job.manual_override_reason if db_job.manual_override_reason else None
+    }
+
+
+def _delivery_note_content(db: Session, db_job: Job) -> Tuple[dict, str]:
+    """(job_data, content_hash) - the hash keys the PDF cache and is the ETag"""
+    job_data = _delivery_note_data(db_job)
+    file_ids = [row.file_id for row in db.query(JobFile.file_id).filter(JobFile.job_id == db_job.id)]
+    return job_data, delivery_note_cache.content_hash(job_data, file_ids)
 
 
 @router.get("/{job_id}/pdf")
@@ -647,7 +1002,8 @@ async def download_job_pdf(
             joinedload(Job.to_site),
             joinedload(Job.material),
             joinedload(Job.driver),
-            joinedload(Job.truck)
+            joinedload(Job.truck),
+            joinedload(Job.delivery_note)
         )\
         .filter(Job.id == job_id, Job.org_id == org_id)\
         .first()
@@ -655,30 +1011,20 @@ async def download_job_pdf(
     if not db_job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Prepare data for PDF
-    job_data = {
-        'id': db_job.id,
-        'scheduled_date': db_job.scheduled_date.strftime('%d/%m/%Y') if db_job.scheduled_date else 'N/A',
-        'status': db_job.status.value if db_job.status else 'PLANNED',
-        'customer_name': db_job.customer.name if db_job.customer else None,
-        'from_site_name': db_job.from_site.name if db_job.from_site else 'N/A',
-        'from_site_address': db_job.from_site.address if db_job.from_site else '-',
-        'to_site_name': db_job.to_site.name if db_job.to_site else 'N/A',
-        'to_site_address': db_job.to_site.address if db_job.to_site else '-',
-        'material_name': db_job.material.name if db_job.material else 'N/A',
-        'planned_qty': float(db_job.planned_qty) if db_job.planned_qty else 0,
-        'actual_qty': float(db_job.actual_qty) if db_job.actual_qty else None,
-        'unit': db_job.unit.value if db_job.unit else 'TON',
-        'driver_name': db_job.driver.name if db_job.driver else None,
-        'truck_plate': db_job.truck.plate_number if db_job.truck else None,
-        'notes': db_job.notes,
-        'manual_override_total': float(db_job.manual_override_total) if db_job.manual_override_total else None,
-        'manual_override_reason': db_job.manual_override_reason if db_job.manual_override_reason else None
+    job_data, content_hash = _delivery_note_content(db, db_job)
+    etag = f'"{content_hash}"'
+    cache_headers = {
+        "ETag": etag,
+        # Revalidate on every open: the URL stays the same while the job changes
+        "Cache-Control": "private, no-cache",
     }
     
-    # Generate PDF
-    pdf_gen = DeliveryNotePDF()
-    pdf_buffer = pdf_gen.generate(job_data)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        delivery_note_cache.record_not_modified()
+        return Response(status_code=304, headers=cache_headers)
+    
+    pdf_bytes = await delivery_note_cache.get_or_render(job_data, content_hash)
     
     # Create filename with job number and customer name
     customer_name = db_job.customer.name if db_job.customer else 'NoCustomer'
@@ -691,12 +1037,13 @@ async def download_job_pdf(
     filename_encoded = quote(f"תעודה_{job_id}_{clean_customer}.pdf")
     filename_ascii = f"delivery_note_{job_id}.pdf"  # Fallback for old browsers
     
-    return StreamingResponse(
-        pdf_buffer,
+    return Response(
+        content=pdf_bytes,
         media_type="application/pdf",
         headers={
             "Content-Disposition": f"inline; filename={filename_ascii}; filename*=UTF-8''{filename_encoded}",
-            "Access-Control-Expose-Headers": "Content-Disposition"
+            "Access-Control-Expose-Headers": "Content-Disposition, ETag",
+            **cache_headers
         }
     )
 
@@ -719,7 +1066,8 @@ async def send_job_email(
         joinedload(Job.to_site),
         joinedload(Job.material),
         joinedload(Job.driver),
-        joinedload(Job.truck)
+        joinedload(Job.truck),
+        joinedload(Job.delivery_note)
     ).filter(Job.id == job_id, Job.org_id == org_id).first()
 
     if not db_job:
@@ -739,28 +1087,8 @@ async def send_job_email(
 
     attachments = []
     if email_data.attach_pdf:
-        job_data = {
-            'id': db_job.id,
-            'scheduled_date': db_job.scheduled_date.strftime('%d/%m/%Y') if db_job.scheduled_date else 'N/A',
-            'status': db_job.status.value if db_job.status else 'PLANNED',
-            'customer_name': db_job.customer.name if db_job.customer else None,
-            'from_site_name': db_job.from_site.name if db_job.from_site else 'N/A',
-            'from_site_address': db_job.from_site.address if db_job.from_site else '-',
-            'to_site_name': db_job.to_site.name if db_job.to_site else 'N/A',
-            'to_site_address': db_job.to_site.address if db_job.to_site else '-',
-            'material_name': db_job.material.name if db_job.material else 'N/A',
-            'planned_qty': float(db_job.planned_qty) if db_job.planned_qty else 0,
-            'actual_qty': float(db_job.actual_qty) if db_job.actual_qty else None,
-            'unit': db_job.unit.value if db_job.unit else 'TON',
-            'driver_name': db_job.driver.name if db_job.driver else None,
-            'truck_plate': db_job.truck.plate_number if db_job.truck else None,
-            'notes': db_job.notes,
-            'manual_override_total': float(db_job.manual_override_total) if db_job.manual_override_total else None,
-            'manual_override_reason': db_job.manual_override_reason if db_job.manual_override_reason else None
-        }
-        pdf_gen = DeliveryNotePDF()
-        pdf_buffer = pdf_gen.generate(job_data)
-        pdf_bytes = pdf_buffer.getvalue()
+        job_data, content_hash = _delivery_note_content(db, db_job)
+        pdf_bytes = await delivery_note_cache.get_or_render(job_data, content_hash)
         attachments.append((f"delivery_note_{db_job.id}.pdf", pdf_bytes, "application/pdf"))
 
     try:
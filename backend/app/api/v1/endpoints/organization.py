@@ -7,7 +7,7 @@ from pydantic import BaseModel, EmailStr
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models import Organization, User
-from app.services.storage import get_storage_service
+from app.services.storage import async_storage, get_storage_service
 
 router = APIRouter()
 
@@ -90,15 +90,14 @@ async def upload_organization_logo(
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Logo must be an image")
 
-    storage = get_storage_service()
-    storage_key = storage.upload_file(
+    storage_key = await async_storage.upload_file(
         file=file.file,
         filename=file.filename,
         folder=f"orgs/{org.id}",
         content_type=file.content_type,
     )
 
-    org.logo_url = storage.get_presigned_url(storage_key, expiration=3600)
+    org.logo_url = get_storage_service().get_presigned_url(storage_key, expiration=3600)
     db.commit()
     db.refresh(org)
     return org
@@ -3,9 +3,12 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Union
 from datetime import datetime, date
 
-from app.core.database import get_db
+from app.core.database import get_db, report_request
 from app.core.security import get_current_user
+from app.services.price_resolver import price_resolver
+from app.services.repricing_service import reprice_jobs, scope_for_price_list
 from app.models import (
+    BillingUnit,
     PriceList as PriceListModel,
     Customer,
     Material,
@@ -85,6 +88,41 @@ class PricingBreakdown(BaseModel):
         }
 
 
+class RepriceRequest(BaseModel):
+    """Either a price list (its material/unit/customer/validity) or explicit filters"""
+    price_list_id: Optional[int] = None
+    material_id: Optional[int] = None
+    unit: Optional[BillingUnit] = None
+    customer_id: Optional[int] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    dry_run: bool = True
+
+
+class RepriceDiffRow(BaseModel):
+    job_id: int
+    customer_id: int
+    scheduled_date: datetime
+    old_total: Optional[Decimal] = None
+    new_total: Optional[Decimal] = None  # None: no price list applies any more, pricing cleared
+    delta: Decimal
+    old_price_list_id: Optional[int] = None
+    new_price_list_id: Optional[int] = None
+
+
+class RepriceReport(BaseModel):
+    dry_run: bool
+    scanned: int
+    changed: int
+    unchanged: int
+    unpriced: int
+    cleared: int
+    total_delta: Decimal
+    duration_ms: int
+    diff: List[RepriceDiffRow]
+    diff_truncated: bool
+
+
 @router.get("/price-lists", response_model=List[PriceListResponse])
 def list_price_lists(
     customer_id: Optional[int] = None,
@@ -126,6 +164,7 @@ def create_price_list(
     db.add(db_price_list)
     db.commit()
     db.refresh(db_price_list)
+    price_resolver.invalidate(current_user.org_id)
     return db_price_list
 
 
@@ -179,6 +218,7 @@ def update_price_list(
     
     db.commit()
     db.refresh(db_price_list)
+    price_resolver.invalidate(current_user.org_id)
     return db_price_list
 
 
@@ -201,6 +241,7 @@ def delete_price_list(
     
     db.delete(db_price_list)
     db.commit()
+    price_resolver.invalidate(current_user.org_id)
     return {"message": "Price list deleted successfully"}
 
 
@@ -223,26 +264,9 @@ def preview_pricing(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # Find applicable price list
-    now = datetime.now()
-    price_list = (
-        db.query(PriceListModel)
-        .filter(
-            PriceListModel.org_id == current_user.org_id,
-            PriceListModel.material_id == job.material_id,
-            PriceListModel.valid_from <= now,
-            (PriceListModel.valid_to.is_(None))
-            | (PriceListModel.valid_to >= now),
-        )
-        .filter(
-            (PriceListModel.customer_id == job.customer_id)
-            | (PriceListModel.customer_id.is_(None))
-        )
-        .order_by(
-            PriceListModel.customer_id.desc(),  # Customer-specific first
-            PriceListModel.valid_from.desc(),
-        )
-        .first()
+    # Find applicable price list (customer-specific first, then newest)
+    price_list = price_resolver.resolve_for_material(
+        db, current_user.org_id, job.customer_id, job.material_id
     )
 
     if not price_list:
@@ -297,44 +321,17 @@ def get_pricing_quote(
     Calculate pricing quote before job creation
     Returns pricing breakdown based on customer, material, route, and quantity
     """
-    # Find applicable price list
-    now = datetime.now()
-    query = (
-        db.query(PriceListModel)
-        .filter(
-            PriceListModel.org_id == current_user.org_id,
-            PriceListModel.material_id == request.material_id,
-            PriceListModel.unit == request.unit,
-            PriceListModel.valid_from <= now,
-            (PriceListModel.valid_to.is_(None))
-            | (PriceListModel.valid_to >= now),
-        )
-        .filter(
-            (PriceListModel.customer_id == request.customer_id)
-            | (PriceListModel.customer_id.is_(None))
-        )
+    # Route-specific price first, then the general price; customer-specific
+    # before general within each
+    price_list = price_resolver.resolve_quote(
+        db,
+        current_user.org_id,
+        customer_id=request.customer_id,
+        material_id=request.material_id,
+        unit=request.unit,
+        from_site_id=request.from_site_id,
+        to_site_id=request.to_site_id,
     )
-    
-    # Try to find route-specific price first
-    price_list = None
-    if request.from_site_id and request.to_site_id:
-        price_list = query.filter(
-            PriceListModel.from_site_id == request.from_site_id,
-            PriceListModel.to_site_id == request.to_site_id,
-        ).order_by(
-            PriceListModel.customer_id.desc(),
-            PriceListModel.valid_from.desc(),
-        ).first()
-    
-    # If no route-specific price, find general price
-    if not price_list:
-        price_list = query.filter(
-            PriceListModel.from_site_id.is_(None),
-            PriceListModel.to_site_id.is_(None),
-        ).order_by(
-            PriceListModel.customer_id.desc(),
-            PriceListModel.valid_from.desc(),
-        ).first()
 
     if not price_list:
         raise HTTPException(
@@ -382,3 +379,45 @@ def get_pricing_quote(
         },
     )
 
+
+@router.post("/pricing/reprice", response_model=RepriceReport, dependencies=[Depends(report_request)])
+def reprice_open_jobs(
+    request: RepriceRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Recompute pricing_total for open (unbilled, not canceled) jobs
+
+    Call after changing a price list, with its price_list_id, or with
+    explicit filters (e.g. after deleting one). Jobs no price list applies
+    to any more have their pricing cleared and are listed in the diff.
+    dry_run (default) returns the diff without writing.
+    """
+    if request.price_list_id:
+        price_list = (
+            db.query(PriceListModel)
+            .filter(
+                PriceListModel.id == request.price_list_id,
+                PriceListModel.org_id == current_user.org_id
+            )
+            .first()
+        )
+        if not price_list:
+            raise HTTPException(status_code=404, detail="Price list not found")
+        scope = scope_for_price_list(price_list)
+    else:
+        if not request.material_id and not request.customer_id:
+            raise HTTPException(
+                status_code=400,
+                detail="price_list_id, material_id or customer_id is required"
+            )
+        scope = {
+            "material_id": request.material_id,
+            "unit": request.unit,
+            "customer_id": request.customer_id,
+            "date_from": request.from_date,
+            "date_to": request.to_date,
+        }
+
+    return reprice_jobs(db, current_user.org_id, dry_run=request.dry_run, **scope)
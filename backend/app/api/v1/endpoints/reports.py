@@ -4,17 +4,19 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+from io import BytesIO
 import base64
 
-from app.core.database import get_db
+from app.core.database import get_db, report_request
 from app.core.security import get_current_user
 from app.models import Organization, User
 from app.services.pdf_generator import SubcontractorPaymentPDF, CustomerReportPDF, ARAgingPDF, DailyJobsPDF
+from app.services.pdf_render_service import pdf_render_service
 from app.services.storage import get_storage_service
 import os
 from app.services.email_service import send_email_smtp
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(report_request)])
 
 
 class SubcontractorReportLine(BaseModel):
@@ -147,8 +149,7 @@ def subcontractor_payment_pdf(
     payload = data.dict()
     payload["generated_at"] = payload.get("generated_at") or datetime.utcnow().strftime("%d/%m/%Y")
 
-    pdf_gen = SubcontractorPaymentPDF()
-    pdf_buffer = pdf_gen.generate(payload, org_info)
+    pdf_buffer = BytesIO(pdf_render_service.render_sync(SubcontractorPaymentPDF, payload, org_info))
 
     filename = "subcontractor_payment_report.pdf"
     return StreamingResponse(
@@ -180,8 +181,7 @@ def subcontractor_payment_share(
     payload = data.dict()
     payload["generated_at"] = payload.get("generated_at") or datetime.utcnow().strftime("%d/%m/%Y")
 
-    pdf_gen = SubcontractorPaymentPDF()
-    pdf_buffer = pdf_gen.generate(payload, org_info)
+    pdf_buffer = BytesIO(pdf_render_service.render_sync(SubcontractorPaymentPDF, payload, org_info))
     filename = "subcontractor_payment_report.pdf"
     url = _upload_pdf_and_get_url(request, pdf_buffer, filename, current_user.org_id)
     return {"share_url": url}
@@ -204,8 +204,7 @@ def customer_report_share(
     }
 
     payload = data.dict()
-    pdf_gen = CustomerReportPDF()
-    pdf_buffer = pdf_gen.generate(payload, org_info)
+    pdf_buffer = BytesIO(pdf_render_service.render_sync(CustomerReportPDF, payload, org_info))
     filename = "customer_report.pdf"
     url = _upload_pdf_and_get_url(request, pdf_buffer, filename, current_user.org_id)
     return {"share_url": url}
@@ -228,8 +227,7 @@ def ar_aging_share(
     }
 
     payload = data.dict()
-    pdf_gen = ARAgingPDF()
-    pdf_buffer = pdf_gen.generate(payload, org_info)
+    pdf_buffer = BytesIO(pdf_render_service.render_sync(ARAgingPDF, payload, org_info))
     filename = "ar_aging_report.pdf"
     url = _upload_pdf_and_get_url(request, pdf_buffer, filename, current_user.org_id)
     return {"share_url": url}
@@ -252,8 +250,7 @@ def daily_jobs_share(
     }
 
     payload = data.dict()
-    pdf_gen = DailyJobsPDF()
-    pdf_buffer = pdf_gen.generate(payload, org_info)
+    pdf_buffer = BytesIO(pdf_render_service.render_sync(DailyJobsPDF, payload, org_info))
     filename = "daily_jobs_report.pdf"
     url = _upload_pdf_and_get_url(request, pdf_buffer, filename, current_user.org_id)
     return {"share_url": url}
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import func, select
 from typing import List, Optional
-from datetime import date as DateType
+from datetime import date as DateType, datetime
 from decimal import Decimal
+from io import BytesIO
 
-from app.core.database import get_db
+from app.core.database import get_db, report_request
 from app.core.security import get_current_user
 from app.services.pdf_generator import StatementPDF
+from app.services.pdf_render_service import pdf_render_service
+from app.services.billing_service import (
+    VAT_RATE,
+    create_billing_run,
+    execute_billing_run,
+    job_billing_amount,
+    lock_org_billing,
+    period_bounds,
+)
+from app.services.numbering_service import STATEMENT, next_number
 from app.models import (
     Statement as StatementModel,
     StatementLine as StatementLineModel,
@@ -16,9 +27,12 @@ from app.models import (
     PaymentAllocation as PaymentAllocationModel,
     Job,
     Customer,
+    Material,
+    Truck,
     User,
     StatementStatus,
     Organization,
+    BillingRun,
 )
 from pydantic import BaseModel
 
@@ -65,6 +79,53 @@ class StatementResponse(BaseModel):
         from_attributes = True
 
 
+class StatementSummary(BaseModel):
+    """Statement list row: totals and payment balance, no lines"""
+    id: int
+    number: str
+    customer_id: int
+    customer_name: Optional[str] = None
+    period_from: DateType
+    period_to: DateType
+    status: StatementStatus
+    subtotal: Optional[Decimal] = None
+    tax: Optional[Decimal] = None
+    total: Decimal
+    paid_amount: Decimal
+    balance: Decimal
+    line_count: int
+    created_at: Optional[datetime] = None
+
+
+class StatementSummaryPage(BaseModel):
+    items: List[StatementSummary]
+    total_count: int
+    skip: int
+    limit: int
+
+
+class BillingRunRequest(BaseModel):
+    period_from: DateType
+    period_to: DateType
+
+
+class BillingRunResponse(BaseModel):
+    id: int
+    period_from: DateType
+    period_to: DateType
+    status: str
+    total_jobs: int
+    processed_jobs: int
+    statements_created: int
+    total_amount: Decimal
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class PaymentCreate(BaseModel):
     customer_id: int
     amount: Decimal
@@ -84,7 +145,7 @@ def _format_money(value: Optional[Decimal]) -> str:
     return f"{value:.2f}"
 
 
-@router.post("/statements/generate", response_model=StatementResponse)
+@router.post("/statements/generate", response_model=StatementResponse, dependencies=[Depends(report_request)])
 def generate_statement(
     request: GenerateStatementRequest,
     current_user: User = Depends(get_current_user),
@@ -93,13 +154,17 @@ def generate_statement(
     """
     Generate a statement for delivered jobs in a period
     """
-    # Get eligible jobs
+    # Wait for any billing run / concurrent generation for this org
+    lock_org_billing(db, current_user.org_id)
+
+    # Get eligible jobs (same whole-day period as a billing run)
+    date_from, date_to = period_bounds(request.period_from, request.period_to)
     query = db.query(Job).filter(
         Job.org_id == current_user.org_id,
         Job.customer_id == request.customer_id,
         Job.status == "DELIVERED",
-        Job.scheduled_date >= request.period_from,
-        Job.scheduled_date <= request.period_to,
+        Job.scheduled_date >= date_from,
+        Job.scheduled_date < date_to,
     )
 
     if request.job_ids:
@@ -120,15 +185,8 @@ def generate_statement(
             status_code=400, detail="No eligible jobs found for statement"
         )
 
-    # Generate statement number
-    last_statement = (
-        db.query(StatementModel)
-        .filter(StatementModel.org_id == current_user.org_id)
-        .order_by(StatementModel.id.desc())
-        .first()
-    )
-    next_num = (last_statement.id + 1) if last_statement else 1
-    statement_number = f"ST-{next_num:06d}"
+    # Per-org gap-free number; the counter row stays locked until commit
+    statement_number = next_number(db, current_user.org_id, STATEMENT)
 
     # Create statement
     statement = StatementModel(
@@ -151,22 +209,16 @@ def generate_statement(
     job_map = {job.id: job for job in jobs}
 
     for job in jobs:
-        # CRITICAL: Use manual_override_total if exists, otherwise use pricing_total
-        # Manual price MUST be the authoritative price for billing!
-        amount = (
-            job.manual_override_total
-            or job.pricing_total
-            or ((job.actual_qty or job.planned_qty) * Decimal(100))  # Fallback
-        )
+        # Manual price MUST be the authoritative price for billing - see job_billing_amount
+        qty, unit_price, amount = job_billing_amount(job)
 
         line = StatementLineModel(
             statement_id=statement.id,
             job_id=job.id,
             org_id=current_user.org_id,
             description=f"Job #{job.id} - {job.material_id}",
-            qty=job.actual_qty or job.planned_qty,
-            unit_price=amount
-            / (job.actual_qty or job.planned_qty or Decimal(1)),
+            qty=qty,
+            unit_price=unit_price,
             total=amount,
             breakdown_json=job.pricing_breakdown_json or {},
         )
@@ -174,7 +226,7 @@ def generate_statement(
         subtotal += amount
 
     # Update totals (17% VAT)
-    tax = subtotal * Decimal("0.17")
+    tax = subtotal * VAT_RATE
     statement.subtotal = subtotal
     statement.tax = tax
     statement.total = subtotal + tax
@@ -215,13 +267,228 @@ def generate_statement(
     )
 
 
-@router.get("/statements", response_model=List[StatementResponse])
+@router.post("/statements/billing-runs", response_model=BillingRunResponse)
+def start_billing_run(
+    request: BillingRunRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Bill every customer with unbilled delivered jobs in the period
+
+    Runs in the background; poll GET /statements/billing-runs/{run_id}
+    for progress.
+    """
+    if request.period_to < request.period_from:
+        raise HTTPException(status_code=400, detail="period_to must be on or after period_from")
+
+    run = create_billing_run(
+        db,
+        org_id=current_user.org_id,
+        period_from=request.period_from,
+        period_to=request.period_to,
+        created_by=current_user.id,
+    )
+    background_tasks.add_task(execute_billing_run, run.id)
+    return run
+
+
+@router.get("/statements/billing-runs/{run_id}", response_model=BillingRunResponse)
+def get_billing_run(
+    run_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    run = db.query(BillingRun).filter(
+        BillingRun.id == run_id,
+        BillingRun.org_id == current_user.org_id,
+    ).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing run not found")
+    return run
+
+
+def _statement_line_rows(db: Session, org_id, statement_id: int) -> List[StatementLineResponse]:
+    """Lines of one statement with material/truck names, in one joined query"""
+    rows = db.execute(
+        select(
+            StatementLineModel.id,
+            StatementLineModel.job_id,
+            StatementLineModel.description,
+            StatementLineModel.qty,
+            StatementLineModel.unit_price,
+            StatementLineModel.total,
+            Material.name.label("material_name"),
+            Truck.plate_number.label("truck_plate"),
+        )
+        .select_from(StatementLineModel)
+        .outerjoin(Job, (Job.id == StatementLineModel.job_id) & (Job.org_id == org_id))
+        .outerjoin(Material, Material.id == Job.material_id)
+        .outerjoin(Truck, Truck.id == Job.truck_id)
+        .where(StatementLineModel.statement_id == statement_id)
+        .order_by(StatementLineModel.id)
+    ).mappings().all()
+    return [StatementLineResponse(**row) for row in rows]
+
+
+@router.get("/statements/summary", response_model=StatementSummaryPage)
+def list_statement_summaries(
+    customer_id: Optional[int] = None,
+    status: Optional[StatementStatus] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Paginated statement list with paid amount, balance and line count
+
+    One round trip: the page is cut first (with COUNT(*) OVER () for the
+    total), then allocations and lines are aggregated for that page only.
+    Lines themselves come from GET /statements/{statement_id}.
+    """
+    page_query = select(
+        StatementModel.id,
+        StatementModel.number,
+        StatementModel.customer_id,
+        StatementModel.period_from,
+        StatementModel.period_to,
+        StatementModel.status,
+        StatementModel.subtotal,
+        StatementModel.tax,
+        StatementModel.total,
+        StatementModel.created_at,
+        func.count().over().label("total_count"),
+    ).where(StatementModel.org_id == current_user.org_id)
+    if customer_id:
+        page_query = page_query.where(StatementModel.customer_id == customer_id)
+    if status:
+        page_query = page_query.where(StatementModel.status == status)
+    page = (
+        page_query
+        .order_by(StatementModel.created_at.desc(), StatementModel.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+
+    paid = (
+        select(
+            PaymentAllocationModel.statement_id,
+            func.sum(PaymentAllocationModel.amount).label("paid_amount"),
+        )
+        .where(PaymentAllocationModel.statement_id.in_(select(page.c.id)))
+        .group_by(PaymentAllocationModel.statement_id)
+        .subquery()
+    )
+    lines = (
+        select(
+            StatementLineModel.statement_id,
+            func.count().label("line_count"),
+        )
+        .where(StatementLineModel.statement_id.in_(select(page.c.id)))
+        .group_by(StatementLineModel.statement_id)
+        .subquery()
+    )
+
+    paid_amount = func.coalesce(paid.c.paid_amount, 0)
+    rows = db.execute(
+        select(
+            page.c.id,
+            page.c.number,
+            page.c.customer_id,
+            Customer.name.label("customer_name"),
+            page.c.period_from,
+            page.c.period_to,
+            page.c.status,
+            page.c.subtotal,
+            page.c.tax,
+            page.c.total,
+            paid_amount.label("paid_amount"),
+            (page.c.total - paid_amount).label("balance"),
+            func.coalesce(lines.c.line_count, 0).label("line_count"),
+            page.c.created_at,
+            page.c.total_count,
+        )
+        .select_from(page)
+        .outerjoin(Customer, Customer.id == page.c.customer_id)
+        .outerjoin(paid, paid.c.statement_id == page.c.id)
+        .outerjoin(lines, lines.c.statement_id == page.c.id)
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+    ).mappings().all()
+
+    if rows:
+        total_count = rows[0]["total_count"]
+    else:
+        # Past the last page the window has no rows to count
+        total_count = db.execute(
+            select(func.count()).select_from(page_query.subquery())
+        ).scalar() if skip else 0
+
+    return StatementSummaryPage(
+        items=[StatementSummary(**row) for row in rows],
+        total_count=total_count,
+        skip=skip,
+        limit=limit,
+    )
+
+
+@router.get("/statements/{statement_id}", response_model=StatementResponse)
+def get_statement(
+    statement_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Statement with its lines and payment balance"""
+    statement = (
+        db.query(StatementModel)
+        .filter(
+            StatementModel.id == statement_id,
+            StatementModel.org_id == current_user.org_id,
+        )
+        .first()
+    )
+    if not statement:
+        raise HTTPException(status_code=404, detail="Statement not found")
+
+    customer_name = db.query(Customer.name).filter(Customer.id == statement.customer_id).scalar()
+    paid_amount = Decimal(str(
+        db.query(func.coalesce(func.sum(PaymentAllocationModel.amount), 0))
+        .filter(PaymentAllocationModel.statement_id == statement.id)
+        .scalar()
+    ))
+
+    return StatementResponse(
+        id=statement.id,
+        number=statement.number,
+        customer_id=statement.customer_id,
+        customer_name=customer_name,
+        period_from=statement.period_from,
+        period_to=statement.period_to,
+        status=statement.status,
+        subtotal=statement.subtotal,
+        tax=statement.tax,
+        total=statement.total,
+        paid_amount=paid_amount,
+        balance=statement.total - paid_amount,
+        lines=_statement_line_rows(db, current_user.org_id, statement.id),
+    )
+
+
+@router.get("/statements", response_model=List[StatementResponse], dependencies=[Depends(report_request)])
 def list_statements(
     customer_id: Optional[int] = None,
     status: Optional[StatementStatus] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    """
+    Every statement with all lines (unpaginated)
+
+    Kept for existing clients; lists should use GET /statements/summary
+    and fetch lines per statement.
+    """
     query = db.query(StatementModel).filter(
         StatementModel.org_id == current_user.org_id
     )
@@ -294,7 +561,7 @@ def list_statements(
     return response_items
 
 
-@router.get("/statements/{statement_id}/pdf")
+@router.get("/statements/{statement_id}/pdf", dependencies=[Depends(report_request)])
 def download_statement_pdf(
     statement_id: int,
     current_user: User = Depends(get_current_user),
@@ -362,12 +629,11 @@ def download_statement_pdf(
         ],
     }
 
-    pdf_gen = StatementPDF()
-    pdf_buffer = pdf_gen.generate(statement_data)
+    pdf_bytes = pdf_render_service.render_sync(StatementPDF, statement_data)
 
     filename = f"statement_{statement.number}.pdf"
     return StreamingResponse(
-        pdf_buffer,
+        BytesIO(pdf_bytes),
         media_type="application/pdf",
         headers={
             "Content-Disposition": f"attachment; filename={filename}",
@@ -11,8 +11,12 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from app.core.database import get_db
+from app.core.database import get_db, report_request
 from app.core.security import get_current_user
+from app.services.price_resolver import price_resolver
+from app.services.subcontractor_summary import (
+    LEADERBOARD_SORT_KEYS, subcontractor_leaderboard, subcontractor_summary
+)
 from app.models import (
     Subcontractor, SubcontractorPriceList, User, UserRole, Organization, 
     Truck, Job, Expense
@@ -22,7 +26,7 @@ from app.schemas.subcontractors import (
     SubcontractorCreate, SubcontractorUpdate, SubcontractorResponse,
     SubcontractorDetailResponse, SubcontractorPriceListCreate, 
     SubcontractorPriceListUpdate, SubcontractorPriceListResponse,
-    SubcontractorPricePreview
+    SubcontractorPricePreview, SubcontractorLeaderboardEntry
 )
 
 router = APIRouter(prefix="/subcontractors", tags=["subcontractors"])
@@ -112,6 +116,35 @@ async def create_subcontractor(
     return subcontractor
 
 
+@router.get(
+    "/leaderboard",
+    response_model=List[SubcontractorLeaderboardEntry],
+    dependencies=[Depends(report_request)]
+)
+async def get_subcontractor_leaderboard(
+    from_date: Optional[str] = Query(None, regex="^\\d{4}-\\d{2}-\\d{2}$"),
+    to_date: Optional[str] = Query(None, regex="^\\d{4}-\\d{2}-\\d{2}$"),
+    sort_by: str = Query("profit", regex=f"^({'|'.join(LEADERBOARD_SORT_KEYS)})$"),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    דירוג קבלני משנה לתקופה - נסיעות, כמויות ורווחיות
+    
+    דוגמה:
+    GET /subcontractors/leaderboard?from_date=2026-01-01&to_date=2026-03-31&sort_by=profit
+    """
+    return subcontractor_leaderboard(
+        db,
+        current_user.org_id,
+        from_date=datetime.strptime(from_date, "%Y-%m-%d") if from_date else None,
+        to_date=datetime.strptime(to_date, "%Y-%m-%d") if to_date else None,
+        sort_by=sort_by,
+        limit=limit,
+    )
+
+
 @router.get("/{subcontractor_id}", response_model=SubcontractorDetailResponse)
 async def get_subcontractor(
     subcontractor_id: int,
@@ -206,6 +239,7 @@ async def delete_subcontractor(
     
     db.delete(subcontractor)
     db.commit()
+    price_resolver.invalidate(current_user.org_id)
     
     return {"message": "Subcontractor deleted successfully"}
 
@@ -338,6 +372,7 @@ async def create_subcontractor_price(
     db.add(price_list)
     db.commit()
     db.refresh(price_list)
+    price_resolver.invalidate(current_user.org_id)
     
     return price_list
 
@@ -371,6 +406,7 @@ async def update_subcontractor_price(
     
     db.commit()
     db.refresh(price_list)
+    price_resolver.invalidate(current_user.org_id)
     
     return price_list
 
@@ -419,35 +455,15 @@ async def preview_subcontractor_pricing(
     if not subcontractor:
         raise HTTPException(status_code=404, detail="Subcontractor not found")
     
-    # Get applicable price list
-    query = db.query(SubcontractorPriceList).filter(
-        and_(
-            SubcontractorPriceList.subcontractor_id == subcontractor_id,
-            SubcontractorPriceList.is_active == True,
-            SubcontractorPriceList.org_id == current_user.org_id
-        )
+    # Most specific active price list (truck > customer > general)
+    price_list = price_resolver.resolve_subcontractor(
+        db,
+        current_user.org_id,
+        subcontractor_id,
+        truck_id=truck_id,
+        customer_id=customer_id,
     )
     
-    # Filter by truck if specified
-    if truck_id:
-        query = query.filter(or_(
-            SubcontractorPriceList.truck_id == truck_id,
-            SubcontractorPriceList.truck_id == None
-        ))
-    
-    # Filter by customer if specified
-    if customer_id:
-        query = query.filter(or_(
-            SubcontractorPriceList.customer_id == customer_id,
-            SubcontractorPriceList.customer_id == None
-        ))
-    
-    # Get most specific price list (truck > customer > general)
-    price_list = query.order_by(
-        SubcontractorPriceList.truck_id.desc(),
-        SubcontractorPriceList.customer_id.desc()
-    ).first()
-    
     if not price_list:
         raise HTTPException(status_code=400, detail="No applicable price list found")
     
@@ -497,7 +513,7 @@ async def preview_subcontractor_pricing(
 # Subcontractor Reports
 # ============================================================================
 
-@router.get("/{subcontractor_id}/summary", response_model=dict)
+@router.get("/{subcontractor_id}/summary", response_model=dict, dependencies=[Depends(report_request)])
 async def get_subcontractor_summary(
     subcontractor_id: int,
     from_date: Optional[str] = Query(None, regex="^\\d{4}-\\d{2}-\\d{2}$"),
@@ -523,38 +539,14 @@ async def get_subcontractor_summary(
     if not subcontractor:
         raise HTTPException(status_code=404, detail="Subcontractor not found")
     
-    # Build date filters
-    date_filters = []
-    if from_date:
-        date_filters.append(Job.scheduled_date >= datetime.strptime(from_date, "%Y-%m-%d"))
-    if to_date:
-        date_filters.append(Job.scheduled_date <= datetime.strptime(to_date, "%Y-%m-%d"))
-    
-    # Get jobs
-    jobs_query = db.query(Job).filter(
-        and_(
-            Job.subcontractor_id == subcontractor_id,
-            Job.is_subcontractor == True,
-            Job.org_id == current_user.org_id,
-            *date_filters
-        )
+    summary = subcontractor_summary(
+        db,
+        current_user.org_id,
+        subcontractor_id,
+        from_date=datetime.strptime(from_date, "%Y-%m-%d") if from_date else None,
+        to_date=datetime.strptime(to_date, "%Y-%m-%d") if to_date else None,
     )
     
-    jobs = jobs_query.all()
-    
-    total_jobs = len(jobs)
-    total_qty = sum(j.actual_qty or j.planned_qty or 0 for j in jobs)
-    
-    # CRITICAL: Use manual_override_total if exists for company pricing
-    # This ensures reports reflect the actual billing to customer
-    total_company_price = sum(
-        (j.manual_override_total or j.pricing_total or 0) 
-        for j in jobs
-    )
-    total_subcontractor_price = sum(j.subcontractor_price_total or 0 for j in jobs)
-    profit = total_company_price - total_subcontractor_price
-    profit_margin = (profit / total_company_price * 100) if total_company_price > 0 else 0
-    
     return {
         "subcontractor_id": subcontractor_id,
         "subcontractor_name": subcontractor.name,
@@ -562,18 +554,5 @@ async def get_subcontractor_summary(
             "from": from_date,
             "to": to_date
         },
-        "statistics": {
-            "total_jobs": total_jobs,
-            "total_quantity": float(total_qty),
-            "jobs_by_status": {
-                status.value: len([j for j in jobs if j.status.value == status.value])
-                for status in [j.status for j in jobs]
-            }
-        },
-        "financials": {
-            "total_company_price": float(total_company_price),
-            "total_subcontractor_price": float(total_subcontractor_price),
-            "profit": float(profit),
-            "profit_margin_pct": float(profit_margin)
-        }
+        **summary
     }
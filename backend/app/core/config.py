@@ -9,6 +9,26 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 10  # Wait for a free connection before failing the request
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this on checkout
+    DB_POOL_PRE_PING: bool = False  # A round trip on every checkout; recycle covers idle server timeouts
+    BACKGROUND_DB_POOL_SIZE: int = 2  # Scheduler jobs and billing runs, kept off the request pool
+    BACKGROUND_DB_MAX_OVERFLOW: int = 2
+    PROGRESS_DB_POOL_SIZE: int = 1  # Billing run progress writes; skipped rather than queued when busy
+    DB_PROGRESS_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # API requests
+    DB_REPORT_STATEMENT_TIMEOUT_MS: int = 120000  # Reports, statement generation, PDFs, repricing
+    DB_BACKGROUND_STATEMENT_TIMEOUT_MS: int = 600000
+    DB_SLOW_QUERY_MS: int = 500  # Counted and logged per endpoint on /metrics
+    
+    # Async database path (asyncpg) for the hottest endpoints - off by default
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DB_POOL_SIZE: int = 10
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+    ASYNC_DB_POOL_TIMEOUT_SECONDS: int = 10  # Wait for a free connection before failing the request
+    ASYNC_DB_STATEMENT_TIMEOUT_MS: int = 15000
     
     # JWT
     JWT_SECRET_KEY: str
@@ -21,6 +41,11 @@ class Settings(BaseSettings):
     S3_SECRET_KEY: str = ""
     S3_BUCKET: str = "fleet-uploads"
     S3_REGION: str = "us-east-1"
+    S3_MULTIPART_PART_SIZE_MB: int = 8  # S3 minimum is 5
+    S3_MULTIPART_THRESHOLD_MB: int = 16  # upload_file() switches to multipart above this
+    S3_TRANSFER_CONCURRENCY: int = 4  # Parts in flight per upload
+    S3_MAX_POOL_CONNECTIONS: int = 32  # boto3 HTTP connection pool, shared by all threads
+    STORAGE_IO_WORKERS: int = 16  # Threads behind async_storage (bounds concurrent storage calls)
     
     # API
     API_V1_PREFIX: str = "/api"
@@ -47,10 +72,43 @@ class Settings(BaseSettings):
     VAPID_PUBLIC_KEY: str = ""
     VAPID_PRIVATE_KEY: str = ""
     VAPID_SUBJECT: str = "mailto:support@truckflow.site"
+    PUSH_MAX_WORKERS: int = 16  # Concurrent sends per fan-out batch
+    PUSH_TIMEOUT_SECONDS: int = 10
+    
+    # Alerts
+    ALERT_UNREAD_COUNT_TTL_SECONDS: int = 30  # Max staleness of cached badge counts
+    ALERT_STREAM_PG_NOTIFY: bool = False  # Fan out alert events across workers via Postgres LISTEN/NOTIFY
+    ALERT_STREAM_QUEUE_SIZE: int = 100  # Pending events per stream connection before dropping
+    ALERT_STREAM_HEARTBEAT_SECONDS: int = 15
+    
+    # Access log (sampled, written off the request path)
+    ACCESS_LOG_SAMPLE_RATE: float = 0.01  # Share of requests logged; 5xx and slow requests always are
+    ACCESS_LOG_SLOW_MS: int = 1000
+    ACCESS_LOG_QUEUE_SIZE: int = 10000  # Records waiting for the writer thread before new ones are dropped
+    
+    # Auth
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # Max staleness of cached user -> driver
+    
+    # Pricing
+    PRICE_CACHE_TTL_SECONDS: int = 60  # Max staleness of cached price lists (writes from other workers)
+    
+    # Share links
+    SHARE_LINK_CACHE_SIZE: int = 10000  # Resolved short ids kept per worker (LRU)
+    SHARE_LINK_CACHE_TTL_SECONDS: int = 60  # Max staleness of a cached link in other workers (capped at 4 min)
+    SHARE_LINK_NEGATIVE_TTL_SECONDS: int = 10  # How long an unknown short id is remembered
+
+    # PDF rendering (process pool)
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_MAX_QUEUE: int = 16  # Queued + running renders before new ones get 503
+    PDF_RENDER_TIMEOUT_SECONDS: int = 30
+    DELIVERY_NOTE_CACHE_ENABLED: bool = True  # Rendered delivery notes kept in storage, keyed by content hash
     
     # File Upload
     MAX_FILE_SIZE_MB: int = 10
     ALLOWED_FILE_TYPES: str = "image/jpeg,image/png,image/gif,application/pdf"
+    IMAGE_VARIANT_WORKERS: int = 2
+    IMAGE_THUMBNAIL_PX: int = 320
+    IMAGE_WEB_PX: int = 1600
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 50
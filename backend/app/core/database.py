@@ -1,18 +1,170 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Callable, Iterable, Set
 from app.core.config import settings
+from app.core.db_metrics import MeteredQueuePool, instrument_engine
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+def _create_engine(
+    pool_name: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: int,
+    pool_timeout: float = settings.DB_POOL_TIMEOUT_SECONDS,
+):
+    engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=MeteredQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # The pool's default timeout is set once per connection, not per transaction
+        connect_args={"options": f"-c statement_timeout={statement_timeout_ms}"},
+    )
+    instrument_engine(engine)
+    return engine
+
+
+engine = _create_engine(
+    "api", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_STATEMENT_TIMEOUT_MS
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Scheduler jobs and billing runs get their own small pool so they never
+# take connections from web requests
+background_engine = _create_engine(
+    "background",
+    settings.BACKGROUND_DB_POOL_SIZE,
+    settings.BACKGROUND_DB_MAX_OVERFLOW,
+    settings.DB_BACKGROUND_STATEMENT_TIMEOUT_MS,
+)
+BackgroundSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=background_engine, info={"endpoint": "background"}
+)
+
+# Billing run progress: a connection of its own, off the background pool.
+# pool_timeout=0 fails at once when it is busy, so a run holding the org's
+# billing lock never waits on a progress update
+progress_engine = _create_engine(
+    "progress",
+    settings.PROGRESS_DB_POOL_SIZE,
+    0,
+    settings.DB_PROGRESS_STATEMENT_TIMEOUT_MS,
+    pool_timeout=0,
+)
+ProgressSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=progress_engine, info={"endpoint": "progress"}
+)
+
 Base = declarative_base()
 
 
-def get_db():
+def async_database_url(url: str):
+    """The same database URL with the asyncpg driver."""
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+# Opt-in async engine (ASYNC_DB_ENABLED) for endpoints ported to AsyncSession.
+# asyncpg is only imported when it is switched on.
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=settings.ASYNC_DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=True,
+        connect_args={
+            "server_settings": {"statement_timeout": str(settings.ASYNC_DB_STATEMENT_TIMEOUT_MS)},
+        },
+    )
+    # Objects stay usable after commit: lazy refreshes can't run outside the greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@event.listens_for(Session, "after_begin")
+def _label_transaction(session, transaction, connection) -> None:
+    """Tag the connection with the session's endpoint and apply its statement_timeout"""
+    endpoint = session.info.get("endpoint")
+    if endpoint:
+        connection.info["endpoint"] = endpoint
+    statement_timeout_ms = session.info.get("statement_timeout_ms")
+    if statement_timeout_ms:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}")
+
+
+def register_commit_invalidation(
+    key: str,
+    collect: Callable[[Session, Any], Iterable],
+    apply: Callable[[Set], None],
+) -> None:
+    """
+    Invalidate a process cache once the transaction that changed its rows commits.
+
+    After each flush, collect(session, obj) maps every new, dirty and deleted
+    object to the cache keys it affects; they accumulate in session.info[key].
+    On commit apply() gets them all at once, on rollback they are dropped, so
+    a cache never forgets data that is still (or again) current.
+    """
+    def _collect(session, flush_context) -> None:
+        pending = session.info.setdefault(key, set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            pending.update(collect(session, obj))
+
+    def _apply(session) -> None:
+        pending = session.info.pop(key, None)
+        if pending:
+            apply(pending)
+
+    def _discard(session) -> None:
+        session.info.pop(key, None)
+
+    event.listen(Session, "after_flush", _collect)
+    event.listen(Session, "after_commit", _apply)
+    event.listen(Session, "after_rollback", _discard)
+
+
+def defer_invalidation(session: Session, key: str, values: Iterable) -> None:
+    """Queue cache keys for a register_commit_invalidation() hook, e.g. after a Core INSERT"""
+    session.info.setdefault(key, set()).update(values)
+
+
+def report_request(request: Request) -> None:
+    """
+    Route dependency for reports, exports and PDFs: run the request's
+    queries under DB_REPORT_STATEMENT_TIMEOUT_MS instead of the default.
+
+    Usage:
+        @router.get("/reports/x", dependencies=[Depends(report_request)])
+    """
+    request.state.statement_timeout_ms = settings.DB_REPORT_STATEMENT_TIMEOUT_MS
+
+
+def get_db(request: Request):
     """Dependency to get database session."""
     db = SessionLocal()
+    route = request.scope.get("route")
+    db.info["endpoint"] = f"{request.method} {route.path}" if route else request.url.path
+    db.info["statement_timeout_ms"] = getattr(request.state, "statement_timeout_ms", None)
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an AsyncSession, or None when ASYNC_DB_ENABLED is off."""
+    if AsyncSessionLocal is None:
+        yield None
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,174 @@
+"""
+Database metrics - connection pool and per-endpoint query statistics
+
+- MeteredQueuePool times every checkout and counts the ones that had to
+  wait for a connection (pool and overflow exhausted) or timed out.
+- Cursor events time every statement and attribute it to the endpoint
+  that opened the session ("GET /api/jobs/{job_id}", "background", ...).
+  Statements slower than DB_SLOW_QUERY_MS are counted, logged, and the
+  latest ones kept as samples.
+
+Exposed on GET /metrics.
+"""
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from typing import Dict
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SAMPLES = 50
+UNLABELED = "unlabeled"
+
+
+class DatabaseMetrics:
+    """Process-wide counters, guarded by one lock"""
+
+    def __init__(self, slow_query_ms: int):
+        self.slow_query_ms = slow_query_ms
+        self._pools: Dict[str, QueuePool] = {}
+        self._checkouts: Dict[str, dict] = {}
+        self._endpoints: Dict[str, dict] = {}
+        self._slow_samples = deque(maxlen=SLOW_QUERY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def register_pool(self, name: str, pool: QueuePool) -> None:
+        with self._lock:
+            self._pools[name] = pool
+            self._checkouts.setdefault(name, {
+                "checkouts": 0, "waits": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0,
+            })
+
+    def record_checkout(self, pool_name: str, elapsed_ms: float, waited: bool, timed_out: bool) -> None:
+        with self._lock:
+            stats = self._checkouts[pool_name]
+            stats["checkouts"] += 1
+            if waited:
+                stats["waits"] += 1
+                stats["wait_ms_total"] += elapsed_ms
+                stats["wait_ms_max"] = max(stats["wait_ms_max"], elapsed_ms)
+            if timed_out:
+                stats["timeouts"] += 1
+
+    def record_query(self, endpoint: str, elapsed_ms: float, statement: str) -> None:
+        slow = elapsed_ms >= self.slow_query_ms
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    "queries": 0, "slow_queries": 0, "total_ms": 0.0, "max_ms": 0.0,
+                }
+            stats["queries"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            if slow:
+                stats["slow_queries"] += 1
+                self._slow_samples.append({
+                    "endpoint": endpoint,
+                    "ms": round(elapsed_ms, 1),
+                    "statement": " ".join(statement.split())[:300],
+                    "at": time.time(),
+                })
+        if slow:
+            logger.warning("Slow query (%.0f ms) in %s", elapsed_ms, endpoint)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pools = {
+                name: {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "max_overflow": pool._max_overflow,
+                    **{key: round(value, 1) if isinstance(value, float) else value
+                       for key, value in self._checkouts[name].items()},
+                }
+                for name, pool in self._pools.items()
+            }
+            endpoints = {
+                name: {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                    "mean_ms": round(stats["total_ms"] / stats["queries"], 2),
+                }
+                for name, stats in sorted(self._endpoints.items())
+            }
+            slow = list(self._slow_samples)
+        return {
+            "pools": pools,
+            "endpoints": endpoints,
+            "slow_query_ms": self.slow_query_ms,
+            "slow_queries": slow,
+        }
+
+    def reset(self) -> None:
+        """Zero the counters (pool gauges are live and unaffected)"""
+        with self._lock:
+            for name in self._checkouts:
+                self._checkouts[name] = {
+                    "checkouts": 0, "waits": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0,
+                }
+            self._endpoints.clear()
+            self._slow_samples.clear()
+
+
+db_metrics = DatabaseMetrics(slow_query_ms=settings.DB_SLOW_QUERY_MS)
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that reports checkout waits to db_metrics (named by pool_logging_name)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        db_metrics.register_pool(self._metrics_name, self)
+
+    @property
+    def _metrics_name(self) -> str:
+        return self.logging_name or "default"
+
+    def _do_get(self):
+        # Same condition QueuePool._do_get blocks on: no idle connection, no overflow left
+        waited = self._max_overflow > -1 and self._overflow >= self._max_overflow and self.checkedin() == 0
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            db_metrics.record_checkout(
+                self._metrics_name, (time.perf_counter() - started) * 1000, waited, timed_out
+            )
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on the engine and attribute it to connection.info["endpoint"]"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        db_metrics.record_query(
+            conn.info.get("endpoint", UNLABELED), (time.perf_counter() - started) * 1000, statement
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_query(context):
+        # after_cursor_execute does not fire for a failed statement
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    @event.listens_for(engine, "checkin")
+    def _clear_label(dbapi_connection, connection_record):
+        connection_record.info.pop("endpoint", None)
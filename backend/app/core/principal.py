@@ -0,0 +1,160 @@
+"""
+Request principal - who is calling, resolved once per request
+
+TenantMiddleware already decodes the JWT (user, org, role). The principal
+adds the caller's driver_id, looked up through a short-TTL process cache
+keyed by user_id, and is stored on request.state so every dependency and
+endpoint in the request shares it.
+
+The cache is invalidated from Session events whenever a User or Driver row
+is inserted, updated or deleted through the ORM and the transaction
+commits. The TTL bounds staleness from bulk UPDATEs and other
+worker processes.
+
+Usage in endpoints:
+    principal = get_principal(request, db)
+    if principal.is_driver:
+        query = query.filter(Job.driver_id == principal.driver_id)
+"""
+from fastapi import Request
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Set, Tuple
+import threading
+import time
+
+from app.core.config import settings
+from app.core.database import register_commit_invalidation
+from app.models import Driver, User
+
+# (driver_id, cached_until)
+_Entry = Tuple[Optional[int], float]
+
+
+class Principal:
+    """Authenticated caller for the current request"""
+
+    __slots__ = ("user_id", "org_id", "org_role", "is_super_admin", "driver_id")
+
+    def __init__(
+        self,
+        user_id: Optional[int],
+        org_id,
+        org_role: str,
+        is_super_admin: bool,
+        driver_id: Optional[int],
+    ):
+        self.user_id = user_id
+        self.org_id = org_id
+        self.org_role = org_role
+        self.is_super_admin = is_super_admin
+        self.driver_id = driver_id
+
+    @property
+    def is_driver(self) -> bool:
+        return str(self.org_role).lower() == "driver"
+
+
+class PrincipalCache:
+    """user_id -> driver_id with a TTL"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, _Entry] = {}
+        # invalidate() bumps this, so a lookup that straddled one is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _query(user_id: int):
+        return select(Driver.id).where(Driver.user_id == user_id).limit(1)
+
+    def _cached(self, user_id: int) -> Tuple[Optional[_Entry], int]:
+        with self._lock:
+            return self._entries.get(user_id), self._generation
+
+    def _store(self, user_id: int, generation: int, driver_id: Optional[int]) -> Optional[int]:
+        with self._lock:
+            if self._generation == generation:
+                self._entries[user_id] = (driver_id, time.monotonic() + self.ttl_seconds)
+        return driver_id
+
+    def get(self, db: Session, user_id: int) -> Optional[int]:
+        entry, generation = self._cached(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return self._store(user_id, generation, db.execute(self._query(user_id)).scalar())
+
+    async def get_async(self, db: AsyncSession, user_id: int) -> Optional[int]:
+        """get() through an AsyncSession"""
+        entry, generation = self._cached(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return self._store(user_id, generation, (await db.execute(self._query(user_id))).scalar())
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user, or everyone"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def _build_principal(request: Request, driver_id: Optional[int]) -> Principal:
+    principal = Principal(
+        user_id=getattr(request.state, "user_id", None),
+        org_id=getattr(request.state, "org_id", None),
+        org_role=getattr(request.state, "org_role", "user"),
+        is_super_admin=getattr(request.state, "is_super_admin", False),
+        driver_id=driver_id,
+    )
+    request.state.principal = principal
+    return principal
+
+
+def get_principal(request: Request, db: Session) -> Principal:
+    """The request's principal, built on first use and reused afterwards"""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    user_id = getattr(request.state, "user_id", None)
+    driver_id = principal_cache.get(db, user_id) if user_id else None
+    return _build_principal(request, driver_id)
+
+
+async def get_principal_async(request: Request, db: AsyncSession) -> Principal:
+    """get_principal() for endpoints on the async database path"""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
+    user_id = getattr(request.state, "user_id", None)
+    driver_id = await principal_cache.get_async(db, user_id) if user_id else None
+    return _build_principal(request, driver_id)
+
+
+# --- Invalidation -----------------------------------------------------------
+
+def _affected_user_ids(session, obj) -> Set[int]:
+    if isinstance(obj, User):
+        return {obj.id} if obj.id else set()
+    if isinstance(obj, Driver):
+        # A driver re-linked to another user affects the previous user too
+        history = inspect(obj).attrs.user_id.history
+        return {user_id for user_id in (obj.user_id, *history.deleted) if user_id}
+    return set()
+
+
+def _invalidate_principals(user_ids: Set[int]) -> None:
+    for user_id in user_ids:
+        principal_cache.invalidate(user_id)
+
+
+register_commit_invalidation("principal_cache_pending", _affected_user_ids, _invalidate_principals)
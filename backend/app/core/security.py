@@ -2,10 +2,11 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.database import get_db
 
 security = HTTPBearer()
 
@@ -68,35 +69,38 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
+def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(lambda: None)  # Will be properly injected
+    db: Session = Depends(get_db),
 ):
-    """Get current user from JWT token."""
-    from app.core.database import get_db
+    """
+    Get current user from JWT token.
+
+    TenantMiddleware has already verified the bearer token and stored its
+    subject on request.state, so the token is only decoded again when the
+    middleware did not run (e.g. public paths). The user is loaded through
+    the request's own session instead of opening a second one.
+    """
     from app.models import User
-    
-    # Override db if it's None
-    if db is None:
-        db = next(get_db())
-    
-    token = credentials.credentials
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: int = payload.get("sub")
+
+    user_id = getattr(request.state, "user_id", None)
     if user_id is None:
-        raise credentials_exception
-    
+        payload = decode_access_token(credentials.credentials)
+        if payload is None:
+            raise credentials_exception
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise credentials_exception
+
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
-    
+
     return user
@@ -1,11 +1,21 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.core.config import settings
+from app.core.database import async_engine
+from app.core.db_metrics import db_metrics
 from app.api.v1.api import api_router
-from app.middleware.tenant import tenant_middleware
+from app.middleware.access_log import access_log
+from app.middleware.tenant import TenantMiddleware, is_super_admin
 from app.scheduler import init_scheduler, shutdown_scheduler
+from app.services.alert_hub import alert_hub
+from app.services.delivery_note_cache import delivery_note_cache
+from app.services.image_variants import image_variant_service
+from app.services.pdf_render_service import PDFRenderError, pdf_render_service
+from app.services.share_links import share_link_resolver
+from app.services.storage import async_storage
 from pathlib import Path
 import logging
 
@@ -48,7 +58,7 @@ app.add_middleware(CORSStaticFilesMiddleware)
 
 # Add tenant middleware (auth context for API routes)
 # This runs AFTER CORS, so OPTIONS requests are already handled
-app.add_middleware(BaseHTTPMiddleware, dispatch=tenant_middleware)
+app.add_middleware(TenantMiddleware)
 
 # Mount static files for uploads (MVP: local storage)
 uploads_dir = Path("/app/uploads")
@@ -61,6 +71,11 @@ app.mount("/api/uploads", StaticFiles(directory=str(uploads_dir)), name="api_upl
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
+@app.exception_handler(PDFRenderError)
+async def pdf_render_error_handler(request: Request, exc: PDFRenderError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+
 @app.get("/")
 async def root():
     return {
@@ -76,12 +91,38 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Connection pool, per-endpoint query and background service metrics (super admin only)"""
+    if not is_super_admin(request):
+        raise HTTPException(status_code=403, detail="Super admin access required")
+    return {
+        **db_metrics.snapshot(),
+        "services": {
+            "pdf_render": pdf_render_service.stats(),
+            "delivery_note_cache": delivery_note_cache.stats(),
+            "access_log": access_log.stats(),
+            "image_variants": image_variant_service.stats(),
+            "storage_io": async_storage.stats(),
+            "share_links": share_link_resolver.stats(),
+        },
+    }
+
+
 # Lifecycle events
 @app.on_event("startup")
 async def startup_event():
     """Initialize scheduler on application startup"""
     logger.info("🚀 Application starting up...")
+    access_log.start()
     init_scheduler()
+    alert_hub.start_listener()
+    try:
+        requeued = image_variant_service.requeue_pending()
+        if requeued:
+            logger.info(f"Requeued {requeued} pending image variant jobs")
+    except Exception as e:
+        logger.warning(f"Could not requeue pending image variants: {e}")
     logger.info("✅ Startup complete - Alerts system active")
 
 
@@ -90,4 +131,12 @@ async def shutdown_event():
     """Shutdown scheduler gracefully"""
     logger.info("🛑 Application shutting down...")
     shutdown_scheduler()
+    alert_hub.stop_listener()
+    pdf_render_service.shutdown()
+    image_variant_service.shutdown()
+    delivery_note_cache.shutdown()
+    async_storage.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    access_log.stop()
     logger.info("✅ Shutdown complete")
@@ -0,0 +1,101 @@
+"""
+Access Log - sampled, structured request logging off the request path
+
+Request handlers only build a small dict and put it on an in-memory queue;
+a QueueListener thread formats it as one JSON line and writes it out. When
+the queue is full the record is dropped (and counted) instead of blocking
+the event loop.
+
+Sampling: ACCESS_LOG_SAMPLE_RATE of ordinary requests are logged; 5xx
+responses and requests slower than ACCESS_LOG_SLOW_MS always are.
+"""
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+
+from app.core.config import settings
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({"ts": self.formatTime(record), **record.access}, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of raising when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The record only carries plain data; skip the base class' eager formatting
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AccessLog:
+    """Sampling front-end for the app.access logger"""
+
+    def __init__(self, sample_rate: float, slow_ms: int, queue_size: int):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._handler = _DroppingQueueHandler(self._queue)
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+
+        self.logger = logging.getLogger("app.access")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.addHandler(self._handler)
+
+    def should_log(self, status_code: int, duration_ms: float) -> bool:
+        if status_code >= 500 or (self.slow_ms and duration_ms >= self.slow_ms):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def log(self, **fields) -> None:
+        self.logger.info("access", extra={"access": fields})
+
+    def start(self, handler: Optional[logging.Handler] = None) -> None:
+        """Start the writer thread (stdout unless a handler is given)"""
+        with self._lock:
+            if self._listener is not None:
+                return
+            if handler is None:
+                handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(_JsonFormatter())
+            self._listener = QueueListener(self._queue, handler, respect_handler_level=False)
+            self._listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "queued": self._queue.qsize(),
+            "dropped": self._handler.dropped,
+        }
+
+
+access_log = AccessLog(
+    sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+    slow_ms=settings.ACCESS_LOG_SLOW_MS,
+    queue_size=settings.ACCESS_LOG_QUEUE_SIZE,
+)
@@ -4,13 +4,52 @@ Tenant Middleware - Extract org_id from JWT and inject into request.state
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from jose import jwt, JWTError
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.config import settings
+from app.middleware.access_log import access_log
 from uuid import UUID
 from typing import Optional, Dict, Union
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Exact paths that need no token
+PUBLIC_PATHS = frozenset({
+    "/",  # Root path
+    "/health",
+    "/api/health",  # Health endpoint with API prefix
+    "/docs",
+    "/api/docs",  # Swagger docs with API prefix
+    "/openapi.json",
+    "/api/openapi.json",  # OpenAPI schema with prefix
+    "/redoc",
+    "/api/redoc",  # ReDoc with prefix
+    "/api/auth/login",  # Actual route path (API_V1_PREFIX = /api)
+    "/api/auth/driver-login",  # Driver phone login
+    "/api/v1/auth/login",  # Just in case
+    "/api/v1/auth/driver-login",  # Driver phone login v1
+    "/api/phone-auth/send-otp",  # Phone OTP sending
+    "/api/phone-auth/verify-otp",  # Phone OTP verification
+    "/api/phone-auth/resend-otp",  # Phone OTP resend
+    "/api/phone-auth/login-with-password",  # Password login (dev mode)
+})
+
+# Path prefixes that need no token
+PUBLIC_PREFIXES = (
+    "/api/share/",  # Public PDF sharing
+    "/share/",
+    "/uploads/",  # Uploaded files (static files served by FastAPI)
+    "/api/uploads/",
+    "/static",
+)
+
+
+def is_public_path(path: str) -> bool:
+    return path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIXES)
+
+
 def _error_response(
     status_code: int,
     detail: str,
@@ -22,153 +61,167 @@ def _error_response(
     return JSONResponse(status_code=status_code, content=content)
 
 
-async def tenant_middleware(request: Request, call_next):
-    """
-    Extract org_id from JWT token and inject into request.state
-    
-    Features:
-    - Skip public endpoints (health, docs, login)
-    - Skip OPTIONS requests (CORS preflight)
-    - Extract org_id from JWT payload
-    - Support Super Admin impersonation via X-Org-Id header
-    - Inject org_id, user_id, is_super_admin into request.state
-    """
-    logger.info(f"Tenant middleware processing: {request.method} {request.url.path}")
-    
-    # Skip OPTIONS requests (CORS preflight)
-    if request.method == "OPTIONS":
-        return await call_next(request)
-    
-    # Skip public endpoints
-    public_paths = [
-        "/",  # Root path
-        "/health",
-        "/api/health",  # Health endpoint with API prefix
-        "/docs",
-        "/api/docs",  # Swagger docs with API prefix
-        "/openapi.json",
-        "/api/openapi.json",  # OpenAPI schema with prefix
-        "/redoc",
-        "/api/redoc",  # ReDoc with prefix
-        "/api/auth/login",  # Actual route path (API_V1_PREFIX = /api)
-        "/api/auth/driver-login",  # Driver phone login
-        "/api/v1/auth/login",  # Just in case
-        "/api/v1/auth/driver-login",  # Driver phone login v1
-        "/api/phone-auth/send-otp",  # Phone OTP sending
-        "/api/phone-auth/verify-otp",  # Phone OTP verification
-        "/api/phone-auth/resend-otp",  # Phone OTP resend
-        "/api/phone-auth/login-with-password",  # Password login (dev mode)
-    ]
-    
-    # Allow all share URLs (public PDF sharing)
-    if request.url.path.startswith("/api/share/") or request.url.path.startswith("/share/"):
-        return await call_next(request)
-    
-    # Allow access to uploaded files (static files served by FastAPI)
-    if request.url.path.startswith("/uploads/") or request.url.path.startswith("/api/uploads/"):
-        return await call_next(request)
-    
-    if request.url.path in public_paths or request.url.path.startswith("/static"):
-        return await call_next(request)
-    
-    # Get token from Authorization header OR query parameter (for PDF links)
-    auth_header = request.headers.get("Authorization")
-    token = None
-    
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-    else:
-        # Check for token in query parameter (for shareable PDF links)
-        token = request.query_params.get("token")
-    
+def _bearer_token(scope) -> Optional[str]:
+    """Token from the Authorization header, or the ?token= query parameter (PDF links)"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            auth_header = value.decode("latin-1")
+            if auth_header.startswith("Bearer "):
+                return auth_header.split(" ")[1]
+            break
+    return QueryParams(scope["query_string"]).get("token")
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _authenticate(scope) -> Union[Dict, JSONResponse]:
+    """Request state for the token in scope, or the error response to send"""
+    token = _bearer_token(scope)
     if not token:
         return _error_response(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing or invalid authorization header",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     try:
-        # Decode JWT
         payload = jwt.decode(
-            token, 
-            settings.JWT_SECRET_KEY, 
+            token,
+            settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        
-        org_id_value = payload.get("org_id")
-        is_super_admin = payload.get("is_super_admin", False)
-        user_id = payload.get("sub")
-        
-        # Debug log
-        logger.error(f"Debug: org_id_value = '{org_id_value}', type = {type(org_id_value)}")
-        
-        if org_id_value is None:
-            logger.error(f"Token missing org_id for user {user_id}")
-            return _error_response(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Token missing org_id - please login again"
-            )
-        
-        # Convert org_id - support both Integer and UUID formats
-        try:
-            # Try Integer first (current schema)
-            org_id = int(org_id_value)
-            logger.info(f"Converted org_id to Integer: {org_id}")
-        except (ValueError, TypeError) as int_error:
-            # Fall back to UUID (future schema)
-            try:
-                org_id = UUID(org_id_value)
-                logger.info(f"Converted org_id to UUID: {org_id}")
-            except (ValueError, TypeError) as uuid_error:
-                logger.error(f"Failed to convert org_id '{org_id_value}'. Int error: {int_error}, UUID error: {uuid_error}")
-                return _error_response(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid org_id format in token"
-                )
-        
-        # Super Admin impersonation: Check X-Org-Id header
-        if is_super_admin:
-            impersonate_org_id = request.headers.get("X-Org-Id")
-            if impersonate_org_id:
-                try:
-                    # Try UUID first
-                    org_id = UUID(impersonate_org_id)
-                    logger.info(f"Super Admin {user_id} impersonating org {org_id}")
-                except (ValueError, TypeError):
-                    # Fall back to Integer
-                    try:
-                        org_id = int(impersonate_org_id)
-                        logger.info(f"Super Admin {user_id} impersonating org {org_id}")
-                    except (ValueError, TypeError):
-                        return _error_response(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Invalid X-Org-Id header format"
-                        )
-        
-        # Inject into request state
-        request.state.org_id = org_id
-        request.state.user_id = int(user_id) if user_id else None
-        request.state.is_super_admin = is_super_admin
-        request.state.org_role = payload.get("org_role", "user")
-        
-        logger.debug(f"Request authorized: user={user_id}, org={org_id}, super_admin={is_super_admin}")
-        
     except JWTError as e:
-        logger.error(f"JWT decode error: {e}")
+        logger.warning("JWT decode error: %s", e)
         return _error_response(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token - please login again",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except Exception as e:
-        logger.error(f"Unexpected error in tenant middleware: {e}", exc_info=True)
+
+    org_id_value = payload.get("org_id")
+    is_super_admin = payload.get("is_super_admin", False)
+    user_id = payload.get("sub")
+
+    if org_id_value is None:
+        logger.warning("Token missing org_id for user %s", user_id)
         return _error_response(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Authentication error: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token missing org_id - please login again"
         )
-    
-    return await call_next(request)
+
+    # Convert org_id - support both Integer and UUID formats
+    try:
+        # Try Integer first (current schema)
+        org_id = int(org_id_value)
+    except (ValueError, TypeError):
+        # Fall back to UUID (future schema)
+        try:
+            org_id = UUID(org_id_value)
+        except (ValueError, TypeError):
+            logger.warning("Failed to convert org_id %r", org_id_value)
+            return _error_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid org_id format in token"
+            )
+
+    # Super Admin impersonation: Check X-Org-Id header
+    if is_super_admin:
+        impersonate_org_id = _header(scope, b"x-org-id")
+        if impersonate_org_id:
+            try:
+                # Try UUID first
+                org_id = UUID(impersonate_org_id)
+            except (ValueError, TypeError):
+                # Fall back to Integer
+                try:
+                    org_id = int(impersonate_org_id)
+                except (ValueError, TypeError):
+                    return _error_response(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid X-Org-Id header format"
+                    )
+            logger.info("Super Admin %s impersonating org %s", user_id, org_id)
+
+    return {
+        "org_id": org_id,
+        "user_id": int(user_id) if user_id else None,
+        "is_super_admin": is_super_admin,
+        "org_role": payload.get("org_role", "user"),
+    }
+
+
+class TenantMiddleware:
+    """
+    Extract org_id from JWT token and inject into request.state
+
+    Features:
+    - Skip public endpoints (health, docs, login)
+    - Skip OPTIONS requests (CORS preflight)
+    - Extract org_id from JWT payload
+    - Support Super Admin impersonation via X-Org-Id header
+    - Inject org_id, user_id, is_super_admin, org_role into request.state
+    - Sampled access log (see app.middleware.access_log)
+
+    Pure ASGI middleware: request.state is written straight into
+    scope["state"] and the response is streamed through untouched, without
+    the extra task and body queue BaseHTTPMiddleware puts on every request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response_status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
+
+        state = scope.setdefault("state", {})
+        try:
+            # Skip OPTIONS requests (CORS preflight) and public endpoints
+            if scope["method"] == "OPTIONS" or is_public_path(scope["path"]):
+                await self.app(scope, receive, send_with_status)
+                return
+
+            try:
+                auth = _authenticate(scope)
+            except Exception as e:
+                logger.error("Unexpected error in tenant middleware: %s", e, exc_info=True)
+                auth = _error_response(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Authentication error: {str(e)}"
+                )
+
+            if isinstance(auth, JSONResponse):
+                await auth(scope, receive, send_with_status)
+                return
+
+            state.update(auth)
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if access_log.should_log(response_status, duration_ms):
+                access_log.log(
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=response_status,
+                    duration_ms=round(duration_ms, 1),
+                    org_id=state.get("org_id"),
+                    user_id=state.get("user_id"),
+                )
 
 
 def get_current_org_id(request: Request) -> Union[int, UUID]:
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Numeric, Enum, JSON, Date, DECIMAL
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, Numeric, Enum, JSON, Date, DECIMAL, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.core.database import Base
 import enum
@@ -52,6 +52,14 @@ class StatementStatus(str, enum.Enum):
     PAID = "PAID"
 
 
+class BillingRunStatus(str, enum.Enum):
+    """Billing run lifecycle"""
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
 class Organization(Base):
     """Multi-tenant organization"""
     __tablename__ = "organizations"
@@ -403,6 +411,27 @@ class Job(Base):
     delivery_note = relationship("DeliveryNote", back_populates="job", uselist=False)
     files = relationship("JobFile", back_populates="job")
     share_urls = relationship("ShareUrl", back_populates="job")
+    
+    __table_args__ = (
+        # Keyset pagination for the dispatch board: org -> (scheduled_date, id)
+        Index('ix_jobs_org_scheduled_id', 'org_id', 'scheduled_date', 'id'),
+        # Board filters: org first, then status / driver / customer, then day
+        Index('ix_jobs_org_status_scheduled', 'org_id', 'status', 'scheduled_date'),
+        Index('ix_jobs_org_driver_scheduled', 'org_id', 'driver_id', 'scheduled_date'),
+        Index('ix_jobs_org_customer_scheduled', 'org_id', 'customer_id', 'scheduled_date'),
+        # Statement generation: delivered jobs per customer in a period
+        Index(
+            'ix_jobs_delivered_customer_scheduled',
+            'org_id', 'customer_id', 'scheduled_date',
+            postgresql_where=text("status = 'DELIVERED'"),
+        ),
+        # Subcontractor summary / leaderboard: subcontracted jobs per period
+        Index(
+            'ix_jobs_subcontractor_scheduled',
+            'org_id', 'subcontractor_id', 'scheduled_date',
+            postgresql_where=text("is_subcontractor"),
+        ),
+    )
 
 
 class JobStatusEvent(Base):
@@ -421,6 +450,10 @@ class JobStatusEvent(Base):
     
     # Relationships
     job = relationship("Job", back_populates="status_events")
+    
+    __table_args__ = (
+        Index('ix_job_status_events_job_time', 'job_id', 'event_time'),
+    )
 
 
 class DeliveryNote(Base):
@@ -467,8 +500,22 @@ class File(Base):
     filename = Column(String(255), nullable=False)
     mime_type = Column(String(100))
     size = Column(Integer)  # bytes
+    content_hash = Column(String(64))  # SHA-256 hex, for de-duplicating identical uploads
+    thumbnail_key = Column(String(500))  # Images only, set by the variant worker
+    web_key = Column(String(500))
+    variants_status = Column(String(20))  # PENDING, READY, FAILED; NULL = no variants
     uploaded_by = Column(Integer, ForeignKey("users.id"))
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # One row per content per org: concurrent identical uploads dedupe too
+        Index(
+            'ux_files_org_content_hash',
+            'org_id', 'content_hash',
+            unique=True,
+            postgresql_where=text("content_hash IS NOT NULL"),
+        ),
+    )
 
 
 class JobFile(Base):
@@ -493,7 +540,7 @@ class Statement(Base):
     id = Column(Integer, primary_key=True, index=True)
     org_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
-    number = Column(String(50), unique=True, nullable=False)
+    number = Column(String(50), nullable=False)  # Per-org, from document_counters
     period_from = Column(DateTime(timezone=True), nullable=False)
     period_to = Column(DateTime(timezone=True), nullable=False)
     status = Column(Enum(StatementStatus), default=StatementStatus.DRAFT)
@@ -506,6 +553,12 @@ class Statement(Base):
     
     # Relationships
     lines = relationship("StatementLine", back_populates="statement")
+    
+    __table_args__ = (
+        UniqueConstraint('org_id', 'number', name='uq_statements_org_number'),
+        # Statement list: newest first per org
+        Index('ix_statements_org_created_id', 'org_id', 'created_at', 'id'),
+    )
 
 
 class StatementLine(Base):
@@ -524,6 +577,45 @@ class StatementLine(Base):
     
     # Relationships
     statement = relationship("Statement", back_populates="lines")
+    
+    __table_args__ = (
+        Index('ix_statement_lines_statement_id', 'statement_id'),
+        # "Already billed" anti-join from jobs
+        Index('ix_statement_lines_job_id', 'job_id'),
+    )
+
+
+class DocumentCounter(Base):
+    """Per-org running number for each document type (statements, delivery notes)"""
+    __tablename__ = "document_counters"
+    
+    org_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    doc_type = Column(String(20), primary_key=True)  # ST / DN
+    next_value = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class BillingRun(Base):
+    """Bulk statement generation for every customer in a period, with progress"""
+    __tablename__ = "billing_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    org_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    period_from = Column(DateTime(timezone=True), nullable=False)
+    period_to = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String(20), nullable=False, default=BillingRunStatus.PENDING.value)
+    total_jobs = Column(Integer, nullable=False, default=0)
+    processed_jobs = Column(Integer, nullable=False, default=0)
+    statements_created = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    error = Column(Text)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index('ix_billing_runs_org_created', 'org_id', 'created_at'),
+    )
 
 
 class Payment(Base):
@@ -556,6 +648,10 @@ class PaymentAllocation(Base):
     
     # Relationships
     payment = relationship("Payment", back_populates="allocations")
+    
+    __table_args__ = (
+        Index('ix_payment_allocations_statement_id', 'statement_id'),
+    )
 
 
 class Expense(Base):
@@ -1,9 +1,9 @@
 """
 Alert model for notifications system
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 import enum
 
@@ -68,6 +68,19 @@ class AlertStatus(str, enum.Enum):
     RESOLVED = "RESOLVED"
 
 
+# Statuses that count as "open" for deduplication
+OPEN_ALERT_STATUSES = [AlertStatus.UNREAD.value, AlertStatus.READ.value]
+
+# ux_alerts_open_entity: at most one open sweep alert per (org, type, entity).
+# Only categories raised by the scheduler sweeps are constrained, so
+# realtime alerts (e.g. one per driver for the same job) are unaffected.
+# Bulk inserts target it with ON CONFLICT (...) WHERE ... DO NOTHING/UPDATE.
+OPEN_ENTITY_ALERT_INDEX_ELEMENTS = ['org_id', 'alert_type', 'entity_type', 'entity_id']
+OPEN_ENTITY_ALERT_INDEX_WHERE = text(
+    "status IN ('UNREAD', 'READ') AND category IN ('OPERATIONAL', 'MAINTENANCE')"
+)
+
+
 class Alert(Base):
     """Alert/Notification model"""
     __tablename__ = "alerts"
@@ -105,6 +118,27 @@ class Alert(Base):
     expires_at = Column(DateTime(timezone=True), nullable=True)
     alert_metadata = Column(JSONB, server_default='{}', nullable=True)
     
+    __table_args__ = (
+        # Per-user and per-role inbox / unread badge
+        Index('idx_alerts_org_user', 'org_id', 'created_for_user_id', 'status'),
+        Index('ix_alerts_org_role_status', 'org_id', 'created_for_role', 'status'),
+        Index('ix_alerts_org_created', 'org_id', 'created_at'),
+        # Dedup lookups: is there an open alert of this type for this entity?
+        Index(
+            'ix_alerts_open_entity',
+            'org_id', 'alert_type', 'entity_type', 'entity_id',
+            postgresql_where=text("status IN ('UNREAD', 'READ')"),
+        ),
+        Index(
+            'ux_alerts_open_entity',
+            *OPEN_ENTITY_ALERT_INDEX_ELEMENTS,
+            unique=True,
+            postgresql_where=OPEN_ENTITY_ALERT_INDEX_WHERE,
+        ),
+        # Expiry filter and cleanup
+        Index('idx_alerts_expiry', 'expires_at', postgresql_where=text('expires_at IS NOT NULL')),
+    )
+    
     def __repr__(self):
         return f"<Alert {self.id} {self.alert_type} {self.severity}>"
     
@@ -9,9 +9,7 @@ import logging
 
 from app.services.alert_jobs import (
     check_unassigned_jobs,
-    check_insurance_expiry,
-    check_test_expiry,
-    check_license_expiry,
+    scan_expiring_documents,
     cleanup_expired_alerts
 )
 
@@ -53,40 +51,18 @@ def init_scheduler():
     )
     logger.info("✓ Scheduled: check_unassigned_jobs (every 15 minutes)")
     
-    # Job 2: Check insurance expiry - Daily at 08:00
+    # Job 2: Check document expiry (insurance, test, license) - Daily at 08:00
     scheduler.add_job(
-        check_insurance_expiry,
+        scan_expiring_documents,
         trigger=CronTrigger(hour=8, minute=0),
-        id='check_insurance_expiry',
-        name='Check Insurance Expiry',
+        id='check_document_expiry',
+        name='Check Document Expiry',
         replace_existing=True,
         next_run_time=datetime.now()  # Run immediately on startup
     )
-    logger.info("✓ Scheduled: check_insurance_expiry (daily at 08:00)")
+    logger.info("✓ Scheduled: check_document_expiry (daily at 08:00)")
     
-    # Job 3: Check test expiry - Daily at 08:00
-    scheduler.add_job(
-        check_test_expiry,
-        trigger=CronTrigger(hour=8, minute=0),
-        id='check_test_expiry',
-        name='Check Test Expiry',
-        replace_existing=True,
-        next_run_time=datetime.now()  # Run immediately on startup
-    )
-    logger.info("✓ Scheduled: check_test_expiry (daily at 08:00)")
-    
-    # Job 4: Check license expiry - Daily at 08:00
-    scheduler.add_job(
-        check_license_expiry,
-        trigger=CronTrigger(hour=8, minute=0),
-        id='check_license_expiry',
-        name='Check License Expiry',
-        replace_existing=True,
-        next_run_time=datetime.now()  # Run immediately on startup
-    )
-    logger.info("✓ Scheduled: check_license_expiry (daily at 08:00)")
-    
-    # Job 5: Cleanup expired alerts - Daily at 02:00
+    # Job 3: Cleanup expired alerts - Daily at 02:00
     scheduler.add_job(
         cleanup_expired_alerts,
         trigger=CronTrigger(hour=2, minute=0),
@@ -98,7 +74,7 @@ def init_scheduler():
     
     # Start the scheduler
     scheduler.start()
-    logger.info("✅ APScheduler started successfully with 5 jobs")
+    logger.info("✅ APScheduler started successfully with 3 jobs")
     
     return scheduler
 
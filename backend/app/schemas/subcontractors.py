@@ -3,7 +3,7 @@ Pydantic schemas for Subcontractors
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 from datetime import datetime, date
 from decimal import Decimal
 from uuid import UUID
@@ -235,6 +235,20 @@ class SubcontractorReport(BaseModel):
     jobs: Optional[List[SubcontractorJobSummary]] = []
 
 
+class SubcontractorLeaderboardEntry(BaseModel):
+    """One subcontractor's totals for a period, ranked"""
+    rank: int
+    subcontractor_id: int
+    subcontractor_name: str
+    total_jobs: int
+    total_quantity: float
+    jobs_by_status: Dict[str, int]
+    total_company_price: float
+    total_subcontractor_price: float
+    profit: float
+    profit_margin_pct: float
+
+
 class SubcontractorPaymentSummary(BaseModel):
     """Payment summary for subcontractor"""
     subcontractor_id: int
@@ -0,0 +1,194 @@
+"""
+Alert Hub - in-process pub/sub for pushing alert events to streaming clients
+
+AlertService publishes an event after each commit; every /alerts/stream
+connection holds a subscription and receives the events visible to its user.
+
+With ALERT_STREAM_PG_NOTIFY enabled, events are sent through Postgres
+NOTIFY instead, and a listener thread in each worker relays them to that
+worker's local subscribers, so a client connected to any worker sees alerts
+created by any other worker or by the scheduler.
+"""
+from sqlalchemy import text
+from typing import Dict, Optional, Set, Union
+from uuid import UUID
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from app.core.config import settings
+from app.services.unread_counter import unread_counter
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "alert_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+
+# Event types
+ALERT_CREATED = "alert.created"
+ALERT_UPDATED = "alert.updated"
+ALERTS_CHANGED = "alerts.changed"  # bulk change - clients should refresh counts
+
+OrgId = Union[int, UUID]
+
+
+class Subscription:
+    """One streaming client: its identity and the queue it reads events from"""
+
+    def __init__(self, org_id: OrgId, user_id: Optional[int], user_role: Optional[str], max_queue: int):
+        self.org_id = str(org_id)
+        self.user_id = user_id
+        self.user_role = user_role
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def can_see(self, event: dict) -> bool:
+        alert = event.get("alert")
+        if not alert:
+            return True
+        user_id = alert.get("created_for_user_id")
+        role = alert.get("created_for_role")
+        if user_id is None and role is None:
+            return True
+        return (user_id is not None and user_id == self.user_id) or (
+            role is not None and role == self.user_role
+        )
+
+    def deliver(self, event: dict) -> None:
+        """Called on the subscriber's event loop"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop the event, its next count refresh catches up
+            logger.warning(f"Alert stream queue full for user {self.user_id}, dropping event")
+
+
+class AlertHub:
+    """Fan-out of alert events to local subscribers, optionally across workers"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # Subscriptions
+
+    def subscribe(self, org_id: OrgId, user_id: Optional[int], user_role: Optional[str]) -> Subscription:
+        sub = Subscription(org_id, user_id, user_role, settings.ALERT_STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(sub.org_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.org_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.org_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    # Publishing
+
+    def publish(self, event: dict) -> None:
+        """
+        Publish an event (safe to call from any thread, after commit)
+
+        event["org_id"] of None means every org (e.g. global cleanup).
+        """
+        if settings.ALERT_STREAM_PG_NOTIFY:
+            try:
+                self._notify(event)
+                return
+            except Exception as exc:
+                logger.warning(f"Alert NOTIFY failed, delivering locally only: {exc}")
+        self._dispatch_local(event)
+
+    def _notify(self, event: dict) -> None:
+        from app.core.database import engine
+
+        payload = json.dumps(event, default=str)
+        if len(payload.encode("utf-8")) > MAX_NOTIFY_PAYLOAD:
+            # Too big for NOTIFY: send a bulk-change marker instead
+            payload = json.dumps({"event": ALERTS_CHANGED, "org_id": event.get("org_id")}, default=str)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+            conn.commit()
+
+    def _dispatch_local(self, event: dict) -> None:
+        org_id = event.get("org_id")
+        with self._lock:
+            if org_id is None:
+                targets = [sub for subs in self._subscribers.values() for sub in subs]
+            else:
+                targets = list(self._subscribers.get(str(org_id), ()))
+        for sub in targets:
+            if sub.can_see(event):
+                try:
+                    sub.loop.call_soon_threadsafe(sub.deliver, event)
+                except RuntimeError:
+                    # Subscriber's loop already closed
+                    self.unsubscribe(sub)
+
+    # Cross-worker LISTEN
+
+    def start_listener(self) -> None:
+        """Start relaying NOTIFY events to local subscribers (no-op unless enabled)"""
+        if not settings.ALERT_STREAM_PG_NOTIFY or self._listener is not None:
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="alert-hub-listener", daemon=True)
+        self._listener.start()
+        logger.info(f"Alert hub listening on Postgres channel '{NOTIFY_CHANNEL}'")
+
+    def stop_listener(self) -> None:
+        if self._listener is None:
+            return
+        self._stop.set()
+        self._listener.join(timeout=10)
+        self._listener = None
+
+    def _listen(self) -> None:
+        from app.core.database import engine
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = engine.raw_connection()
+                dbapi_conn = conn.driver_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                while not self._stop.is_set():
+                    if select.select([dbapi_conn], [], [], 5) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        notify = dbapi_conn.notifies.pop(0)
+                        try:
+                            event = json.loads(notify.payload)
+                        except ValueError:
+                            logger.warning("Ignoring malformed alert NOTIFY payload")
+                            continue
+                        # The change may come from another worker: drop its cached counts
+                        unread_counter.invalidate(event.get("org_id"))
+                        self._dispatch_local(event)
+            except Exception as exc:
+                logger.error(f"Alert hub listener error, reconnecting: {exc}")
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                    except Exception:
+                        pass
+
+
+alert_hub = AlertHub()
@@ -2,325 +2,354 @@
 Background jobs for alert checking
 """
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import List
+from sqlalchemy import Integer, String, case, cast, exists, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
 import logging
+import re
+import time
 
-from app.core.database import SessionLocal
+from app.core.database import BackgroundSessionLocal
 from app.models import Job, Truck, Driver, Organization
-from app.models.alert import Alert, AlertType, AlertSeverity, AlertCategory
-from app.schemas.alert import AlertCreate
+from app.models.alert import (
+    Alert, AlertType, AlertSeverity, AlertCategory, AlertStatus,
+    OPEN_ALERT_STATUSES, OPEN_ENTITY_ALERT_INDEX_ELEMENTS, OPEN_ENTITY_ALERT_INDEX_WHERE
+)
 from app.services.alert_service import AlertService
 
 logger = logging.getLogger(__name__)
 
 
-def check_unassigned_jobs():
+def check_unassigned_jobs() -> dict:
     """
     Check for jobs scheduled today or in the past that don't have driver/truck assigned
     
     Runs every 15 minutes
     Creates CRITICAL alerts for dispatchers
+    
+    Set-based: a single INSERT ... SELECT anti-joins unassigned jobs of all
+    active orgs against their open JOB_NOT_ASSIGNED alerts, and
+    ON CONFLICT DO NOTHING on ux_alerts_open_entity absorbs any race with a
+    concurrent run.
+    
+    Returns:
+        Run stats: {"inserted": int, "duration_ms": float}
     """
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
+    started = time.perf_counter()
+    stats = {"inserted": 0, "duration_ms": 0.0}
     
     try:
-        # Get all active organizations
-        orgs = db.query(Organization).filter(Organization.status == "active").all()
+        now = datetime.utcnow()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        open_alert = exists().where(
+            Alert.org_id == Job.org_id,
+            Alert.alert_type == AlertType.JOB_NOT_ASSIGNED.value,
+            Alert.entity_type == "job",
+            Alert.entity_id == Job.id,
+            Alert.status.in_(OPEN_ALERT_STATUSES)
+        )
+        
+        missing_alerts = select(
+            Job.org_id,
+            literal(AlertType.JOB_NOT_ASSIGNED.value),
+            literal(AlertSeverity.CRITICAL.value),
+            literal(AlertCategory.OPERATIONAL.value),
+            literal("נסיעה #") + cast(Job.id, String) + literal(" לא משובצת"),
+            literal("נסיעה מתוכננת ל-")
+            + func.to_char(Job.scheduled_date, "DD/MM/YYYY HH24:MI")
+            + literal(" ללא נהג"),
+            literal("/jobs/") + cast(Job.id, String),
+            literal("job"),
+            Job.id,
+            literal("dispatcher"),
+            Job.scheduled_date + timedelta(hours=2),
+            literal(AlertStatus.UNREAD.value),
+        ).join(
+            Organization, Organization.id == Job.org_id
+        ).where(
+            Organization.status == "active",
+            Job.scheduled_date >= today_start,
+            Job.scheduled_date <= now + timedelta(hours=24),
+            Job.status.in_(["PLANNED", "ASSIGNED"]),
+            Job.driver_id.is_(None),  # No driver assigned
+            ~open_alert
+        )
         
-        for org in orgs:
-            # Find unassigned jobs
-            now = datetime.utcnow()
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            unassigned_jobs = db.query(Job).filter(
-                Job.org_id == org.id,
-                Job.scheduled_date >= today_start,
-                Job.scheduled_date <= now + timedelta(hours=24),
-                Job.status.in_(["PLANNED", "ASSIGNED"]),
-                Job.driver_id.is_(None)  # No driver assigned
-            ).all()
-            
-            for job in unassigned_jobs:
-                # Check if alert already exists
-                existing_alert = db.query(Alert).filter(
-                    Alert.org_id == org.id,
-                    Alert.alert_type == AlertType.JOB_NOT_ASSIGNED.value,
-                    Alert.entity_type == "job",
-                    Alert.entity_id == job.id,
-                    Alert.status.in_(["UNREAD", "READ"])
-                ).first()
-                
-                if not existing_alert:
-                    # Create alert
-                    alert_data = AlertCreate(
-                        org_id=org.id,
-                        alert_type=AlertType.JOB_NOT_ASSIGNED.value,
-                        severity=AlertSeverity.CRITICAL.value,
-                        category=AlertCategory.OPERATIONAL.value,
-                        title=f"נסיעה #{job.id} לא משובצת",
-                        message=f"נסיעה מתוכננת ל-{job.scheduled_date.strftime('%d/%m/%Y %H:%M')} ללא נהג",
-                        action_url=f"/jobs/{job.id}",
-                        entity_type="job",
-                        entity_id=job.id,
-                        created_for_role="dispatcher",
-                        expires_at=job.scheduled_date + timedelta(hours=2)
-                    )
-                    
-                    AlertService.create_alert(db, alert_data)
-                    logger.info(f"Created JOB_NOT_ASSIGNED alert for job {job.id} in org {org.id}")
+        stmt = pg_insert(Alert).from_select(
+            [
+                "org_id", "alert_type", "severity", "category", "title", "message",
+                "action_url", "entity_type", "entity_id", "created_for_role",
+                "expires_at", "status",
+            ],
+            missing_alerts
+        ).on_conflict_do_nothing(
+            index_elements=OPEN_ENTITY_ALERT_INDEX_ELEMENTS,
+            index_where=OPEN_ENTITY_ALERT_INDEX_WHERE
+        ).returning(Alert.id)
         
-        logger.info("Finished checking unassigned jobs")
+        stats["inserted"] = len(db.execute(stmt).all())
+        db.commit()
+        if stats["inserted"]:
+            AlertService.notify_bulk_change()
+        
+        stats["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            f"Finished checking unassigned jobs: inserted={stats['inserted']} "
+            f"duration_ms={stats['duration_ms']}"
+        )
         
     except Exception as e:
+        db.rollback()
         logger.error(f"Error checking unassigned jobs: {e}", exc_info=True)
     finally:
         db.close()
+    
+    return stats
 
 
-def check_insurance_expiry():
+class ExpiryRule:
     """
-    Check for trucks with insurance expiring in 30, 14, 7, 1 days
+    Declarative description of an expiring document
     
-    Runs daily at 08:00
-    Creates HIGH alerts for admins
+    Templates use {label}, {days}, {date} and {id} placeholders, rendered in
+    SQL so the whole scan is a single INSERT ... SELECT per rule.
     """
-    db = SessionLocal()
     
-    try:
-        # Get all active organizations
-        orgs = db.query(Organization).filter(Organization.status == "active").all()
+    def __init__(
+        self,
+        model,
+        date_column,
+        label_column,
+        alert_type: AlertType,
+        entity_type: str,
+        thresholds: Sequence[int],
+        title: str,
+        message: str,
+        action_url: str
+    ):
+        self.model = model
+        self.date_column = date_column
+        self.label_column = label_column
+        self.alert_type = alert_type
+        self.entity_type = entity_type
+        self.thresholds = sorted(thresholds)
+        self.title = title
+        self.message = message
+        self.action_url = action_url
+
+
+# Adding a new expiring document (tachograph, permit...) is one entry here
+EXPIRY_RULES = [
+    ExpiryRule(
+        model=Truck,
+        date_column=Truck.insurance_expiry,
+        label_column=Truck.plate_number,
+        alert_type=AlertType.INSURANCE_EXPIRY,
+        entity_type="truck",
+        thresholds=(30, 14, 7, 1),
+        title="ביטוח רכב {label} עומד לפוג",
+        message="ביטוח רכב {label} יפוג בעוד {days} ימים ({date})",
+        action_url="/fleet?truck={id}",
+    ),
+    ExpiryRule(
+        model=Truck,
+        date_column=Truck.test_expiry,
+        label_column=Truck.plate_number,
+        alert_type=AlertType.TEST_EXPIRY,
+        entity_type="truck",
+        thresholds=(30, 14, 7, 1),
+        title="טסט רכב {label} עומד לפוג",
+        message="טסט רכב {label} יפוג בעוד {days} ימים ({date})",
+        action_url="/fleet?truck={id}",
+    ),
+    ExpiryRule(
+        model=Driver,
+        date_column=Driver.license_expiry,
+        label_column=Driver.name,
+        alert_type=AlertType.LICENSE_EXPIRY,
+        entity_type="driver",
+        thresholds=(60, 30, 14, 7, 1),
+        title="רישיון {label} עומד לפוג",
+        message="רישיון נהיגה של {label} יפוג בעוד {days} ימים ({date})",
+        action_url="/fleet?driver={id}",
+    ),
+]
+
+_TEMPLATE_FIELD = re.compile(r"\{(\w+)\}")
+
+
+def _sql_template(template: str, fields: dict):
+    """Render a {field} template as a SQL string concatenation"""
+    parts = []
+    for i, chunk in enumerate(_TEMPLATE_FIELD.split(template)):
+        if i % 2:
+            parts.append(cast(fields[chunk], String))
+        elif chunk:
+            parts.append(literal(chunk))
+    expr = parts[0]
+    for part in parts[1:]:
+        expr = expr + part
+    return expr
+
+
+def _scan_expiry_rule(db: Session, rule: ExpiryRule, now: datetime) -> dict:
+    """
+    Upsert alerts for one rule across all active orgs in one statement
+    
+    Each entity inside the window gets one open alert. When it crosses into
+    a lower threshold the alert is escalated in place (severity, message)
+    and flagged UNREAD again; otherwise the conflict is a no-op.
+    """
+    window = select(
+        rule.model.id.label("entity_id"),
+        rule.model.org_id.label("org_id"),
+        rule.label_column.label("label"),
+        rule.date_column.label("expiry"),
+        cast(
+            func.floor(func.extract("epoch", rule.date_column - now) / 86400), Integer
+        ).label("days"),
+    ).join(
+        Organization, Organization.id == rule.model.org_id
+    ).where(
+        Organization.status == "active",
+        rule.model.is_active == True,
+        rule.date_column.isnot(None),
+        rule.date_column > now,
+        rule.date_column <= now + timedelta(days=rule.thresholds[-1])
+    ).subquery()
+    
+    threshold = case(
+        *[(window.c.days <= t, t) for t in rule.thresholds[:-1]],
+        else_=rule.thresholds[-1]
+    )
+    severity = case(
+        (window.c.days <= 7, AlertSeverity.CRITICAL.value),
+        (window.c.days <= 14, AlertSeverity.HIGH.value),
+        else_=AlertSeverity.MEDIUM.value
+    )
+    fields = {
+        "label": window.c.label,
+        "days": window.c.days,
+        "date": func.to_char(window.c.expiry, "DD/MM/YYYY"),
+        "id": window.c.entity_id,
+    }
+    
+    rows = select(
+        window.c.org_id,
+        literal(rule.alert_type.value),
+        severity,
+        literal(AlertCategory.MAINTENANCE.value),
+        _sql_template(rule.title, fields),
+        _sql_template(rule.message, fields),
+        _sql_template(rule.action_url, fields),
+        literal(rule.entity_type),
+        window.c.entity_id,
+        literal("admin"),
+        window.c.expiry,
+        func.jsonb_build_object("days_until_expiry", window.c.days, "threshold", threshold),
+        literal(AlertStatus.UNREAD.value),
+    )
+    
+    insert_stmt = pg_insert(Alert).from_select(
+        [
+            "org_id", "alert_type", "severity", "category", "title", "message",
+            "action_url", "entity_type", "entity_id", "created_for_role",
+            "expires_at", "alert_metadata", "status",
+        ],
+        rows
+    )
+    excluded = insert_stmt.excluded
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=OPEN_ENTITY_ALERT_INDEX_ELEMENTS,
+        index_where=OPEN_ENTITY_ALERT_INDEX_WHERE,
+        set_={
+            "severity": excluded.severity,
+            "title": excluded.title,
+            "message": excluded.message,
+            "expires_at": excluded.expires_at,
+            "alert_metadata": excluded.alert_metadata,
+            "status": AlertStatus.UNREAD.value,
+            "read_at": None,
+        },
+        where=Alert.alert_metadata["threshold"].astext.is_distinct_from(
+            excluded.alert_metadata["threshold"].astext
+        )
+    ).returning(literal_column("xmax = 0"))
+    
+    # xmax = 0 on the returned row means it was inserted rather than updated
+    results = [inserted for (inserted,) in db.execute(stmt).all()]
+    return {
+        "inserted": sum(1 for inserted in results if inserted),
+        "escalated": sum(1 for inserted in results if not inserted),
+    }
+
+
+def scan_expiring_documents(rules: Optional[Sequence[ExpiryRule]] = None) -> dict:
+    """
+    Raise or escalate expiry alerts for every rule, all orgs at once
+    
+    Args:
+        rules: Rules to scan (defaults to EXPIRY_RULES)
         
-        for org in orgs:
-            now = datetime.now()
-            
-            # Check trucks with expiring insurance
-            trucks = db.query(Truck).filter(
-                Truck.org_id == org.id,
-                Truck.is_active == True,
-                Truck.insurance_expiry.isnot(None),
-                Truck.insurance_expiry > now,
-                Truck.insurance_expiry <= now + timedelta(days=30)
-            ).all()
-            
-            for truck in trucks:
-                # Make now timezone-aware if truck.insurance_expiry is timezone-aware
-                expiry_date = truck.insurance_expiry.replace(tzinfo=None) if truck.insurance_expiry.tzinfo else truck.insurance_expiry
-                days_until_expiry = (expiry_date - now).days
-                
-                # Determine threshold level (30, 14, 7, or 1 days)
-                if days_until_expiry <= 1:
-                    threshold = 1
-                elif days_until_expiry <= 7:
-                    threshold = 7
-                elif days_until_expiry <= 14:
-                    threshold = 14
-                elif days_until_expiry <= 30:
-                    threshold = 30
-                else:
-                    continue  # Skip if more than 30 days
-                
-                # Check if alert already exists for this threshold
-                existing_alert = db.query(Alert).filter(
-                    Alert.org_id == org.id,
-                    Alert.alert_type == AlertType.INSURANCE_EXPIRY.value,
-                    Alert.entity_type == "truck",
-                    Alert.entity_id == truck.id,
-                    Alert.status.in_(["UNREAD", "READ"]),
-                    Alert.message.contains(f"תוקף ביטוח")
-                ).first()
-                
-                if not existing_alert:
-                    # Determine severity based on days left
-                    if days_until_expiry <= 7:
-                        severity = AlertSeverity.CRITICAL
-                    elif days_until_expiry <= 14:
-                        severity = AlertSeverity.HIGH
-                    else:
-                        severity = AlertSeverity.MEDIUM
-                    
-                    alert_data = AlertCreate(
-                        org_id=org.id,
-                        alert_type=AlertType.INSURANCE_EXPIRY.value,
-                        severity=severity.value,
-                        category=AlertCategory.MAINTENANCE.value,
-                        title=f"ביטוח רכב {truck.plate_number} עומד לפוג",
-                        message=f"ביטוח רכב {truck.plate_number} יפוג בעוד {days_until_expiry} ימים ({truck.insurance_expiry.strftime('%d/%m/%Y')})",
-                        action_url=f"/fleet?truck={truck.id}",
-                        entity_type="truck",
-                        entity_id=truck.id,
-                        created_for_role="admin",
-                        expires_at=truck.insurance_expiry,
-                        alert_metadata={"days_until_expiry": days_until_expiry}
-                    )
-                    
-                    AlertService.create_alert(db, alert_data)
-                    logger.info(f"Created INSURANCE_EXPIRY alert for truck {truck.id} in org {org.id}")
+    Returns:
+        Per-alert-type stats plus total duration_ms
+    """
+    db = BackgroundSessionLocal()
+    started = time.perf_counter()
+    stats = {}
+    
+    try:
+        now = datetime.now(timezone.utc)
+        for rule in (EXPIRY_RULES if rules is None else rules):
+            stats[rule.alert_type.value] = _scan_expiry_rule(db, rule, now)
+        db.commit()
+        if any(rule_stats["inserted"] or rule_stats["escalated"] for rule_stats in stats.values()):
+            AlertService.notify_bulk_change()
         
-        logger.info("Finished checking insurance expiry")
+        stats["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Finished checking document expiry: {stats}")
         
     except Exception as e:
-        logger.error(f"Error checking insurance expiry: {e}", exc_info=True)
+        db.rollback()
+        logger.error(f"Error checking document expiry: {e}", exc_info=True)
     finally:
         db.close()
+    
+    return stats
+
 
+def _rules_for(alert_type: AlertType) -> List[ExpiryRule]:
+    return [rule for rule in EXPIRY_RULES if rule.alert_type == alert_type]
 
-def check_test_expiry():
+
+def check_insurance_expiry() -> dict:
     """
-    Check for trucks with test expiring in 30, 14, 7, 1 days
+    Check for trucks with insurance expiring in 30, 14, 7, 1 days
     
-    Runs daily at 08:00
     Creates HIGH alerts for admins
     """
-    db = SessionLocal()
+    return scan_expiring_documents(_rules_for(AlertType.INSURANCE_EXPIRY))
+
+
+def check_test_expiry() -> dict:
+    """
+    Check for trucks with test expiring in 30, 14, 7, 1 days
     
-    try:
-        orgs = db.query(Organization).filter(Organization.status == "active").all()
-        
-        for org in orgs:
-            now = datetime.now()
-            
-            trucks = db.query(Truck).filter(
-                Truck.org_id == org.id,
-                Truck.is_active == True,
-                Truck.test_expiry.isnot(None),
-                Truck.test_expiry > now,
-                Truck.test_expiry <= now + timedelta(days=30)
-            ).all()
-            
-            for truck in trucks:
-                # Make timezone-naive for comparison
-                expiry_date = truck.test_expiry.replace(tzinfo=None) if truck.test_expiry.tzinfo else truck.test_expiry
-                days_until_expiry = (expiry_date - now).days
-                
-                # Determine threshold level
-                if days_until_expiry <= 1:
-                    threshold = 1
-                elif days_until_expiry <= 7:
-                    threshold = 7
-                elif days_until_expiry <= 14:
-                    threshold = 14
-                elif days_until_expiry <= 30:
-                    threshold = 30
-                else:
-                    continue
-                
-                # Check for existing alert
-                existing_alert = db.query(Alert).filter(
-                    Alert.org_id == org.id,
-                    Alert.alert_type == AlertType.TEST_EXPIRY.value,
-                    Alert.entity_type == "truck",
-                    Alert.entity_id == truck.id,
-                    Alert.status.in_(["UNREAD", "READ"]),
-                    Alert.message.contains(f"תוקף טסט")
-                ).first()
-                
-                if not existing_alert:
-                    if days_until_expiry <= 7:
-                        severity = AlertSeverity.CRITICAL
-                    elif days_until_expiry <= 14:
-                        severity = AlertSeverity.HIGH
-                    else:
-                        severity = AlertSeverity.MEDIUM
-                    
-                    alert_data = AlertCreate(
-                        org_id=org.id,
-                        alert_type=AlertType.TEST_EXPIRY.value,
-                        severity=severity.value,
-                        category=AlertCategory.MAINTENANCE.value,
-                        title=f"טסט רכב {truck.plate_number} עומד לפוג",
-                        message=f"טסט רכב {truck.plate_number} יפוג בעוד {days_until_expiry} ימים ({truck.test_expiry.strftime('%d/%m/%Y')})",
-                        action_url=f"/fleet?truck={truck.id}",
-                        entity_type="truck",
-                        entity_id=truck.id,
-                        created_for_role="admin",
-                        expires_at=truck.test_expiry,
-                        alert_metadata={"days_until_expiry": days_until_expiry}
-                    )
-                    
-                    AlertService.create_alert(db, alert_data)
-                    logger.info(f"Created TEST_EXPIRY alert for truck {truck.id} in org {org.id}")
-        
-        logger.info("Finished checking test expiry")
-        
-    except Exception as e:
-        logger.error(f"Error checking test expiry: {e}", exc_info=True)
-    finally:
-        db.close()
+    Creates HIGH alerts for admins
+    """
+    return scan_expiring_documents(_rules_for(AlertType.TEST_EXPIRY))
 
 
-def check_license_expiry():
+def check_license_expiry() -> dict:
     """
     Check for drivers with license expiring in 60, 30, 14, 7, 1 days
     
-    Runs daily at 08:00
     Creates HIGH alerts for admins
     """
-    db = SessionLocal()
-    
-    try:
-        orgs = db.query(Organization).filter(Organization.status == "active").all()
-        
-        for org in orgs:
-            now = datetime.now()
-            
-            drivers = db.query(Driver).filter(
-                Driver.org_id == org.id,
-                Driver.is_active == True,
-                Driver.license_expiry.isnot(None),
-                Driver.license_expiry > now,
-                Driver.license_expiry <= now + timedelta(days=60)
-            ).all()
-            
-            for driver in drivers:
-                # Make timezone-naive for comparison
-                expiry_date = driver.license_expiry.replace(tzinfo=None) if driver.license_expiry.tzinfo else driver.license_expiry
-                days_until_expiry = (expiry_date - now).days
-                
-                if days_until_expiry not in [60, 30, 14, 7, 1]:
-                    continue
-                
-                existing_alert = db.query(Alert).filter(
-                    Alert.org_id == org.id,
-                    Alert.alert_type == AlertType.LICENSE_EXPIRY.value,
-                    Alert.entity_type == "driver",
-                    Alert.entity_id == driver.id,
-                    Alert.status.in_(["UNREAD", "READ"]),
-                    Alert.message.contains(f"{days_until_expiry} ימים")
-                ).first()
-                
-                if not existing_alert:
-                    if days_until_expiry <= 7:
-                        severity = AlertSeverity.CRITICAL
-                    elif days_until_expiry <= 14:
-                        severity = AlertSeverity.HIGH
-                    else:
-                        severity = AlertSeverity.MEDIUM
-                    
-                    alert_data = AlertCreate(
-                        org_id=org.id,
-                        alert_type=AlertType.LICENSE_EXPIRY.value,
-                        severity=severity.value,
-                        category=AlertCategory.MAINTENANCE.value,
-                        title=f"רישיון {driver.name} עומד לפוג",
-                        message=f"רישיון נהיגה של {driver.name} יפוג בעוד {days_until_expiry} ימים ({driver.license_expiry.strftime('%d/%m/%Y')})",
-                        action_url=f"/fleet?driver={driver.id}",
-                        entity_type="driver",
-                        entity_id=driver.id,
-                        created_for_role="admin",
-                        expires_at=driver.license_expiry,
-                        alert_metadata={"days_until_expiry": days_until_expiry}
-                    )
-                    
-                    AlertService.create_alert(db, alert_data)
-                    logger.info(f"Created LICENSE_EXPIRY alert for driver {driver.id} in org {org.id}")
-        
-        logger.info("Finished checking license expiry")
-        
-    except Exception as e:
-        logger.error(f"Error checking license expiry: {e}", exc_info=True)
-    finally:
-        db.close()
+    return scan_expiring_documents(_rules_for(AlertType.LICENSE_EXPIRY))
 
 
 def cleanup_expired_alerts():
@@ -329,7 +358,7 @@ def cleanup_expired_alerts():
     
     Runs daily at 02:00
     """
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
     
     try:
         count = AlertService.cleanup_expired_alerts(db)
@@ -1,13 +1,16 @@
 """
 Alert Service - Business logic for creating and managing alerts
 """
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_, select
 from typing import Optional, List
 from datetime import datetime, timedelta
 
 from app.models.alert import Alert, AlertType, AlertSeverity, AlertCategory, AlertStatus
-from app.schemas.alert import AlertCreate, AlertUpdate
+from app.schemas.alert import AlertCreate, AlertUpdate, AlertResponse
+from app.services.alert_hub import alert_hub, ALERT_CREATED, ALERT_UPDATED, ALERTS_CHANGED
+from app.services.unread_counter import unread_counter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +19,36 @@ logger = logging.getLogger(__name__)
 class AlertService:
     """Service for managing alerts"""
     
+    @staticmethod
+    def _publish_alert(event_type: str, alert: Alert) -> None:
+        """Push a committed single-alert change to /alerts/stream subscribers"""
+        try:
+            payload = AlertResponse.model_validate(alert)
+            payload.is_read = alert.is_read
+            payload.is_active = alert.is_active
+            payload.is_expired = alert.is_expired
+            alert_hub.publish({
+                "event": event_type,
+                "org_id": alert.org_id,
+                "alert": payload.model_dump(mode="json")
+            })
+        except Exception as exc:
+            logger.warning(f"Alert stream publish failed for alert {alert.id}: {exc}")
+    
+    @staticmethod
+    def notify_bulk_change(org_id=None) -> None:
+        """
+        Call after a committed bulk change (sweep, auto-resolve, cleanup)
+        
+        Drops cached unread counts and tells stream subscribers to refresh.
+        org_id=None means every organization.
+        """
+        unread_counter.invalidate(org_id)
+        try:
+            alert_hub.publish({"event": ALERTS_CHANGED, "org_id": org_id})
+        except Exception as exc:
+            logger.warning(f"Alert stream publish failed for bulk change: {exc}")
+    
     @staticmethod
     def create_alert(
         db: Session,
@@ -53,6 +86,8 @@ class AlertService:
         db.refresh(alert)
         
         logger.info(f"Created alert {alert.id}: {alert.alert_type} for org {alert.org_id}")
+        unread_counter.record(alert, +1)
+        AlertService._publish_alert(ALERT_CREATED, alert)
 
         # Send push notification for user-targeted alerts
         if alert.created_for_user_id:
@@ -83,35 +118,16 @@ class AlertService:
         return alert
     
     @staticmethod
-    def get_alerts(
-        db: Session,
+    def _alert_filters(
         org_id: int,
-        user_id: Optional[int] = None,
-        user_role: Optional[str] = None,
-        status: Optional[AlertStatus] = None,
-        category: Optional[AlertCategory] = None,
-        severity: Optional[AlertSeverity] = None,
-        skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[Alert], int]:
-        """
-        Get alerts for organization with filters
-        
-        Args:
-            db: Database session
-            org_id: Organization ID
-            user_id: Filter by user ID
-            user_role: User role for role-based alerts
-            status: Filter by status
-            category: Filter by category
-            severity: Filter by severity
-            skip: Pagination offset
-            limit: Pagination limit
-            
-        Returns:
-            Tuple of (alerts list, total count)
-        """
-        query = db.query(Alert).filter(Alert.org_id == org_id)
+        user_id: Optional[int],
+        user_role: Optional[str],
+        status: Optional[AlertStatus],
+        category: Optional[AlertCategory],
+        severity: Optional[AlertSeverity]
+    ) -> list:
+        """WHERE conditions shared by get_alerts() and get_alerts_async()"""
+        filters = [Alert.org_id == org_id]
         
         # User-specific or role-based alerts
         if user_id or user_role:
@@ -127,27 +143,61 @@ class AlertService:
                     Alert.created_for_role.is_(None)
                 )
             )
-            query = query.filter(or_(*user_filter))
+            filters.append(or_(*user_filter))
         
         # Status filter
         if status:
-            query = query.filter(Alert.status == status.value)
+            filters.append(Alert.status == status.value)
         
         # Category filter
         if category:
-            query = query.filter(Alert.category == category.value)
+            filters.append(Alert.category == category.value)
         
         # Severity filter
         if severity:
-            query = query.filter(Alert.severity == severity.value)
+            filters.append(Alert.severity == severity.value)
         
         # Only active alerts (not expired)
-        query = query.filter(
+        filters.append(
             or_(
                 Alert.expires_at.is_(None),
                 Alert.expires_at > datetime.utcnow()
             )
         )
+        return filters
+    
+    @staticmethod
+    def get_alerts(
+        db: Session,
+        org_id: int,
+        user_id: Optional[int] = None,
+        user_role: Optional[str] = None,
+        status: Optional[AlertStatus] = None,
+        category: Optional[AlertCategory] = None,
+        severity: Optional[AlertSeverity] = None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> tuple[List[Alert], int]:
+        """
+        Get alerts for organization with filters
+        
+        Args:
+            db: Database session
+            org_id: Organization ID
+            user_id: Filter by user ID
+            user_role: User role for role-based alerts
+            status: Filter by status
+            category: Filter by category
+            severity: Filter by severity
+            skip: Pagination offset
+            limit: Pagination limit
+            
+        Returns:
+            Tuple of (alerts list, total count)
+        """
+        query = db.query(Alert).filter(
+            *AlertService._alert_filters(org_id, user_id, user_role, status, category, severity)
+        )
         
         # Count total before pagination
         total = query.count()
@@ -157,6 +207,28 @@ class AlertService:
         
         return alerts, total
     
+    @staticmethod
+    async def get_alerts_async(
+        db: AsyncSession,
+        org_id: int,
+        user_id: Optional[int] = None,
+        user_role: Optional[str] = None,
+        status: Optional[AlertStatus] = None,
+        category: Optional[AlertCategory] = None,
+        severity: Optional[AlertSeverity] = None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> tuple[List[Alert], int]:
+        """get_alerts() through an AsyncSession"""
+        filters = AlertService._alert_filters(org_id, user_id, user_role, status, category, severity)
+        total = (await db.execute(
+            select(func.count()).select_from(Alert).where(*filters)
+        )).scalar()
+        alerts = (await db.execute(
+            select(Alert).where(*filters).order_by(Alert.created_at.desc()).offset(skip).limit(limit)
+        )).scalars().all()
+        return list(alerts), total
+    
     @staticmethod
     def get_alert_by_id(
         db: Session,
@@ -206,6 +278,8 @@ class AlertService:
             alert.read_at = datetime.utcnow()
             db.commit()
             db.refresh(alert)
+            unread_counter.record(alert, -1)
+            AlertService._publish_alert(ALERT_UPDATED, alert)
             
             logger.info(f"Marked alert {alert_id} as read")
         
@@ -233,10 +307,14 @@ class AlertService:
         if not alert:
             return None
         
+        was_unread = alert.status == AlertStatus.UNREAD.value
         alert.status = AlertStatus.DISMISSED.value
         alert.dismissed_at = datetime.utcnow()
         db.commit()
         db.refresh(alert)
+        if was_unread:
+            unread_counter.record(alert, -1)
+        AlertService._publish_alert(ALERT_UPDATED, alert)
         
         logger.info(f"Dismissed alert {alert_id}")
         
@@ -266,11 +344,15 @@ class AlertService:
         if not alert:
             return None
         
+        was_unread = alert.status == AlertStatus.UNREAD.value
         alert.status = AlertStatus.RESOLVED.value
         alert.resolved_at = datetime.utcnow()
         alert.resolved_by = resolved_by
         db.commit()
         db.refresh(alert)
+        if was_unread:
+            unread_counter.record(alert, -1)
+        AlertService._publish_alert(ALERT_UPDATED, alert)
         
         logger.info(f"Resolved alert {alert_id} by user {resolved_by}")
         
@@ -286,6 +368,9 @@ class AlertService:
         """
         Get count of unread alerts
         
+        Per-user/role counts are served from the in-process unread_counter
+        cache; only an unscoped org-wide count queries the table directly.
+        
         Args:
             db: Database session
             org_id: Organization ID
@@ -295,27 +380,14 @@ class AlertService:
         Returns:
             Count of unread alerts
         """
+        if user_id or user_role:
+            return unread_counter.get(db, org_id, user_id, user_role)
+        
         query = db.query(Alert).filter(
             Alert.org_id == org_id,
             Alert.status == AlertStatus.UNREAD.value
         )
         
-        # User-specific or role-based alerts
-        if user_id or user_role:
-            user_filter = []
-            if user_id:
-                user_filter.append(Alert.created_for_user_id == user_id)
-            if user_role:
-                user_filter.append(Alert.created_for_role == user_role)
-            # Also include alerts for "all"
-            user_filter.append(
-                and_(
-                    Alert.created_for_user_id.is_(None),
-                    Alert.created_for_role.is_(None)
-                )
-            )
-            query = query.filter(or_(*user_filter))
-        
         # Only active alerts (not expired)
         query = query.filter(
             or_(
@@ -326,6 +398,27 @@ class AlertService:
         
         return query.count()
     
+    @staticmethod
+    async def get_unread_count_async(
+        db: AsyncSession,
+        org_id: int,
+        user_id: Optional[int] = None,
+        user_role: Optional[str] = None
+    ) -> int:
+        """get_unread_count() through an AsyncSession"""
+        if user_id or user_role:
+            return await unread_counter.get_async(db, org_id, user_id, user_role)
+        return (await db.execute(
+            select(func.count()).select_from(Alert).where(
+                Alert.org_id == org_id,
+                Alert.status == AlertStatus.UNREAD.value,
+                or_(
+                    Alert.expires_at.is_(None),
+                    Alert.expires_at > datetime.utcnow()
+                )
+            )
+        )).scalar()
+    
     @staticmethod
     def get_alert_stats(
         db: Session,
@@ -406,6 +499,7 @@ class AlertService:
         ).delete()
         
         db.commit()
+        AlertService.notify_bulk_change()
         
         logger.info(f"Cleaned up {count} expired alerts")
         
@@ -446,6 +540,8 @@ class AlertService:
         })
         
         db.commit()
+        if count:
+            AlertService.notify_bulk_change(org_id)
         
         logger.info(f"Auto-resolved {count} {alert_type.value} alerts for {entity_type} {entity_id}")
         
@@ -479,6 +575,8 @@ class AlertService:
         })
 
         db.commit()
+        if count:
+            AlertService.notify_bulk_change(org_id)
 
         logger.info(
             f"Resolved {count} {alert_type.value} alerts for user {user_id} "
@@ -0,0 +1,245 @@
+"""
+Billing Service - statement amounts and bulk billing runs
+
+A billing run bills every customer of an org for a period in one pass:
+one query finds all unbilled DELIVERED jobs, they are grouped by
+customer, and statements and lines are bulk-inserted in a single
+transaction. Progress is written to the billing_runs row from a separate
+connection so clients can poll it while the run is in flight. Those writes
+are best effort and never wait for a connection; status changes go through
+the run's own session, so a run uses one background-pool connection.
+"""
+from sqlalchemy import exists, func, insert, select, text, update
+from sqlalchemy.orm import Session
+from datetime import datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from itertools import groupby
+from typing import Optional, Tuple
+import logging
+import time
+
+from app.core.database import BackgroundSessionLocal, ProgressSessionLocal
+from app.services.numbering_service import STATEMENT, allocate_numbers, format_number
+from app.models import (
+    BillingRun,
+    BillingRunStatus,
+    Job,
+    Statement,
+    StatementLine,
+    StatementStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+VAT_RATE = Decimal("0.17")
+
+# Lines inserted per batch (progress is reported after each one)
+LINE_BATCH_SIZE = 2000
+
+# First key of pg_advisory_xact_lock(ns, org_id) for statement generation
+BILLING_LOCK_NAMESPACE = 7301
+
+
+def lock_org_billing(db: Session, org_id) -> None:
+    """
+    Serialize statement generation per org until the transaction ends
+
+    Both the single-customer endpoint and billing runs take it, so two
+    of them can never bill the same job twice.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(BILLING_LOCK_NAMESPACE, org_id)))
+
+
+def job_billing_amount(job) -> Tuple[Decimal, Decimal, Decimal]:
+    """
+    (qty, unit_price, amount) for a job on a statement line
+
+    CRITICAL: manual_override_total is the authoritative price when set,
+    then pricing_total, then the legacy per-unit fallback.
+    """
+    qty = job.actual_qty or job.planned_qty
+    amount = (
+        job.manual_override_total
+        or job.pricing_total
+        or (qty * Decimal(100))  # Fallback
+    )
+    unit_price = amount / (qty or Decimal(1))
+    return qty, unit_price, amount
+
+
+def create_billing_run(db: Session, org_id, period_from, period_to, created_by: Optional[int]) -> BillingRun:
+    run = BillingRun(
+        org_id=org_id,
+        period_from=period_from,
+        period_to=period_to,
+        status=BillingRunStatus.PENDING.value,
+        created_by=created_by,
+    )
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def _set_run(db: Session, run_id: int, **values) -> None:
+    """Update the run row in the caller's transaction"""
+    db.execute(update(BillingRun).where(BillingRun.id == run_id).values(**values))
+
+
+def _report_progress(run_id: int, **values) -> None:
+    """
+    Write progress in its own transaction so it is visible mid-run
+
+    Goes through the progress pool, which fails at once when busy (e.g.
+    another run is reporting): the update is skipped, the run goes on.
+    """
+    db = None
+    try:
+        db = ProgressSessionLocal()
+        _set_run(db, run_id, **values)
+        db.commit()
+    except Exception as e:
+        logger.warning(f"Billing run {run_id}: progress update skipped: {e}")
+    finally:
+        if db is not None:
+            db.close()
+
+
+def period_bounds(period_from, period_to) -> Tuple[datetime, datetime]:
+    """[start, end) covering whole days, period_to included"""
+    start = datetime.combine(period_from.date() if isinstance(period_from, datetime) else period_from, dt_time.min)
+    last_day = period_to.date() if isinstance(period_to, datetime) else period_to
+    return start, datetime.combine(last_day + timedelta(days=1), dt_time.min)
+
+
+def execute_billing_run(run_id: int) -> None:
+    """Run a pending billing run to completion (background task)"""
+    db = BackgroundSessionLocal()
+    started = time.perf_counter()
+    try:
+        run = db.get(BillingRun, run_id)
+        if run is None or run.status != BillingRunStatus.PENDING.value:
+            return
+        org_id, created_by = run.org_id, run.created_by
+        period_from, period_to = run.period_from, run.period_to
+        date_from, date_to = period_bounds(period_from, period_to)
+        _set_run(db, run_id, status=BillingRunStatus.RUNNING.value)
+        db.commit()
+
+        lock_org_billing(db, org_id)
+
+        already_billed = exists().where(StatementLine.job_id == Job.id)
+        jobs = db.execute(
+            select(
+                Job.id,
+                Job.customer_id,
+                Job.material_id,
+                Job.actual_qty,
+                Job.planned_qty,
+                Job.manual_override_total,
+                Job.pricing_total,
+                Job.pricing_breakdown_json,
+            )
+            .where(
+                Job.org_id == org_id,
+                Job.status == "DELIVERED",
+                Job.customer_id.isnot(None),
+                Job.scheduled_date >= date_from,
+                Job.scheduled_date < date_to,
+                ~already_billed,
+            )
+            .order_by(Job.customer_id, Job.id)
+        ).all()
+        _report_progress(run_id, total_jobs=len(jobs))
+
+        if not jobs:
+            _set_run(
+                db, run_id,
+                status=BillingRunStatus.COMPLETED.value,
+                total_jobs=0,
+                finished_at=datetime.now(timezone.utc),
+            )
+            db.commit()
+            return
+
+        by_customer = [(customer_id, list(rows)) for customer_id, rows in groupby(jobs, key=lambda j: j.customer_id)]
+
+        # One contiguous block of per-org statement numbers for the whole run
+        numbers = allocate_numbers(db, org_id, STATEMENT, len(by_customer))
+        statement_ids = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('statements', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(by_customer)}
+        ).scalars().all()
+
+        statement_rows = []
+        line_rows = []
+        run_total = Decimal(0)
+        for statement_id, number, (customer_id, customer_jobs) in zip(statement_ids, numbers, by_customer):
+            subtotal = Decimal(0)
+            for job in customer_jobs:
+                qty, unit_price, amount = job_billing_amount(job)
+                line_rows.append({
+                    "statement_id": statement_id,
+                    "job_id": job.id,
+                    "org_id": org_id,
+                    "description": f"Job #{job.id} - {job.material_id}",
+                    "qty": qty,
+                    "unit_price": unit_price,
+                    "total": amount,
+                    "breakdown_json": job.pricing_breakdown_json or {},
+                })
+                subtotal += amount
+            tax = subtotal * VAT_RATE
+            statement_rows.append({
+                "id": statement_id,
+                "org_id": org_id,
+                "customer_id": customer_id,
+                "period_from": period_from,
+                "period_to": period_to,
+                "number": format_number(STATEMENT, number),
+                "status": StatementStatus.DRAFT,
+                "subtotal": subtotal,
+                "tax": tax,
+                "total": subtotal + tax,
+                "created_by": created_by,
+            })
+            run_total += subtotal + tax
+
+        db.execute(insert(Statement), statement_rows)
+        for start in range(0, len(line_rows), LINE_BATCH_SIZE):
+            db.execute(insert(StatementLine), line_rows[start:start + LINE_BATCH_SIZE])
+            _report_progress(run_id, processed_jobs=min(start + LINE_BATCH_SIZE, len(line_rows)))
+
+        # Committed together with the statements
+        _set_run(
+            db, run_id,
+            status=BillingRunStatus.COMPLETED.value,
+            total_jobs=len(jobs),
+            processed_jobs=len(line_rows),
+            statements_created=len(statement_rows),
+            total_amount=run_total,
+            finished_at=datetime.now(timezone.utc),
+        )
+        db.commit()
+        logger.info(
+            f"Billing run {run_id}: {len(statement_rows)} statements, {len(line_rows)} jobs "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Billing run {run_id} failed: {e}")
+        try:
+            _set_run(
+                db, run_id,
+                status=BillingRunStatus.FAILED.value,
+                processed_jobs=0,
+                error=str(e)[:1000],
+                finished_at=datetime.now(timezone.utc),
+            )
+            db.commit()
+        except Exception as status_error:
+            db.rollback()
+            logger.error(f"Billing run {run_id}: could not record failure: {status_error}")
+    finally:
+        db.close()
@@ -0,0 +1,168 @@
+"""
+Delivery Note Cache - rendered delivery-note PDFs kept in storage by content hash
+
+The cache key is a SHA-256 over everything the PDF is built from: the
+job_data dict, the job's attached file ids and the template version. The
+same job content always maps to the same object, and any change (status,
+quantity, driver, a new photo, ...) maps to a new one. Stale entries are
+never served, even after bulk UPDATEs that bypass the ORM.
+
+The hash doubles as the HTTP ETag. A client revalidating with
+If-None-Match gets a 304 without the PDF being read or rendered.
+
+Objects live under pdf-cache/delivery-notes/{job_id}/. Storing a
+new version prunes the job's older ones. Commits that change a job's
+status or quantities, or its files, drop its cached PDFs right away on a
+background thread.
+
+Note that the "issue date" printed on a cached note is the time it was
+first rendered for that content.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import inspect
+from typing import Any, Dict, Iterable, Optional, Set
+import hashlib
+import json
+import logging
+import threading
+
+from app.core.config import settings
+from app.core.database import register_commit_invalidation
+from app.models import Job, JobFile
+from app.services.pdf_generator import DeliveryNotePDF
+from app.services.pdf_render_service import pdf_render_service
+from app.services.storage import async_storage, get_storage_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when DeliveryNotePDF's layout changes so existing entries are not reused
+TEMPLATE_VERSION = 1
+
+CACHE_PREFIX = "pdf-cache/delivery-notes"
+
+
+def _job_prefix(job_id: int) -> str:
+    return f"{CACHE_PREFIX}/{job_id}"
+
+
+class DeliveryNoteCache:
+    """Content-addressed delivery-note PDFs with hit-rate counters"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._invalidations = 0
+        self._pruner: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def content_hash(job_data: Dict[str, Any], file_ids: Iterable[int]) -> str:
+        payload = json.dumps(
+            {"template": TEMPLATE_VERSION, "job": job_data, "files": sorted(file_ids)},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self._not_modified += 1
+
+    async def get_or_render(self, job_data: Dict[str, Any], content_hash: str) -> bytes:
+        """PDF bytes for job_data: from storage when cached, rendered (and stored) otherwise"""
+        if not self.enabled:
+            return await pdf_render_service.render(DeliveryNotePDF, job_data)
+
+        storage_key = f"{_job_prefix(job_data['id'])}/{content_hash}.pdf"
+        pdf_bytes = await async_storage.read_bytes(storage_key)
+        with self._lock:
+            if pdf_bytes is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+        pdf_bytes = await pdf_render_service.render(DeliveryNotePDF, job_data)
+        try:
+            await async_storage.run(self._store, job_data["id"], storage_key, pdf_bytes)
+        except Exception as e:
+            # A storage failure only costs a re-render next time
+            logger.warning(f"Could not cache delivery note for job {job_data['id']}: {e}")
+        return pdf_bytes
+
+    @staticmethod
+    def _store(job_id: int, storage_key: str, pdf_bytes: bytes) -> None:
+        storage = get_storage_service()
+        storage.upload_bytes(pdf_bytes, storage_key, "application/pdf")
+        storage.delete_prefix(_job_prefix(job_id), keep=storage_key)
+
+    def invalidate(self, job_id: int) -> None:
+        """Drop a job's cached PDFs (in the background)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._invalidations += 1
+            if self._pruner is None:
+                self._pruner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="delivery-note-cache")
+            pruner = self._pruner
+        pruner.submit(self._delete, job_id)
+
+    @staticmethod
+    def _delete(job_id: int) -> None:
+        try:
+            get_storage_service().delete_prefix(_job_prefix(job_id))
+        except Exception as e:
+            logger.warning(f"Could not drop cached delivery notes for job {job_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self._hits + self._misses + self._not_modified
+            return {
+                "enabled": self.enabled,
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "invalidations": self._invalidations,
+                # 304s count as hits: nothing was rendered or read
+                "hit_rate": round((self._hits + self._not_modified) / served, 3) if served else None,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pruner, self._pruner = self._pruner, None
+        if pruner is not None:
+            pruner.shutdown(wait=True)
+
+
+delivery_note_cache = DeliveryNoteCache(enabled=settings.DELIVERY_NOTE_CACHE_ENABLED)
+
+
+# --- Invalidation -----------------------------------------------------------
+
+# Job columns whose change makes a rendered note obsolete
+_WATCHED_JOB_COLUMNS = ("status", "planned_qty", "actual_qty", "unit")
+
+
+def _affected_job_ids(session, obj) -> Set[int]:
+    if isinstance(obj, Job):
+        if obj in session.new:
+            return set()
+        if obj in session.deleted:
+            return {obj.id}
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in _WATCHED_JOB_COLUMNS):
+            return {obj.id}
+    elif isinstance(obj, JobFile) and obj.job_id:
+        return {obj.job_id}
+    return set()
+
+
+def _invalidate_delivery_notes(job_ids: Set[int]) -> None:
+    for job_id in job_ids:
+        delivery_note_cache.invalidate(job_id)
+
+
+register_commit_invalidation("delivery_note_cache_pending", _affected_job_ids, _invalidate_delivery_notes)
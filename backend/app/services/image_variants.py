@@ -0,0 +1,215 @@
+"""
+Image Variant Service - thumbnails and web-size copies of uploaded photos
+
+Drivers upload full-resolution phone photos. After an upload commits, the
+file id is queued here; a small thread pool reads the original back from
+storage, decodes it at reduced scale (JPEG draft mode), applies the EXIF
+orientation and writes two JPEG variants next to it:
+
+- <key>_thumb.jpg  IMAGE_THUMBNAIL_PX on the long side, for list views
+- <key>_web.jpg    IMAGE_WEB_PX on the long side, for the photo viewer
+                   (the original itself when it is already that small)
+
+The files row moves from variants_status PENDING to READY (or FAILED). If
+the file is deleted while its variants are built, they are deleted too.
+Rows still PENDING at startup, e.g. after a restart, are queued again.
+
+Usage:
+    image_variant_service.submit(file_record.id)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import threading
+
+from PIL import Image, ImageOps
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import BackgroundSessionLocal
+from app.models import File as FileModel
+from app.services.storage import get_storage_service
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+READY = "READY"
+FAILED = "FAILED"
+
+# Formats Pillow decodes without extra plugins
+IMAGE_MIME_TYPES = frozenset({"image/jpeg", "image/jpg", "image/png", "image/webp", "image/gif", "image/bmp"})
+
+
+def has_variants(mime_type: Optional[str]) -> bool:
+    return (mime_type or "").lower() in IMAGE_MIME_TYPES
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    out = BytesIO()
+    image.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def render_variants(source, thumbnail_px: int, web_px: int) -> Tuple[bytes, Optional[bytes]]:
+    """
+    (thumbnail_jpeg, web_jpeg) for an image file object
+
+    web_jpeg is None when the original already fits within web_px.
+    """
+    with Image.open(source) as image:
+        # Let the JPEG decoder downscale by 1/2..1/8 while decoding
+        image.draft("RGB", (web_px, web_px))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        web = None
+        if max(image.size) > web_px:
+            image.thumbnail((web_px, web_px), Image.LANCZOS)
+            web = _encode_jpeg(image, quality=82)
+        image.thumbnail((thumbnail_px, thumbnail_px), Image.LANCZOS)
+        return _encode_jpeg(image, quality=70), web
+
+
+class ImageVariantService:
+    """Background thread pool that builds image variants for uploaded files"""
+
+    def __init__(self, max_workers: int, thumbnail_px: int, web_px: int):
+        self.max_workers = max_workers
+        self.thumbnail_px = thumbnail_px
+        self.web_px = web_px
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._done = 0
+        self._failed = 0
+        self._discarded = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="image-variants"
+                )
+            return self._executor
+
+    def submit(self, file_id: int) -> None:
+        """Queue variant generation for a committed PENDING file row"""
+        with self._lock:
+            self._pending += 1
+        self._get_executor().submit(self._process, file_id)
+
+    def _process(self, file_id: int) -> None:
+        # No transaction stays open across _build(): the storage reads and
+        # writes and the decode can take seconds, and the background pool is
+        # shared with the alert sweeps and billing runs
+        try:
+            storage_key = self._pending_storage_key(file_id)
+            if storage_key is None:
+                return
+            try:
+                keys = self._build(storage_key)
+            except Exception as e:
+                logger.warning(f"Image variants failed for file {file_id}: {e}")
+                self._finish(file_id, variants_status=FAILED)
+                with self._lock:
+                    self._failed += 1
+                return
+
+            thumbnail_key, web_key = keys
+            if not self._finish(file_id, thumbnail_key=thumbnail_key, web_key=web_key, variants_status=READY):
+                # The file was deleted while its variants were being built
+                get_storage_service().delete_files([key for key in keys if key != storage_key])
+                with self._lock:
+                    self._discarded += 1
+                return
+            with self._lock:
+                self._done += 1
+        except Exception as e:
+            logger.error(f"Image variants for file {file_id} could not be recorded: {e}")
+            with self._lock:
+                self._failed += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @staticmethod
+    def _pending_storage_key(file_id: int) -> Optional[str]:
+        db = BackgroundSessionLocal()
+        try:
+            return db.execute(
+                select(FileModel.storage_key).where(FileModel.id == file_id, FileModel.variants_status == PENDING)
+            ).scalar()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _finish(file_id: int, **values) -> bool:
+        """Record the outcome if the row still exists and is PENDING"""
+        db = BackgroundSessionLocal()
+        try:
+            result = db.execute(
+                update(FileModel)
+                .where(FileModel.id == file_id, FileModel.variants_status == PENDING)
+                .values(**values)
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def _build(self, storage_key: str) -> Tuple[str, str]:
+        storage = get_storage_service()
+        source = storage.open_file(storage_key)
+        try:
+            if not hasattr(source, "seek"):
+                source = BytesIO(source.read())
+            thumbnail, web = render_variants(source, self.thumbnail_px, self.web_px)
+        finally:
+            source.close()
+
+        base = os.path.splitext(storage_key)[0]
+        thumbnail_key = storage.upload_bytes(thumbnail, f"{base}_thumb.jpg", "image/jpeg")
+        web_key = storage.upload_bytes(web, f"{base}_web.jpg", "image/jpeg") if web else storage_key
+        return thumbnail_key, web_key
+
+    def requeue_pending(self, limit: int = 500) -> int:
+        """Queue files left PENDING by a previous process"""
+        db = BackgroundSessionLocal()
+        try:
+            file_ids = [
+                row.id for row in db.query(FileModel.id)
+                .filter(FileModel.variants_status == PENDING)
+                .order_by(FileModel.id)
+                .limit(limit)
+            ]
+        finally:
+            db.close()
+        for file_id in file_ids:
+            self.submit(file_id)
+        return len(file_ids)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self._pending,
+                "done": self._done,
+                "failed": self._failed,
+                "discarded": self._discarded,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_variant_service = ImageVariantService(
+    max_workers=settings.IMAGE_VARIANT_WORKERS,
+    thumbnail_px=settings.IMAGE_THUMBNAIL_PX,
+    web_px=settings.IMAGE_WEB_PX,
+)
@@ -15,7 +15,10 @@ from reportlab.lib.utils import ImageReader
 from io import BytesIO
 from datetime import datetime
 from typing import Dict, Any, Optional
+from functools import lru_cache
 import os
+import re
+import threading
 from bidi.algorithm import get_display
 import arabic_reshaper
 
@@ -47,13 +50,29 @@ except Exception as e:
     FONT_NAME = 'Helvetica'
 
 
+# arabic_reshaper only changes Arabic-script letters (and recompiles its
+# ligature regex on every call), so Hebrew/Latin text can skip it
+_ARABIC_SCRIPT = re.compile('[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+
+@lru_cache(maxsize=8192)
+def _reshape_rtl(text: str) -> str:
+    # Reshape Arabic/Hebrew characters and apply BiDi algorithm
+    if _ARABIC_SCRIPT.search(text):
+        text = arabic_reshaper.reshape(text)
+    return get_display(text)
+
+
 def fix_hebrew(text: str) -> str:
-    """Fix Hebrew text for proper RTL display in PDF"""
+    """
+    Fix Hebrew text for proper RTL display in PDF
+
+    Memoized: labels, customer, site and material names repeat on every
+    row and every document.
+    """
     if not text:
         return text
-    # Reshape Arabic/Hebrew characters and apply BiDi algorithm
-    reshaped = arabic_reshaper.reshape(text)
-    return get_display(reshaped)
+    return _reshape_rtl(text)
 
 
 # Unit translations
@@ -70,6 +89,271 @@ def translate_unit(unit: str) -> str:
     return UNIT_LABELS.get(unit.upper() if unit else '', unit)
 
 
+STATUS_LABELS = {
+    'PLANNED': fix_hebrew('מתוכנן'),
+    'ASSIGNED': fix_hebrew('משובץ'),
+    'ENROUTE_PICKUP': fix_hebrew('בדרך לטעינה'),
+    'LOADED': fix_hebrew('נטען'),
+    'ENROUTE_DROPOFF': fix_hebrew('בדרך לפריקה'),
+    'DELIVERED': fix_hebrew('הושלם'),
+    'CLOSED': fix_hebrew('סגור'),
+    'CANCELED': fix_hebrew('בוטל')
+}
+
+
+# Paragraph and table styles - built once per process and shared by every
+# document (reportlab only reads them while laying out)
+_BASE_STYLES = getSampleStyleSheet()
+
+REPORT_TITLE_STYLE = ParagraphStyle(name='HebrewTitle', fontName=FONT_NAME, fontSize=18, alignment=TA_CENTER, spaceAfter=12)
+REPORT_SUBTITLE_STYLE = ParagraphStyle(name='HebrewSubtitle', fontName=FONT_NAME, fontSize=10, alignment=TA_CENTER, textColor=colors.HexColor('#6b7280'), spaceAfter=10)
+
+REPORT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#111827')),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), FONT_NAME),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')])
+])
+
+# Delivery note
+DN_TITLE_STYLE = ParagraphStyle(
+    'Title',
+    parent=_BASE_STYLES['Heading1'],
+    alignment=TA_CENTER,
+    fontSize=24,
+    fontName=FONT_NAME,
+    textColor=colors.HexColor('#1e40af'),
+    spaceAfter=20,
+    spaceBefore=10,
+)
+
+DN_SECTION_STYLE = ParagraphStyle(
+    'Section',
+    parent=_BASE_STYLES['Normal'],
+    alignment=TA_RIGHT,
+    fontSize=14,
+    fontName=FONT_NAME,
+    textColor=colors.HexColor('#1e40af'),
+    spaceAfter=8,
+    spaceBefore=12,
+)
+
+DN_LINE_TABLE_STYLE = TableStyle([
+    ('LINEABOVE', (0, 0), (-1, 0), 2, colors.HexColor('#1e40af')),
+    ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.HexColor('#93c5fd')),
+])
+
+DN_DOC_INFO_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#eef2ff')),
+    ('BACKGROUND', (2, 0), (2, -1), colors.HexColor('#eef2ff')),
+    ('GRID', (0, 0), (-1, -1), 0.75, colors.HexColor('#c7d2fe')),
+    ('PADDING', (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
+    ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
+])
+
+DN_CUSTOMER_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#dbeafe')),
+    ('BACKGROUND', (0, 0), (0, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#93c5fd')),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('FONTNAME', (1, 0), (1, -1), FONT_NAME),
+    ('FONTSIZE', (1, 0), (1, -1), 10),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1e40af')),
+])
+
+DN_ROUTE_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('ALIGN', (0, 3), (0, 3), 'CENTER'),
+    ('BACKGROUND', (1, 0), (1, 2), colors.HexColor('#f0fdf4')),
+    ('BACKGROUND', (1, 4), (1, 6), colors.HexColor('#fef3c7')),
+    ('FONTNAME', (1, 0), (1, 0), FONT_NAME),
+    ('FONTSIZE', (1, 0), (1, 0), 10),
+    ('TEXTCOLOR', (1, 0), (1, 0), colors.HexColor('#059669')),
+    ('FONTNAME', (1, 4), (1, 4), FONT_NAME),
+    ('FONTSIZE', (1, 4), (1, 4), 10),
+    ('TEXTCOLOR', (1, 4), (1, 4), colors.HexColor('#d97706')),
+    ('GRID', (1, 0), (1, 2), 1, colors.HexColor('#86efac')),
+    ('GRID', (1, 4), (1, 6), 1, colors.HexColor('#fde047')),
+    ('PADDING', (0, 0), (-1, -1), 8),
+    ('FONTSIZE', (0, 3), (0, 3), 18),
+    ('TEXTCOLOR', (0, 3), (0, 3), colors.HexColor('#1e40af')),
+])
+
+DN_MATERIAL_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#ede9fe')),
+    ('BACKGROUND', (0, 0), (0, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#c4b5fd')),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('FONTSIZE', (1, 0), (1, -1), 10),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#6d28d9')),
+])
+
+DN_PRICE_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#fef3c7')),
+    ('BACKGROUND', (0, 0), (0, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#fde047')),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('FONTSIZE', (1, 0), (1, -1), 10),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#d97706')),
+    ('FONTNAME', (0, 0), (0, 0), FONT_NAME),
+    ('FONTSIZE', (0, 0), (0, 0), 14),
+    ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#d97706')),
+])
+
+DN_VEHICLE_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#dbeafe')),
+    ('BACKGROUND', (0, 0), (0, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#93c5fd')),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('FONTSIZE', (1, 0), (1, -1), 10),
+    ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1e40af')),
+])
+
+DN_NOTES_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#fef9c3')),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#fde047')),
+    ('PADDING', (0, 0), (-1, -1), 12),
+])
+
+DN_SIGNATURE_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
+    ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
+    ('PADDING', (0, 0), (-1, -1), 6),
+])
+
+# Statement and subcontractor payment reports
+STATEMENT_SUBTITLE_STYLE = ParagraphStyle(
+    'Subtitle',
+    parent=_BASE_STYLES['Normal'],
+    alignment=TA_CENTER,
+    fontSize=10,
+    fontName=FONT_NAME,
+    textColor=colors.HexColor('#64748b'),
+    spaceAfter=12,
+)
+
+STATEMENT_SECTION_STYLE = ParagraphStyle(
+    'Section',
+    parent=_BASE_STYLES['Normal'],
+    alignment=TA_RIGHT,
+    fontSize=12,
+    fontName=FONT_NAME,
+    textColor=colors.HexColor('#1e40af'),
+    spaceAfter=6,
+    spaceBefore=10,
+)
+
+STATEMENT_TITLE_STYLE = ParagraphStyle(
+    'Title',
+    parent=_BASE_STYLES['Heading1'],
+    alignment=TA_CENTER,
+    fontSize=21,
+    fontName=FONT_NAME,
+    textColor=colors.HexColor('#0f172a'),
+    spaceAfter=6,
+)
+
+SUBCONTRACTOR_TITLE_STYLE = ParagraphStyle(
+    'Title',
+    parent=STATEMENT_TITLE_STYLE,
+    fontSize=20,
+)
+
+STATEMENT_INFO_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
+    ('PADDING', (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
+    ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
+])
+
+STATEMENT_TOTALS_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecfdf3')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#bbf7d0')),
+    ('PADDING', (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#166534')),
+    ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#166534')),
+])
+
+STATEMENT_LINES_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 9),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e7ff')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+    ('PADDING', (0, 0), (-1, -1), 6),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
+])
+
+SUBCONTRACTOR_TOTALS_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecfdf3')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#bbf7d0')),
+    ('PADDING', (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#166534')),
+])
+
+SUBCONTRACTOR_LINES_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT_NAME, 7),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e7ff')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+    ('PADDING', (0, 0), (-1, -1), 5),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
+])
+
+
+# Org logos - decoded once and reused until the file changes
+_logo_cache: Dict[str, Any] = {}
+_logo_lock = threading.Lock()
+
+
+def get_logo_reader(path: str) -> Optional[ImageReader]:
+    """Cached ImageReader for a logo file, keyed by path and mtime"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _logo_lock:
+        cached = _logo_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    reader = ImageReader(path)
+    with _logo_lock:
+        _logo_cache[path] = (mtime, reader)
+    return reader
+
+
 class NumberedCanvas(canvas.Canvas):
     """Canvas with page numbers and header/footer"""
     def __init__(self, *args, **kwargs):
@@ -173,10 +457,13 @@ class StatementCanvas(canvas.Canvas):
         # Logo (left)
         logo_url = self.org_info.get('logo_url')
         logo_path = self._resolve_logo_path(logo_url)
-        if logo_path and os.path.exists(logo_path):
+        if logo_path:
             try:
-                img = ImageReader(logo_path)
-                self.drawImage(img, 2*cm, page_height - 1.9*cm, width=3*cm, height=1.4*cm, preserveAspectRatio=True, mask='auto')
+                img = get_logo_reader(logo_path)
+                if img is not None:
+                    # The reader is shared across threads; it decodes lazily on first draw
+                    with _logo_lock:
+                        self.drawImage(img, 2*cm, page_height - 1.9*cm, width=3*cm, height=1.4*cm, preserveAspectRatio=True, mask='auto')
             except Exception:
                 pass
 
@@ -249,15 +536,11 @@ def generate_simple_report_pdf(
 ) -> BytesIO:
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2.5*cm, bottomMargin=2.5*cm)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='HebrewTitle', fontName=FONT_NAME, fontSize=18, alignment=TA_CENTER, spaceAfter=12))
-    styles.add(ParagraphStyle(name='HebrewSubtitle', fontName=FONT_NAME, fontSize=10, alignment=TA_CENTER, textColor=colors.HexColor('#6b7280'), spaceAfter=10))
-    styles.add(ParagraphStyle(name='HebrewCell', fontName=FONT_NAME, fontSize=9, alignment=TA_RIGHT))
 
     elements = []
-    elements.append(Paragraph(fix_hebrew(title), styles['HebrewTitle']))
+    elements.append(Paragraph(fix_hebrew(title), REPORT_TITLE_STYLE))
     if subtitle:
-        elements.append(Paragraph(fix_hebrew(subtitle), styles['HebrewSubtitle']))
+        elements.append(Paragraph(fix_hebrew(subtitle), REPORT_SUBTITLE_STYLE))
 
     table_data = []
     table_data.append([fix_hebrew(_normalize_text(h)) for h in headers])
@@ -265,15 +548,7 @@ def generate_simple_report_pdf(
         table_data.append([fix_hebrew(_normalize_text(cell)) for cell in row])
 
     table = Table(table_data, repeatRows=1)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#111827')),
-        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 0), (-1, -1), FONT_NAME),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')])
-    ]))
+    table.setStyle(REPORT_TABLE_STYLE)
 
     elements.append(table)
 
@@ -367,71 +642,25 @@ class DeliveryNotePDF:
         
         # Build content
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom RTL style for Hebrew
-        rtl_style = ParagraphStyle(
-            'RTL',
-            parent=styles['Normal'],
-            alignment=TA_RIGHT,
-            fontSize=11,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#374151'),
-        )
-        
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            alignment=TA_CENTER,
-            fontSize=24,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#1e40af'),
-            spaceAfter=20,
-            spaceBefore=10,
-        )
-        
-        section_style = ParagraphStyle(
-            'Section',
-            parent=styles['Normal'],
-            alignment=TA_RIGHT,
-            fontSize=14,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#1e40af'),
-            spaceAfter=8,
-            spaceBefore=12,
-        )
         
         # Title with decorative line
-        story.append(Paragraph(fix_hebrew("תעודת משלוח"), title_style))
+        story.append(Paragraph(fix_hebrew("תעודת משלוח"), DN_TITLE_STYLE))
         
         # Decorative line
         line_table = Table([['']], colWidths=[17*cm])
-        line_table.setStyle(TableStyle([
-            ('LINEABOVE', (0, 0), (-1, 0), 2, colors.HexColor('#1e40af')),
-            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.HexColor('#93c5fd')),
-        ]))
+        line_table.setStyle(DN_LINE_TABLE_STYLE)
         story.append(line_table)
         story.append(Spacer(1, 0.5*cm))
 
         # Document Info (professional header box)
         issue_date = datetime.now().strftime('%d/%m/%Y %H:%M')
-        doc_number = f"DN-{job_data.get('id', 'N/A')}"
+        doc_number = job_data.get('note_number') or f"DN-{job_data.get('id', 'N/A')}"
         doc_info = [
             [fix_hebrew('מספר תעודה'), doc_number, fix_hebrew('תאריך הנפקה'), issue_date],
             [fix_hebrew('מספר נסיעה'), f"#{job_data.get('id', 'N/A')}", fix_hebrew('סטטוס'), self._get_status_hebrew(job_data.get('status', 'unknown'))],
         ]
         doc_table = Table(doc_info, colWidths=[3.5*cm, 5*cm, 3.5*cm, 5*cm])
-        doc_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#eef2ff')),
-            ('BACKGROUND', (2, 0), (2, -1), colors.HexColor('#eef2ff')),
-            ('GRID', (0, 0), (-1, -1), 0.75, colors.HexColor('#c7d2fe')),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
-        ]))
+        doc_table.setStyle(DN_DOC_INFO_TABLE_STYLE)
         story.append(doc_table)
         story.append(Spacer(1, 0.7*cm))
         
@@ -447,24 +676,13 @@ class DeliveryNotePDF:
             job_info.append([customer_info, fix_hebrew('לקוח:')])
         
         job_table = Table(job_info, colWidths=[13*cm, 4*cm])
-        job_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#dbeafe')),
-            ('BACKGROUND', (0, 0), (0, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#93c5fd')),
-            ('PADDING', (0, 0), (-1, -1), 10),
-            ('FONTNAME', (1, 0), (1, -1), FONT_NAME),
-            ('FONTSIZE', (1, 0), (1, -1), 10),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1e40af')),
-        ]))
+        job_table.setStyle(DN_CUSTOMER_TABLE_STYLE)
         if job_info:
             story.append(job_table)
             story.append(Spacer(1, 1*cm))
         
         # Route Section
-        story.append(Paragraph(fix_hebrew('מסלול'), section_style))
+        story.append(Paragraph(fix_hebrew('מסלול'), DN_SECTION_STYLE))
         
         route_data = [
             ['', fix_hebrew('מאתר')],
@@ -477,29 +695,12 @@ class DeliveryNotePDF:
         ]
         
         route_table = Table(route_data, colWidths=[1*cm, 16*cm])
-        route_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('ALIGN', (0, 3), (0, 3), 'CENTER'),
-            ('BACKGROUND', (1, 0), (1, 2), colors.HexColor('#f0fdf4')),
-            ('BACKGROUND', (1, 4), (1, 6), colors.HexColor('#fef3c7')),
-            ('FONTNAME', (1, 0), (1, 0), FONT_NAME),
-            ('FONTSIZE', (1, 0), (1, 0), 10),
-            ('TEXTCOLOR', (1, 0), (1, 0), colors.HexColor('#059669')),
-            ('FONTNAME', (1, 4), (1, 4), FONT_NAME),
-            ('FONTSIZE', (1, 4), (1, 4), 10),
-            ('TEXTCOLOR', (1, 4), (1, 4), colors.HexColor('#d97706')),
-            ('GRID', (1, 0), (1, 2), 1, colors.HexColor('#86efac')),
-            ('GRID', (1, 4), (1, 6), 1, colors.HexColor('#fde047')),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('FONTSIZE', (0, 3), (0, 3), 18),
-            ('TEXTCOLOR', (0, 3), (0, 3), colors.HexColor('#1e40af')),
-        ]))
+        route_table.setStyle(DN_ROUTE_TABLE_STYLE)
         story.append(route_table)
         story.append(Spacer(1, 1*cm))
         
         # Material & Quantity
-        story.append(Paragraph(fix_hebrew('חומר וכמות'), section_style))
+        story.append(Paragraph(fix_hebrew('חומר וכמות'), DN_SECTION_STYLE))
         
         material_data = [
             [fix_hebrew(job_data.get('material_name', 'N/A')), fix_hebrew('חומר')],
@@ -510,22 +711,13 @@ class DeliveryNotePDF:
             material_data.append([f"{job_data['actual_qty']} {translate_unit(job_data.get('unit', ''))}", fix_hebrew('כמות בפועל')])
         
         material_table = Table(material_data, colWidths=[12*cm, 5*cm])
-        material_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#ede9fe')),
-            ('BACKGROUND', (0, 0), (0, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#c4b5fd')),
-            ('PADDING', (0, 0), (-1, -1), 10),
-            ('FONTSIZE', (1, 0), (1, -1), 10),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#6d28d9')),
-        ]))
+        material_table.setStyle(DN_MATERIAL_TABLE_STYLE)
         story.append(material_table)
         story.append(Spacer(1, 1*cm))
         
         # Manual Price Override (if exists)
         if job_data.get('manual_override_total'):
-            story.append(Paragraph(fix_hebrew('מחיר'), section_style))
+            story.append(Paragraph(fix_hebrew('מחיר'), DN_SECTION_STYLE))
             
             price_data = [
                 [f"₪{float(job_data['manual_override_total']):.2f}", fix_hebrew('מחיר מותאם אישית')],
@@ -535,26 +727,13 @@ class DeliveryNotePDF:
                 price_data.append([fix_hebrew(job_data['manual_override_reason']), fix_hebrew('סיבה')])
             
             price_table = Table(price_data, colWidths=[12*cm, 5*cm])
-            price_table.setStyle(TableStyle([
-                ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-                ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#fef3c7')),
-                ('BACKGROUND', (0, 0), (0, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#fde047')),
-                ('PADDING', (0, 0), (-1, -1), 10),
-                ('FONTSIZE', (1, 0), (1, -1), 10),
-                ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#d97706')),
-                ('FONTNAME', (0, 0), (0, 0), FONT_NAME),
-                ('FONTSIZE', (0, 0), (0, 0), 14),
-                ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#d97706')),
-            ]))
+            price_table.setStyle(DN_PRICE_TABLE_STYLE)
             story.append(price_table)
             story.append(Spacer(1, 1*cm))
         
         # Driver & Truck
         if job_data.get('driver_name') or job_data.get('truck_plate'):
-            story.append(Paragraph(fix_hebrew('צי'), section_style))
+            story.append(Paragraph(fix_hebrew('צי'), DN_SECTION_STYLE))
             
             vehicle_data = []
             if job_data.get('driver_name'):
@@ -574,31 +753,15 @@ class DeliveryNotePDF:
                 vehicle_data.append([truck_info, fix_hebrew('משאית')])
             
             vehicle_table = Table(vehicle_data, colWidths=[12*cm, 5*cm])
-            vehicle_table.setStyle(TableStyle([
-                ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-                ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#dbeafe')),
-                ('BACKGROUND', (0, 0), (0, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#93c5fd')),
-                ('PADDING', (0, 0), (-1, -1), 10),
-                ('FONTSIZE', (1, 0), (1, -1), 10),
-                ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1e40af')),
-            ]))
+            vehicle_table.setStyle(DN_VEHICLE_TABLE_STYLE)
             story.append(vehicle_table)
             story.append(Spacer(1, 1*cm))
         
         # Notes
         if job_data.get('notes'):
-            story.append(Paragraph(fix_hebrew('הערות'), section_style))
+            story.append(Paragraph(fix_hebrew('הערות'), DN_SECTION_STYLE))
             notes_table = Table([[fix_hebrew(job_data['notes'])]], colWidths=[17*cm])
-            notes_table.setStyle(TableStyle([
-                ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-                ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#fef9c3')),
-                ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#fde047')),
-                ('PADDING', (0, 0), (-1, -1), 12),
-            ]))
+            notes_table.setStyle(DN_NOTES_TABLE_STYLE)
             story.append(notes_table)
             story.append(Spacer(1, 1*cm))
         
@@ -609,14 +772,7 @@ class DeliveryNotePDF:
             [fix_hebrew('תאריך:'), '____________', fix_hebrew('חותמת:'), '____________'],
         ]
         sig_table = Table(signature_data, colWidths=[3*cm, 6.5*cm, 3*cm, 4.5*cm])
-        sig_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 11),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
-            ('PADDING', (0, 0), (-1, -1), 6),
-        ]))
+        sig_table.setStyle(DN_SIGNATURE_TABLE_STYLE)
         story.append(sig_table)
         
         # Build PDF with custom canvas
@@ -626,17 +782,7 @@ class DeliveryNotePDF:
     
     def _get_status_hebrew(self, status: str) -> str:
         """Convert status to Hebrew"""
-        status_map = {
-            'PLANNED': fix_hebrew('מתוכנן'),
-            'ASSIGNED': fix_hebrew('משובץ'),
-            'ENROUTE_PICKUP': fix_hebrew('בדרך לטעינה'),
-            'LOADED': fix_hebrew('נטען'),
-            'ENROUTE_DROPOFF': fix_hebrew('בדרך לפריקה'),
-            'DELIVERED': fix_hebrew('הושלם'),
-            'CLOSED': fix_hebrew('סגור'),
-            'CANCELED': fix_hebrew('בוטל')
-        }
-        return status_map.get(status.upper(), status)
+        return STATUS_LABELS.get(status.upper(), status)
 
 
 class StatementPDF:
@@ -658,41 +804,9 @@ class StatementPDF:
         )
 
         story = []
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            alignment=TA_CENTER,
-            fontSize=21,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#0f172a'),
-            spaceAfter=6,
-        )
 
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=styles['Normal'],
-            alignment=TA_CENTER,
-            fontSize=10,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#64748b'),
-            spaceAfter=12,
-        )
-
-        section_style = ParagraphStyle(
-            'Section',
-            parent=styles['Normal'],
-            alignment=TA_RIGHT,
-            fontSize=12,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#1e40af'),
-            spaceAfter=6,
-            spaceBefore=10,
-        )
-
-        story.append(Paragraph(fix_hebrew('סיכום חודשי ללקוח'), title_style))
-        story.append(Paragraph(fix_hebrew('דוח חיוב מרכזי לתקופה'), subtitle_style))
+        story.append(Paragraph(fix_hebrew('סיכום חודשי ללקוח'), STATEMENT_TITLE_STYLE))
+        story.append(Paragraph(fix_hebrew('דוח חיוב מרכזי לתקופה'), STATEMENT_SUBTITLE_STYLE))
 
         # Statement header
         info = [
@@ -701,20 +815,12 @@ class StatementPDF:
              fix_hebrew('תקופה'), statement_data.get('period', '')],
         ]
         info_table = Table(info, colWidths=[3.4*cm, 6.2*cm, 3.4*cm, 4.2*cm])
-        info_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
-        ]))
+        info_table.setStyle(STATEMENT_INFO_TABLE_STYLE)
         story.append(info_table)
         story.append(Spacer(1, 0.6*cm))
 
         # Summary totals
-        story.append(Paragraph(fix_hebrew('סיכום'), section_style))
+        story.append(Paragraph(fix_hebrew('סיכום'), STATEMENT_SECTION_STYLE))
         totals = [
             [fix_hebrew('סה"כ לפני מע"מ'), statement_data.get('subtotal', ''),
              fix_hebrew('מע"מ'), statement_data.get('tax', '')],
@@ -722,20 +828,12 @@ class StatementPDF:
              fix_hebrew('יתרה'), statement_data.get('balance', '')],
         ]
         totals_table = Table(totals, colWidths=[3.4*cm, 6.2*cm, 3.4*cm, 4.2*cm])
-        totals_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecfdf3')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#bbf7d0')),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#166534')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#166534')),
-        ]))
+        totals_table.setStyle(STATEMENT_TOTALS_TABLE_STYLE)
         story.append(totals_table)
         story.append(Spacer(1, 0.6*cm))
 
         # Lines table
-        story.append(Paragraph(fix_hebrew('פירוט נסיעות'), section_style))
+        story.append(Paragraph(fix_hebrew('פירוט נסיעות'), STATEMENT_SECTION_STYLE))
         header = [
             fix_hebrew('סה"כ'),
             fix_hebrew('מחיר יחידה'),
@@ -756,15 +854,7 @@ class StatementPDF:
             ])
 
         lines_table = Table(rows, colWidths=[2.8*cm, 2.6*cm, 2.2*cm, 3*cm, 4.2*cm, 2.1*cm])
-        lines_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 9),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e7ff')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-            ('PADDING', (0, 0), (-1, -1), 6),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-        ]))
+        lines_table.setStyle(STATEMENT_LINES_TABLE_STYLE)
         story.append(lines_table)
 
         org_info = {
@@ -802,41 +892,9 @@ class SubcontractorPaymentPDF:
         )
 
         story = []
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            alignment=TA_CENTER,
-            fontSize=20,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#0f172a'),
-            spaceAfter=6,
-        )
-
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=styles['Normal'],
-            alignment=TA_CENTER,
-            fontSize=10,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#64748b'),
-            spaceAfter=12,
-        )
-
-        section_style = ParagraphStyle(
-            'Section',
-            parent=styles['Normal'],
-            alignment=TA_RIGHT,
-            fontSize=12,
-            fontName=FONT_NAME,
-            textColor=colors.HexColor('#1e40af'),
-            spaceAfter=6,
-            spaceBefore=10,
-        )
 
-        story.append(Paragraph(fix_hebrew('דוח תשלום לקבלן משנה'), title_style))
-        story.append(Paragraph(fix_hebrew('חישוב תשלום לפי נסיעות ומחירון'), subtitle_style))
+        story.append(Paragraph(fix_hebrew('דוח תשלום לקבלן משנה'), SUBCONTRACTOR_TITLE_STYLE))
+        story.append(Paragraph(fix_hebrew('חישוב תשלום לפי נסיעות ומחירון'), STATEMENT_SUBTITLE_STYLE))
 
         info = [
             [fix_hebrew('קבלן'), fix_hebrew(report_data.get('subcontractor_name', '')),
@@ -846,15 +904,7 @@ class SubcontractorPaymentPDF:
             [fix_hebrew('תאריך הפקה'), report_data.get('generated_at', ''), '', '']
         ]
         info_table = Table(info, colWidths=[3.2*cm, 6.2*cm, 3.2*cm, 4.4*cm])
-        info_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1e40af')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#1e40af')),
-        ]))
+        info_table.setStyle(STATEMENT_INFO_TABLE_STYLE)
         story.append(info_table)
         story.append(Spacer(1, 0.6*cm))
 
@@ -863,18 +913,11 @@ class SubcontractorPaymentPDF:
             [fix_hebrew('סה"כ נסיעות'), totals.get('total_jobs', '0'), fix_hebrew('סה"כ כמות'), totals.get('total_quantity', '0')],
             [fix_hebrew('סה"כ לתשלום'), totals.get('total_amount', '0'), '', '']
         ], colWidths=[3.2*cm, 6.2*cm, 3.2*cm, 4.4*cm])
-        totals_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 10),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ecfdf3')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#bbf7d0')),
-            ('PADDING', (0, 0), (-1, -1), 8),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#166534')),
-        ]))
+        totals_table.setStyle(SUBCONTRACTOR_TOTALS_TABLE_STYLE)
         story.append(totals_table)
         story.append(Spacer(1, 0.6*cm))
 
-        story.append(Paragraph(fix_hebrew('פירוט נסיעות'), section_style))
+        story.append(Paragraph(fix_hebrew('פירוט נסיעות'), STATEMENT_SECTION_STYLE))
         header = [
             fix_hebrew('סה"כ'),
             fix_hebrew('יחידת חיוב'),
@@ -902,15 +945,7 @@ class SubcontractorPaymentPDF:
             ])
 
         lines_table = Table(rows, colWidths=[2.2*cm, 2.0*cm, 1.7*cm, 3.0*cm, 3.1*cm, 3.1*cm, 3.0*cm, 1.9*cm, 2.0*cm])
-        lines_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), FONT_NAME, 7),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e0e7ff')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-            ('PADDING', (0, 0), (-1, -1), 5),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-        ]))
+        lines_table.setStyle(SUBCONTRACTOR_LINES_TABLE_STYLE)
         story.append(lines_table)
 
         def _canvasmaker(*args, **kwargs):
@@ -0,0 +1,164 @@
+"""
+PDF Render Service - runs ReportLab rendering in a bounded process pool
+
+Rendering is CPU-bound: done inline it blocks the event loop (async
+endpoints) or holds the GIL against every other request thread (sync
+endpoints). Each worker process imports pdf_generator once, so fonts and
+precomputed styles are built once per worker.
+
+Usage:
+    pdf_bytes = await pdf_render_service.render(DeliveryNotePDF, job_data)   # async endpoints
+    pdf_bytes = pdf_render_service.render_sync(StatementPDF, statement_data)  # sync endpoints
+"""
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+import asyncio
+import logging
+import multiprocessing
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PDFRenderError(Exception):
+    """PDF could not be rendered in time or the pool is saturated"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _warm_worker() -> None:
+    # Register fonts and build shared styles before the first job arrives
+    import app.services.pdf_generator  # noqa: F401
+
+
+def _render(generator_cls, args: tuple) -> bytes:
+    """Runs inside a worker process"""
+    return generator_cls().generate(*args).getvalue()
+
+
+class PDFRenderService:
+    """Bounded process pool for PDF generators, with queue-depth metrics"""
+
+    def __init__(self, max_workers: int, max_queue: int, timeout_seconds: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rendered = 0
+        self._timeouts = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork the API process with its scheduler/DB threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                )
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+            if not future.cancelled() and future.exception() is None:
+                self._rendered += 1
+
+    def _submit(self, generator_cls, args: tuple):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                depth = self._pending
+            else:
+                self._pending += 1
+                depth = None
+        if depth is not None:
+            logger.warning(f"PDF render queue full ({depth} pending), rejecting {generator_cls.__name__}")
+            raise PDFRenderError("PDF rendering is busy, please try again shortly", 503)
+
+        # The slot taken above is released on any failure, including the retry
+        try:
+            try:
+                future = self._get_executor().submit(_render, generator_cls, args)
+            except BrokenProcessPool:
+                self._reset_executor()
+                future = self._get_executor().submit(_render, generator_cls, args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _on_timeout(self, future, generator_cls) -> PDFRenderError:
+        # A running task can't be interrupted; it finishes in the background
+        # and still counts toward the queue depth until it does
+        future.cancel()
+        with self._lock:
+            self._timeouts += 1
+        logger.error(f"{generator_cls.__name__} render exceeded {self.timeout_seconds}s")
+        return PDFRenderError("PDF rendering timed out", 504)
+
+    def _on_broken_pool(self, generator_cls) -> PDFRenderError:
+        logger.error(f"PDF worker died while rendering {generator_cls.__name__}, restarting pool")
+        self._reset_executor()
+        return PDFRenderError("PDF rendering failed, please try again", 503)
+
+    async def render(self, generator_cls, *args: Any) -> bytes:
+        """Render without blocking the event loop"""
+        future = self._submit(generator_cls, args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise self._on_timeout(future, generator_cls)
+        except BrokenProcessPool:
+            raise self._on_broken_pool(generator_cls)
+
+    def render_sync(self, generator_cls, *args: Any) -> bytes:
+        """Render from a sync endpoint (threadpool) or script, blocking only the calling thread"""
+        future = self._submit(generator_cls, args)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            raise self._on_timeout(future, generator_cls)
+        except BrokenProcessPool:
+            raise self._on_broken_pool(generator_cls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self._pending,
+                "max_queue": self.max_queue,
+                "rendered": self._rendered,
+                "timeouts": self._timeouts,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+pdf_render_service = PDFRenderService(
+    max_workers=settings.PDF_RENDER_WORKERS,
+    max_queue=settings.PDF_RENDER_MAX_QUEUE,
+    timeout_seconds=settings.PDF_RENDER_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,221 @@
+"""
+Price Resolver - in-memory index of each org's price lists
+
+Quotes and previews used to query price_lists on every call (twice when
+falling back from a route price to a general one). The resolver loads an
+org's customer and subcontractor price lists once, indexes them by
+(material, unit, customer, route), and resolves in memory.
+
+Specificity:
+- customer prices: route-specific > general route, then customer-specific >
+  general customer, then the most recent valid_from
+- subcontractor prices: truck-specific > customer-specific > general
+
+Price list endpoints invalidate the org on create/update/delete. The TTL
+bounds staleness from writes made by other worker processes and scripts.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+
+from app.core.config import settings
+from app.models import PriceList, SubcontractorPriceList
+
+# (valid_from, valid_to, row) - bounds normalized to aware datetimes
+Entry = Tuple[Optional[datetime], Optional[datetime], object]
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _unit_key(unit) -> str:
+    return getattr(unit, "value", unit)
+
+
+def _first_valid(entries: List[Entry], at: datetime):
+    for valid_from, valid_to, row in entries:
+        if (valid_from is None or valid_from <= at) and (valid_to is None or valid_to >= at):
+            return row
+    return None
+
+
+class _OrgPrices:
+    """Immutable index of one org's active price lists"""
+
+    def __init__(self, price_rows, subcontractor_rows, expires_at: float):
+        self.expires_at = expires_at
+        # (material_id, unit, customer_id, from_site_id, to_site_id) -> entries, newest first
+        self.by_route: Dict[tuple, List[Entry]] = {}
+        # (material_id, customer_id) -> entries, newest first (any unit / route)
+        self.by_material: Dict[tuple, List[Entry]] = {}
+        # subcontractor_id -> entries, most specific first
+        self.by_subcontractor: Dict[int, List[Entry]] = {}
+
+        for row in price_rows:
+            entry = (_aware(row.valid_from), _aware(row.valid_to), row)
+            route_key = (row.material_id, _unit_key(row.unit), row.customer_id, row.from_site_id, row.to_site_id)
+            self.by_route.setdefault(route_key, []).append(entry)
+            self.by_material.setdefault((row.material_id, row.customer_id), []).append(entry)
+        for entries in (*self.by_route.values(), *self.by_material.values()):
+            entries.sort(key=lambda e: e[0] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+
+        for row in subcontractor_rows:
+            entry = (_aware(row.valid_from), _aware(row.valid_to), row)
+            self.by_subcontractor.setdefault(row.subcontractor_id, []).append(entry)
+        for entries in self.by_subcontractor.values():
+            entries.sort(
+                key=lambda e: (e[2].truck_id is not None, e[2].customer_id is not None, e[2].id),
+                reverse=True,
+            )
+
+
+class PriceResolver:
+    """Per-org price list index with a TTL and explicit invalidation"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        # Keyed by str(org_id), like the unread counter
+        self._orgs: Dict[str, _OrgPrices] = {}
+        # Global and per-org counters: _load() keeps its index only if
+        # neither moved while it was reading
+        self._generation = 0
+        self._org_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, org_id) -> _OrgPrices:
+        key = str(org_id)
+        with self._lock:
+            generation = (self._generation, self._org_generations.get(key, 0))
+
+        price_rows = db.execute(
+            select(
+                PriceList.id,
+                PriceList.customer_id,
+                PriceList.material_id,
+                PriceList.from_site_id,
+                PriceList.to_site_id,
+                PriceList.unit,
+                PriceList.base_price,
+                PriceList.min_charge,
+                PriceList.trip_surcharge,
+                PriceList.wait_fee_per_hour,
+                PriceList.night_surcharge_pct,
+                PriceList.valid_from,
+                PriceList.valid_to,
+            ).where(PriceList.org_id == org_id)
+        ).all()
+        subcontractor_rows = db.execute(
+            select(
+                SubcontractorPriceList.id,
+                SubcontractorPriceList.subcontractor_id,
+                SubcontractorPriceList.truck_id,
+                SubcontractorPriceList.customer_id,
+                SubcontractorPriceList.price_per_trip,
+                SubcontractorPriceList.price_per_ton,
+                SubcontractorPriceList.price_per_m3,
+                SubcontractorPriceList.price_per_km,
+                SubcontractorPriceList.min_charge,
+                SubcontractorPriceList.valid_from,
+                SubcontractorPriceList.valid_to,
+            ).where(
+                SubcontractorPriceList.org_id == org_id,
+                SubcontractorPriceList.is_active == True,
+            )
+        ).all()
+
+        prices = _OrgPrices(price_rows, subcontractor_rows, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            if (self._generation, self._org_generations.get(key, 0)) == generation:
+                self._orgs[key] = prices
+        return prices
+
+    def _prices(self, db: Session, org_id) -> _OrgPrices:
+        with self._lock:
+            prices = self._orgs.get(str(org_id))
+        if prices is None or prices.expires_at <= time.monotonic():
+            prices = self._load(db, org_id)
+        return prices
+
+    def resolve_quote(
+        self,
+        db: Session,
+        org_id,
+        customer_id: Optional[int],
+        material_id: int,
+        unit,
+        from_site_id: Optional[int] = None,
+        to_site_id: Optional[int] = None,
+        at: Optional[datetime] = None,
+    ):
+        """Price list for a quote: route price if both sites are given, else the general one"""
+        prices = self._prices(db, org_id)
+        at = _aware(at) or datetime.now(timezone.utc)
+        unit = _unit_key(unit)
+        routes = [(from_site_id, to_site_id)] if from_site_id and to_site_id else []
+        routes.append((None, None))
+        customers = [customer_id, None] if customer_id is not None else [None]
+        for from_id, to_id in routes:
+            for customer in customers:
+                row = _first_valid(prices.by_route.get((material_id, unit, customer, from_id, to_id), []), at)
+                if row is not None:
+                    return row
+        return None
+
+    def resolve_for_material(
+        self,
+        db: Session,
+        org_id,
+        customer_id: Optional[int],
+        material_id: int,
+        at: Optional[datetime] = None,
+    ):
+        """Price list for a job preview: any unit or route, customer-specific first"""
+        prices = self._prices(db, org_id)
+        at = _aware(at) or datetime.now(timezone.utc)
+        customers = [customer_id, None] if customer_id is not None else [None]
+        for customer in customers:
+            row = _first_valid(prices.by_material.get((material_id, customer), []), at)
+            if row is not None:
+                return row
+        return None
+
+    def resolve_subcontractor(
+        self,
+        db: Session,
+        org_id,
+        subcontractor_id: int,
+        truck_id: Optional[int] = None,
+        customer_id: Optional[int] = None,
+        at: Optional[datetime] = None,
+    ):
+        """Most specific active subcontractor price list (truck > customer > general)"""
+        prices = self._prices(db, org_id)
+        at = _aware(at) or datetime.now(timezone.utc)
+        for valid_from, valid_to, row in prices.by_subcontractor.get(subcontractor_id, []):
+            if truck_id and row.truck_id not in (truck_id, None):
+                continue
+            if customer_id and row.customer_id not in (customer_id, None):
+                continue
+            if (valid_from is None or valid_from <= at) and (valid_to is None or valid_to >= at):
+                return row
+        return None
+
+    def invalidate(self, org_id=None) -> None:
+        """Drop the cached index for one org, or for all orgs"""
+        with self._lock:
+            if org_id is None:
+                self._orgs.clear()
+                self._generation += 1
+            else:
+                key = str(org_id)
+                self._orgs.pop(key, None)
+                self._org_generations[key] = self._org_generations.get(key, 0) + 1
+
+
+price_resolver = PriceResolver(ttl_seconds=settings.PRICE_CACHE_TTL_SECONDS)
@@ -1,8 +1,23 @@
-"""Web Push notification service."""
-from typing import List, Dict
+"""
+Web Push notification service
+
+Fan-out is concurrent: a bounded thread pool sends to all subscriptions at
+once, reusing one pooled HTTP session per push service (FCM, Mozilla,
+Apple...) across batches. VAPID headers are signed once per push service
+per batch instead of once per subscription, and dead (404/410)
+subscriptions are deactivated with a single UPDATE.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
 import json
+import threading
+import time
 from datetime import datetime
-from pywebpush import webpush, WebPushException
+import requests
+from requests.adapters import HTTPAdapter
+from py_vapid import Vapid
+from pywebpush import WebPusher
 from sqlalchemy.orm import Session
 from app.models.push_subscription import PushSubscription
 from app.core.config import settings
@@ -10,6 +25,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Push services answer 404/410 for subscriptions that will never work again
+GONE_STATUS_CODES = (404, 410)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
 
 def _build_payload(data: Dict) -> str:
     payload = {
@@ -22,6 +43,101 @@ def _build_payload(data: Dict) -> str:
     return json.dumps(payload, ensure_ascii=False)
 
 
+def _origin(endpoint: str) -> str:
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+def _session_for(origin: str) -> requests.Session:
+    """Keep-alive session per push service, shared by all worker threads"""
+    with _sessions_lock:
+        session = _sessions.get(origin)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.PUSH_MAX_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[origin] = session
+        return session
+
+
+def _vapid_headers(origins, vapid_private_key: str) -> Dict[str, Dict[str, str]]:
+    """Sign the VAPID JWT once per push service (aud) for the whole batch"""
+    vapid = Vapid.from_string(private_key=vapid_private_key)
+    # Tokens may live up to 24h; 12h matches pywebpush's default
+    exp = int(time.time()) + 12 * 60 * 60
+    headers = {}
+    for origin in origins:
+        headers[origin] = vapid.sign({
+            "sub": settings.VAPID_SUBJECT or "mailto:support@truckflow.site",
+            "aud": origin,
+            "exp": exp,
+        })
+    return headers
+
+
+class PushResult:
+    """Outcome of one fan-out batch, by subscription id"""
+
+    def __init__(self):
+        self.sent: List[int] = []
+        self.gone: List[int] = []
+        self.failed: List[int] = []
+
+
+def dispatch_push(
+    targets: List[Dict],
+    data: str,
+    vapid_private_key: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> PushResult:
+    """
+    Send one payload to many subscriptions concurrently
+
+    targets are plain dicts ({"id", "endpoint", "p256dh", "auth"}) so worker
+    threads never touch ORM objects or the DB session.
+    """
+    result = PushResult()
+    if not targets:
+        return result
+
+    headers_by_origin = _vapid_headers(
+        {_origin(t["endpoint"]) for t in targets},
+        vapid_private_key or settings.VAPID_PRIVATE_KEY,
+    )
+
+    def send_one(target: Dict):
+        origin = _origin(target["endpoint"])
+        try:
+            response = WebPusher(
+                {
+                    "endpoint": target["endpoint"],
+                    "keys": {"p256dh": target["p256dh"], "auth": target["auth"]},
+                },
+                requests_session=_session_for(origin),
+            ).send(
+                data,
+                dict(headers_by_origin[origin]),
+                timeout=settings.PUSH_TIMEOUT_SECONDS,
+            )
+            return target["id"], response.status_code, response.text if response.status_code > 202 else None
+        except Exception as exc:
+            return target["id"], None, str(exc)
+
+    workers = min(max_workers or settings.PUSH_MAX_WORKERS, len(targets))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webpush") as pool:
+        for sub_id, status_code, error in pool.map(send_one, targets):
+            if status_code is not None and status_code <= 202:
+                result.sent.append(sub_id)
+            elif status_code in GONE_STATUS_CODES:
+                logger.warning("Push failed for subscription %s: %s (deactivating)", sub_id, status_code)
+                result.gone.append(sub_id)
+            else:
+                logger.warning("Push failed for subscription %s: %s %s", sub_id, status_code, error)
+                result.failed.append(sub_id)
+    return result
+
+
 def send_push_to_subscriptions(
     db: Session,
     subscriptions: List[PushSubscription],
@@ -31,32 +147,29 @@ def send_push_to_subscriptions(
         logger.warning("VAPID keys missing; push not sent.")
         return 0
 
-    sent = 0
-    data = _build_payload(payload)
+    targets = [
+        {"id": sub.id, "endpoint": sub.endpoint, "p256dh": sub.p256dh, "auth": sub.auth}
+        for sub in subscriptions
+        if sub.is_active
+    ]
+    # End the read transaction so no connection sits idle while the fan-out runs
+    db.commit()
 
-    for sub in subscriptions:
-        if not sub.is_active:
-            continue
-        try:
-            webpush(
-                subscription_info={
-                    "endpoint": sub.endpoint,
-                    "keys": {"p256dh": sub.p256dh, "auth": sub.auth},
-                },
-                data=data,
-                vapid_private_key=settings.VAPID_PRIVATE_KEY,
-                vapid_claims={
-                    "sub": settings.VAPID_SUBJECT or "mailto:support@truckflow.site"
-                },
-            )
-            sub.last_seen_at = datetime.utcnow()
-            sent += 1
-        except WebPushException as exc:
-            logger.warning("Push failed for subscription %s: %s", sub.id, exc)
-            status_code = getattr(getattr(exc, "response", None), "status_code", None)
-            if status_code in (404, 410):
-                sub.is_active = False
-        except Exception as exc:
-            logger.error("Unexpected push error for subscription %s: %s", sub.id, exc)
+    started = time.perf_counter()
+    result = dispatch_push(targets, _build_payload(payload))
+
+    if result.sent:
+        db.query(PushSubscription).filter(
+            PushSubscription.id.in_(result.sent)
+        ).update({"last_seen_at": datetime.utcnow()}, synchronize_session=False)
+    if result.gone:
+        db.query(PushSubscription).filter(
+            PushSubscription.id.in_(result.gone)
+        ).update({"is_active": False}, synchronize_session=False)
     db.commit()
-    return sent
+
+    logger.info(
+        f"Push fan-out: {len(result.sent)} sent, {len(result.gone)} pruned, "
+        f"{len(result.failed)} failed in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return len(result.sent)
@@ -0,0 +1,234 @@
+"""
+Repricing Service - recompute pricing_total for open jobs after a price list change
+
+Affected jobs (not canceled, not yet on a statement) are read in id-ordered
+chunks as plain rows, priced in memory through the PriceResolver index as
+of each job's scheduled date, and written back with one UPDATE ... FROM
+unnest(...) per chunk. Jobs no price list applies to any more have their
+pricing cleared. A dry run computes the same diff without writing.
+
+The run holds the org's billing lock so a billing run never snapshots
+jobs halfway through a reprice.
+"""
+from sqlalchemy import exists, select, text
+from sqlalchemy.orm import Session
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import time
+
+from app.models import Job, JobStatus, StatementLine
+from app.services.billing_service import lock_org_billing
+from app.services.price_resolver import price_resolver
+
+logger = logging.getLogger(__name__)
+
+REPRICE_CHUNK_SIZE = 5000
+DIFF_REPORT_LIMIT = 500
+
+CENT = Decimal("0.01")
+
+
+def price_breakdown(price_list, qty: Decimal) -> Tuple[Decimal, Dict]:
+    """
+    (total, breakdown) for a quantity on a price list
+
+    Same base / minimum-charge rules as POST /pricing/quote; wait fees and
+    night surcharges are not recorded on jobs, so they are not applied.
+    """
+    base_amount = price_list.base_price * qty
+    min_charge_adjustment = Decimal(0)
+    if price_list.min_charge and base_amount < price_list.min_charge:
+        min_charge_adjustment = price_list.min_charge - base_amount
+        base_amount = price_list.min_charge
+    total = base_amount.quantize(CENT)
+    return total, {
+        "price_list_id": price_list.id,
+        "unit_price": float(price_list.base_price),
+        "qty": float(qty),
+        "unit": getattr(price_list.unit, "value", price_list.unit),
+        "base_amount": float(base_amount),
+        "min_charge_adjustment": float(min_charge_adjustment),
+        "total": float(total),
+        "is_customer_specific": price_list.customer_id is not None,
+        "is_route_specific": price_list.from_site_id is not None,
+    }
+
+
+def scope_for_price_list(price_list) -> Dict:
+    """reprice_jobs() filters covering every job a price list can apply to"""
+    return {
+        "material_id": price_list.material_id,
+        "unit": getattr(price_list.unit, "value", price_list.unit),
+        "customer_id": price_list.customer_id,  # None = general price: any customer
+        "date_from": price_list.valid_from.date() if price_list.valid_from else None,
+        "date_to": price_list.valid_to.date() if price_list.valid_to else None,
+    }
+
+
+def _write_chunk(db: Session, updates) -> None:
+    db.execute(
+        text("""
+            UPDATE jobs AS j
+            SET pricing_total = v.total,
+                pricing_breakdown_json = v.breakdown::json,
+                updated_at = now()
+            FROM (
+                SELECT unnest(CAST(:ids AS integer[])) AS id,
+                       unnest(CAST(:totals AS numeric[])) AS total,
+                       unnest(CAST(:breakdowns AS text[])) AS breakdown
+            ) AS v
+            WHERE j.id = v.id
+        """),
+        {
+            "ids": [u[0] for u in updates],
+            "totals": [u[1] for u in updates],
+            "breakdowns": [u[2] for u in updates],
+        },
+    )
+
+
+def reprice_jobs(
+    db: Session,
+    org_id,
+    material_id: Optional[int] = None,
+    unit: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    date_from=None,
+    date_to=None,
+    dry_run: bool = True,
+    diff_limit: int = DIFF_REPORT_LIMIT,
+) -> Dict:
+    """
+    Re-price every open job in scope and report what changed
+
+    Commits when not a dry run; a dry run rolls back and leaves jobs untouched.
+    """
+    started = time.perf_counter()
+    lock_org_billing(db, org_id)
+    # Price lists may have been written by another worker a moment ago
+    price_resolver.invalidate(org_id)
+
+    query = select(
+        Job.id,
+        Job.customer_id,
+        Job.material_id,
+        Job.unit,
+        Job.from_site_id,
+        Job.to_site_id,
+        Job.scheduled_date,
+        Job.planned_qty,
+        Job.actual_qty,
+        Job.pricing_total,
+        Job.pricing_breakdown_json,
+    ).where(
+        Job.org_id == org_id,
+        Job.status != JobStatus.CANCELED,
+        ~exists().where(StatementLine.job_id == Job.id),
+    )
+    if material_id:
+        query = query.where(Job.material_id == material_id)
+    if unit:
+        query = query.where(Job.unit == unit)
+    if customer_id:
+        query = query.where(Job.customer_id == customer_id)
+    if date_from:
+        query = query.where(Job.scheduled_date >= datetime.combine(date_from, dt_time.min))
+    if date_to:
+        query = query.where(Job.scheduled_date < datetime.combine(date_to + timedelta(days=1), dt_time.min))
+
+    scanned = changed = unpriced = cleared = 0
+    total_delta = Decimal(0)
+    diff = []
+    last_id = 0
+    while True:
+        rows = db.execute(
+            query.where(Job.id > last_id).order_by(Job.id).limit(REPRICE_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+
+        updates = []
+        for job in rows:
+            price_list = price_resolver.resolve_quote(
+                db,
+                org_id,
+                customer_id=job.customer_id,
+                material_id=job.material_id,
+                unit=job.unit,
+                from_site_id=job.from_site_id,
+                to_site_id=job.to_site_id,
+                at=job.scheduled_date,
+            )
+            if price_list is None:
+                unpriced += 1
+                # Pricing from a price list that no longer applies (e.g. deleted)
+                if job.pricing_total is None and job.pricing_breakdown_json is None:
+                    continue
+                cleared += 1
+                delta = -(job.pricing_total or Decimal(0))
+                total_delta += delta
+                updates.append((job.id, None, None))
+                if len(diff) < diff_limit:
+                    diff.append({
+                        "job_id": job.id,
+                        "customer_id": job.customer_id,
+                        "scheduled_date": job.scheduled_date,
+                        "old_total": job.pricing_total,
+                        "new_total": None,
+                        "delta": delta,
+                        "old_price_list_id": (job.pricing_breakdown_json or {}).get("price_list_id"),
+                        "new_price_list_id": None,
+                    })
+                continue
+
+            total, breakdown = price_breakdown(price_list, job.actual_qty or job.planned_qty)
+            old_breakdown = job.pricing_breakdown_json or {}
+            if total == job.pricing_total and old_breakdown.get("price_list_id") == price_list.id:
+                continue
+
+            changed += 1
+            delta = total - (job.pricing_total or Decimal(0))
+            total_delta += delta
+            updates.append((job.id, total, json.dumps(breakdown)))
+            if len(diff) < diff_limit:
+                diff.append({
+                    "job_id": job.id,
+                    "customer_id": job.customer_id,
+                    "scheduled_date": job.scheduled_date,
+                    "old_total": job.pricing_total,
+                    "new_total": total,
+                    "delta": delta,
+                    "old_price_list_id": old_breakdown.get("price_list_id"),
+                    "new_price_list_id": price_list.id,
+                })
+
+        if updates and not dry_run:
+            _write_chunk(db, updates)
+
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    logger.info(
+        f"Reprice org {org_id}{' (dry run)' if dry_run else ''}: {scanned} scanned, "
+        f"{changed} changed, {unpriced} without price list ({cleared} cleared) in {duration_ms} ms"
+    )
+    return {
+        "dry_run": dry_run,
+        "scanned": scanned,
+        "changed": changed,
+        "unchanged": scanned - changed - unpriced,
+        "unpriced": unpriced,
+        "cleared": cleared,
+        "total_delta": total_delta,
+        "duration_ms": duration_ms,
+        "diff": diff,
+        "diff_truncated": changed + cleared > len(diff),
+    }
@@ -0,0 +1,232 @@
+"""
+Share Links - short id generation and a cached resolver for /share/{short_id}
+
+Short ids are 8 characters over [a-z0-9]. Each one is the share_urls.id
+sequence value run through a keyed permutation of the 36^8 id space: a
+4-round Feistel network keyed from JWT_SECRET_KEY, cycle-walked into range.
+Distinct sequence values always give distinct ids, so nothing is probed
+before inserting, and without the key the ids are as unguessable as the
+random ones they replace. Inserts still use ON CONFLICT DO NOTHING. That
+covers legacy random ids, or ids made under a rotated key, landing on the
+same value; those rows simply take the next sequence value.
+
+The resolver keeps short_id -> (job, org, creator, expiry, redirect token)
+in an LRU with a TTL. Misses are cached too, for a shorter TTL, so bots
+hammering dead links do not reach the database. Deactivating a link
+invalidates it on commit. Other worker processes see the change within
+SHARE_LINK_CACHE_TTL_SECONDS.
+"""
+from collections import OrderedDict
+from sqlalchemy import or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+import hashlib
+import hmac
+import threading
+import time
+
+from app.core.config import settings
+from app.core.database import defer_invalidation, register_commit_invalidation
+from app.core.security import create_access_token
+from app.models import ShareUrl
+
+SHORT_ID_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+SHORT_ID_LENGTH = 8
+SHORT_ID_SPACE = len(SHORT_ID_ALPHABET) ** SHORT_ID_LENGTH  # ~2.8e12 < 2^42
+
+SHARE_LINK_LIFETIME = timedelta(days=30)
+# Cached with the link and reused until the entry expires; the positive TTL
+# is capped so a token handed out from the cache has at least the margin left
+REDIRECT_TOKEN_LIFETIME = timedelta(minutes=5)
+REDIRECT_TOKEN_MARGIN = timedelta(minutes=1)
+
+_FEISTEL_HALF_BITS = 21
+_FEISTEL_HALF_MASK = (1 << _FEISTEL_HALF_BITS) - 1
+_FEISTEL_ROUNDS = 4
+
+_PENDING_KEY = "share_link_resolver_pending"
+
+
+def _feistel_key() -> bytes:
+    return hmac.new(settings.JWT_SECRET_KEY.encode(), b"share-link-ids", hashlib.sha256).digest()
+
+
+def _feistel(value: int, key: bytes) -> int:
+    """Keyed permutation of [0, 2^42)"""
+    left, right = value >> _FEISTEL_HALF_BITS, value & _FEISTEL_HALF_MASK
+    for round_number in range(_FEISTEL_ROUNDS):
+        digest = hmac.new(key, bytes([round_number]) + right.to_bytes(3, "big"), hashlib.sha256).digest()
+        left, right = right, left ^ (int.from_bytes(digest[:3], "big") & _FEISTEL_HALF_MASK)
+    return (left << _FEISTEL_HALF_BITS) | right
+
+
+def short_id_for(sequence_value: int, key: Optional[bytes] = None) -> str:
+    """8-character id for a share_urls.id value; a bijection over the id space"""
+    key = key or _feistel_key()
+    value = sequence_value % SHORT_ID_SPACE
+    # Cycle-walk: re-permute until the result falls inside the id space
+    value = _feistel(value, key)
+    while value >= SHORT_ID_SPACE:
+        value = _feistel(value, key)
+    chars = []
+    for _ in range(SHORT_ID_LENGTH):
+        value, index = divmod(value, len(SHORT_ID_ALPHABET))
+        chars.append(SHORT_ID_ALPHABET[index])
+    return "".join(chars)
+
+
+def share_link_usable():
+    """Filter for links that still open: active and not expired"""
+    return (
+        ShareUrl.is_active == True,
+        or_(ShareUrl.expires_at.is_(None), ShareUrl.expires_at > datetime.now(timezone.utc)),
+    )
+
+
+def create_share_links(
+    db: Session,
+    org_id: int,
+    job_ids: Iterable[int],
+    created_by: Optional[int],
+) -> Dict[int, str]:
+    """
+    Insert one active share link per job id; returns {job_id: short_id}.
+
+    Sequence values are reserved in one query and the rows inserted in one
+    statement. The caller commits.
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+    expires_at = datetime.now(timezone.utc) + SHARE_LINK_LIFETIME
+    key = _feistel_key()
+    created: Dict[int, str] = {}
+
+    while job_ids:
+        ids = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('share_urls', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(job_ids)},
+        ).scalars().all()
+        rows = [
+            {
+                "id": row_id,
+                "short_id": short_id_for(row_id, key),
+                "job_id": job_id,
+                "org_id": org_id,
+                "created_by": created_by,
+                "expires_at": expires_at,
+                "is_active": True,
+            }
+            for row_id, job_id in zip(ids, job_ids)
+        ]
+        inserted = db.execute(
+            insert(ShareUrl).values(rows)
+            .on_conflict_do_nothing(index_elements=["short_id"])
+            .returning(ShareUrl.job_id, ShareUrl.short_id)
+        ).all()
+        created.update({row.job_id: row.short_id for row in inserted})
+        job_ids = [job_id for job_id in job_ids if job_id not in created]
+
+    # A cached miss for a brand-new id must not outlive the commit
+    defer_invalidation(db, _PENDING_KEY, created.values())
+    return created
+
+
+class ResolvedShare:
+    __slots__ = ("job_id", "org_id", "created_by", "expires_at", "token")
+
+    def __init__(self, job_id: int, org_id: int, created_by: Optional[int], expires_at: Optional[datetime], token: str):
+        self.job_id = job_id
+        self.org_id = org_id
+        self.created_by = created_by
+        self.expires_at = expires_at
+        self.token = token
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and datetime.now(timezone.utc) > self.expires_at
+
+
+class ShareLinkResolver:
+    """LRU + TTL cache of active share links, with negative caching"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, negative_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = min(ttl_seconds, (REDIRECT_TOKEN_LIFETIME - REDIRECT_TOKEN_MARGIN).total_seconds())
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Optional[ResolvedShare], float]]" = OrderedDict()
+        # A resolve() whose load overlapped an invalidate() sees a new value and skips caching
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+
+    def _load(self, db: Session, short_id: str) -> Optional[ResolvedShare]:
+        row = db.execute(
+            select(ShareUrl.job_id, ShareUrl.org_id, ShareUrl.created_by, ShareUrl.expires_at)
+            .where(ShareUrl.short_id == short_id, ShareUrl.is_active == True)
+        ).first()
+        if row is None:
+            return None
+        token = create_access_token(
+            {"sub": str(row.created_by or 0), "org_id": str(row.org_id)},
+            expires_delta=REDIRECT_TOKEN_LIFETIME,
+        )
+        return ResolvedShare(row.job_id, row.org_id, row.created_by, row.expires_at, token)
+
+    def resolve(self, db: Session, short_id: str) -> Optional[ResolvedShare]:
+        """The active link for short_id, or None"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(short_id)
+            if cached is not None and cached[1] > now:
+                self._entries.move_to_end(short_id)
+                if cached[0] is None:
+                    self._negative_hits += 1
+                else:
+                    self._hits += 1
+                return cached[0]
+            self._misses += 1
+            generation = self._generation
+
+        resolved = self._load(db, short_id)
+        ttl = self.ttl_seconds if resolved is not None else self.negative_ttl_seconds
+        with self._lock:
+            if generation == self._generation:
+                self._entries[short_id] = (resolved, time.monotonic() + ttl)
+                self._entries.move_to_end(short_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return resolved
+
+    def invalidate(self, short_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for short_id in short_ids:
+                self._entries.pop(short_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+            }
+
+
+share_link_resolver = ShareLinkResolver(
+    max_entries=settings.SHARE_LINK_CACHE_SIZE,
+    ttl_seconds=settings.SHARE_LINK_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.SHARE_LINK_NEGATIVE_TTL_SECONDS,
+)
+
+
+# --- Invalidation -----------------------------------------------------------
+
+def _affected_short_ids(session, obj) -> Set[str]:
+    return {obj.short_id} if isinstance(obj, ShareUrl) and obj.short_id else set()
+
+
+register_commit_invalidation(_PENDING_KEY, _affected_short_ids, share_link_resolver.invalidate)
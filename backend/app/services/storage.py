@@ -1,15 +1,170 @@
 """
 Storage service for file uploads
 MVP: Local filesystem storage
-Future: S3/MinIO support via USE_S3_STORAGE environment variable
+S3/MinIO support via USE_S3_STORAGE environment variable
+
+StorageService is synchronous. Async endpoints go through async_storage,
+which runs the same calls on a bounded thread pool of its own, so slow
+object storage neither blocks the event loop nor takes threads from sync
+endpoints.
+
+S3 transfers share one boto3 client with an S3_MAX_POOL_CONNECTIONS pool.
+Uploads switch to multipart above S3_MULTIPART_THRESHOLD_MB, with
+S3_MULTIPART_PART_SIZE_MB parts and S3_TRANSFER_CONCURRENCY parts in
+flight per file.
 """
 import os
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import BinaryIO, Dict, Iterable, List, Optional, Protocol
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import hashlib
+import threading
+import time
 import uuid
 import shutil
 
+from app.core.config import settings
+
+MB = 1024 * 1024
+
+# DeleteObjects takes up to 1000 keys per call
+S3_DELETE_BATCH_SIZE = 1000
+
+# Presigned URLs are reused until this much of their lifetime is left,
+# so a URL handed out from the cache is still valid for a while
+PRESIGN_REUSE_MARGIN_FRACTION = 0.1
+PRESIGN_REUSE_MARGIN_MIN_SECONDS = 30
+PRESIGN_CACHE_MAX_ENTRIES = 10000
+
+
+class StorageWriter:
+    """
+    Incremental upload to one storage key - see StorageService.open_writer()
+
+    write() takes chunks in order and keeps a running size and SHA-256, so
+    callers never hold the whole file. Local storage writes to a temporary
+    file renamed into place on commit(); S3 sends parts of
+    S3_MULTIPART_PART_SIZE_MB as they fill, up to S3_TRANSFER_CONCURRENCY
+    at a time (a single PUT if the file is smaller than one part).
+    """
+
+    def __init__(self, service: "StorageService", storage_key: str, content_type: Optional[str]):
+        self.service = service
+        self.storage_key = storage_key
+        self.content_type = content_type
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+        if service.use_s3:
+            self._buffer = bytearray()
+            self._upload_id = None
+            self._parts: List[Future] = []
+        else:
+            self._path = service.storage_path / storage_key
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._tmp_path = self._path.with_name(f".{self._path.name}.part")
+            self._file = open(self._tmp_path, "wb")
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+        if not self.service.use_s3:
+            self._file.write(chunk)
+            return
+        self._buffer += chunk
+        if len(self._buffer) >= self.service.part_size:
+            self._upload_part()
+
+    def _upload_part(self) -> None:
+        client = self.service.s3_client
+        if self._upload_id is None:
+            extra = {"ContentType": self.content_type} if self.content_type else {}
+            self._upload_id = client.create_multipart_upload(
+                Bucket=self.service.bucket, Key=self.storage_key, **extra
+            )["UploadId"]
+
+        # Bound the parts in flight (and the memory they hold)
+        in_flight = [part for part in self._parts if not part.done()]
+        if len(in_flight) >= self.service.transfer_concurrency:
+            in_flight[0].result()
+
+        part_number = len(self._parts) + 1
+        self._parts.append(self.service.transfer_executor.submit(
+            self._send_part, part_number, bytes(self._buffer)
+        ))
+        self._buffer.clear()
+
+    def _send_part(self, part_number: int, body: bytes) -> dict:
+        response = self.service.s3_client.upload_part(
+            Bucket=self.service.bucket,
+            Key=self.storage_key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+    def commit(self) -> str:
+        """Finish the upload and return the storage key"""
+        if not self.service.use_s3:
+            self._file.close()
+            os.replace(self._tmp_path, self._path)
+            return self.storage_key
+
+        client = self.service.s3_client
+        if self._upload_id is None:
+            extra = {"ContentType": self.content_type} if self.content_type else {}
+            client.put_object(Bucket=self.service.bucket, Key=self.storage_key, Body=bytes(self._buffer), **extra)
+        else:
+            if self._buffer:
+                self._upload_part()
+            client.complete_multipart_upload(
+                Bucket=self.service.bucket,
+                Key=self.storage_key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": [part.result() for part in self._parts]},
+            )
+        return self.storage_key
+
+    def abort(self) -> None:
+        """Discard everything written so far"""
+        if not self.service.use_s3:
+            self._file.close()
+            self._tmp_path.unlink(missing_ok=True)
+        elif self._upload_id is not None:
+            for part in self._parts:
+                part.cancel()
+            for part in self._parts:
+                if not part.cancelled():
+                    part.exception()
+            self.service.s3_client.abort_multipart_upload(
+                Bucket=self.service.bucket, Key=self.storage_key, UploadId=self._upload_id
+            )
+
+
+class StorageBackend(Protocol):
+    """What callers (and async_storage) rely on; StorageService implements it for both modes"""
+
+    def upload_file(self, file: BinaryIO, filename: str, folder: str = "", content_type: Optional[str] = None) -> str: ...
+    def upload_bytes(self, data: bytes, storage_key: str, content_type: Optional[str] = None) -> str: ...
+    def open_writer(self, filename: str, folder: str = "", content_type: Optional[str] = None) -> StorageWriter: ...
+    def open_file(self, storage_key: str) -> BinaryIO: ...
+    def read_bytes(self, storage_key: str) -> Optional[bytes]: ...
+    def get_presigned_url(self, storage_key: str, expiration: int = 3600) -> str: ...
+    def delete_file(self, storage_key: str) -> bool: ...
+    def delete_files(self, storage_keys: Iterable[str]) -> int: ...
+    def delete_prefix(self, prefix: str, keep: Optional[str] = None) -> int: ...
+    def file_exists(self, storage_key: str) -> bool: ...
+    def files_exist(self, storage_keys: Iterable[str]) -> Dict[str, bool]: ...
+
 
 class StorageService:
     """
@@ -25,7 +180,8 @@ class StorageService:
         if self.use_s3:
             # S3/MinIO mode (production)
             import boto3
-            from botocore.exceptions import ClientError
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
             
             self.endpoint = os.getenv("S3_ENDPOINT", "http://minio:9000")
             self.access_key = os.getenv("S3_ACCESS_KEY", "minioadmin")
@@ -33,12 +189,33 @@ class StorageService:
             self.bucket = os.getenv("S3_BUCKET", "fleet-uploads")
             self.region = os.getenv("S3_REGION", "us-east-1")
             
+            self._presign_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+            self._presign_lock = threading.Lock()
+            
+            self.part_size = max(settings.S3_MULTIPART_PART_SIZE_MB, 5) * MB
+            self.transfer_concurrency = max(settings.S3_TRANSFER_CONCURRENCY, 1)
+            self.transfer_config = TransferConfig(
+                multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+                multipart_chunksize=self.part_size,
+                max_concurrency=self.transfer_concurrency,
+            )
+            # Worker threads for streamed-upload parts and batched HEADs;
+            # never more than the client has connections
+            self.transfer_executor = ThreadPoolExecutor(
+                max_workers=settings.S3_MAX_POOL_CONNECTIONS, thread_name_prefix="s3-transfer"
+            )
+            
+            # boto3 clients are thread-safe; one client, one bounded connection pool
             self.s3_client = boto3.client(
                 's3',
                 endpoint_url=self.endpoint,
                 aws_access_key_id=self.access_key,
                 aws_secret_access_key=self.secret_key,
-                region_name=self.region
+                region_name=self.region,
+                config=Config(
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                )
             )
             self._ensure_bucket_exists()
         else:
@@ -66,11 +243,7 @@ class StorageService:
         Returns:
             Storage key (relative path)
         """
-        # Generate unique filename: YYYYMMDD_HHMMSS_UUID.ext
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        file_ext = os.path.splitext(filename)[1].lower()
-        storage_key = f"{folder}/{timestamp}_{unique_id}{file_ext}" if folder else f"{timestamp}_{unique_id}{file_ext}"
+        storage_key = self._new_key(filename, folder)
         
         if self.use_s3:
             # Upload to S3/MinIO
@@ -79,7 +252,9 @@ class StorageService:
                 extra_args['ContentType'] = content_type
             
             file.seek(0)
-            self.s3_client.upload_fileobj(file, self.bucket, storage_key, ExtraArgs=extra_args)
+            self.s3_client.upload_fileobj(
+                file, self.bucket, storage_key, ExtraArgs=extra_args, Config=self.transfer_config
+            )
         else:
             # Save to local filesystem
             file_path = self.storage_path / storage_key
@@ -91,6 +266,57 @@ class StorageService:
         
         return storage_key
     
+    @staticmethod
+    def _new_key(filename: str, folder: str = "") -> str:
+        # Generate unique filename: YYYYMMDD_HHMMSS_UUID.ext
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        unique_id = str(uuid.uuid4())[:8]
+        file_ext = os.path.splitext(filename)[1].lower()
+        return f"{folder}/{timestamp}_{unique_id}{file_ext}" if folder else f"{timestamp}_{unique_id}{file_ext}"
+    
+    def open_writer(
+        self,
+        filename: str,
+        folder: str = "",
+        content_type: Optional[str] = None
+    ) -> StorageWriter:
+        """
+        Start a chunked upload under a new unique key.
+        
+        Call writer.write(chunk) for each chunk, then writer.commit() to
+        publish the file or writer.abort() to discard it.
+        """
+        return StorageWriter(self, self._new_key(filename, folder), content_type)
+    
+    def upload_bytes(self, data: bytes, storage_key: str, content_type: Optional[str] = None) -> str:
+        """Store a small in-memory object (e.g. a thumbnail) under an exact key."""
+        if self.use_s3:
+            extra = {"ContentType": content_type} if content_type else {}
+            self.s3_client.put_object(Bucket=self.bucket, Key=storage_key, Body=data, **extra)
+        else:
+            file_path = self.storage_path / storage_key
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_bytes(data)
+        return storage_key
+    
+    def open_file(self, storage_key: str) -> BinaryIO:
+        """Open a stored file for reading (caller closes it)."""
+        if self.use_s3:
+            return self.s3_client.get_object(Bucket=self.bucket, Key=storage_key)["Body"]
+        return open(self.storage_path / storage_key, "rb")
+    
+    def read_bytes(self, storage_key: str) -> Optional[bytes]:
+        """Contents of a stored file, or None if it does not exist."""
+        if self.use_s3:
+            try:
+                return self.s3_client.get_object(Bucket=self.bucket, Key=storage_key)["Body"].read()
+            except self.s3_client.exceptions.NoSuchKey:
+                return None
+        try:
+            return (self.storage_path / storage_key).read_bytes()
+        except FileNotFoundError:
+            return None
+    
     def get_presigned_url(self, storage_key: str, expiration: int = 3600) -> str:
         """
         Get URL for accessing a file.
@@ -103,12 +329,29 @@ class StorageService:
             Access URL
         """
         if self.use_s3:
-            # Generate S3 presigned URL
-            return self.s3_client.generate_presigned_url(
+            # Signing is local but not free; listings presign every file, so reuse
+            # a URL until it gets close to expiring (LRU-bounded)
+            cache_key = (storage_key, expiration)
+            now = time.monotonic()
+            with self._presign_lock:
+                cached = self._presign_cache.get(cache_key)
+                if cached and cached[1] > now:
+                    self._presign_cache.move_to_end(cache_key)
+                    return cached[0]
+            
+            url = self.s3_client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.bucket, 'Key': storage_key},
                 ExpiresIn=expiration
             )
+            margin = max(expiration * PRESIGN_REUSE_MARGIN_FRACTION, PRESIGN_REUSE_MARGIN_MIN_SECONDS)
+            if expiration > margin:
+                with self._presign_lock:
+                    self._presign_cache[cache_key] = (url, now + expiration - margin)
+                    self._presign_cache.move_to_end(cache_key)
+                    while len(self._presign_cache) > PRESIGN_CACHE_MAX_ENTRIES:
+                        self._presign_cache.popitem(last=False)
+            return url
         else:
             # Return local URL path (served by FastAPI static mount with /api prefix)
             return f"/api/uploads/{storage_key}"
@@ -118,6 +361,7 @@ class StorageService:
         try:
             if self.use_s3:
                 self.s3_client.delete_object(Bucket=self.bucket, Key=storage_key)
+                self._forget_presigned([storage_key])
             else:
                 file_path = self.storage_path / storage_key
                 if file_path.exists():
@@ -127,6 +371,66 @@ class StorageService:
             print(f"❌ Error deleting {storage_key}: {e}")
             return False
     
+    def _forget_presigned(self, storage_keys: Iterable[str]) -> None:
+        storage_keys = set(storage_keys)
+        with self._presign_lock:
+            for cache_key in [k for k in self._presign_cache if k[0] in storage_keys]:
+                del self._presign_cache[cache_key]
+    
+    def delete_files(self, storage_keys: Iterable[str]) -> int:
+        """
+        Delete many files; returns how many were deleted.
+        
+        S3: one DeleteObjects request per 1000 keys. Missing keys are not errors.
+        """
+        storage_keys = list(dict.fromkeys(storage_keys))
+        if not storage_keys:
+            return 0
+        
+        if self.use_s3:
+            deleted = 0
+            for start in range(0, len(storage_keys), S3_DELETE_BATCH_SIZE):
+                batch = storage_keys[start:start + S3_DELETE_BATCH_SIZE]
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+                )
+                errors = response.get("Errors", [])
+                for error in errors:
+                    print(f"❌ Error deleting {error.get('Key')}: {error.get('Message')}")
+                deleted += len(batch) - len(errors)
+            self._forget_presigned(storage_keys)
+            return deleted
+        
+        deleted = 0
+        for storage_key in storage_keys:
+            file_path = self.storage_path / storage_key
+            if file_path.is_file():
+                file_path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+    
+    def delete_prefix(self, prefix: str, keep: Optional[str] = None) -> int:
+        """Delete every file under a folder prefix (except `keep`); returns the count."""
+        prefix = prefix.rstrip("/") + "/"
+        if self.use_s3:
+            return self.delete_files(
+                obj["Key"]
+                for page in self.s3_client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=prefix)
+                for obj in page.get("Contents", [])
+                if obj["Key"] != keep
+            )
+        
+        folder = self.storage_path / prefix
+        if not folder.is_dir():
+            return 0
+        deleted = 0
+        for file_path in folder.rglob("*"):
+            if file_path.is_file() and file_path.relative_to(self.storage_path).as_posix() != keep:
+                file_path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+    
     def file_exists(self, storage_key: str) -> bool:
         """Check if file exists."""
         try:
@@ -138,6 +442,18 @@ class StorageService:
         except:
             return False
     
+    def files_exist(self, storage_keys: Iterable[str]) -> Dict[str, bool]:
+        """
+        Existence of many files.
+        
+        S3 has no batch HEAD: the HEADs run in parallel on the transfer
+        threads, bounded by the connection pool.
+        """
+        storage_keys = list(dict.fromkeys(storage_keys))
+        if self.use_s3:
+            return dict(zip(storage_keys, self.transfer_executor.map(self.file_exists, storage_keys)))
+        return {key: (self.storage_path / key).is_file() for key in storage_keys}
+    
     def _ensure_bucket_exists(self):
         """Create S3 bucket if it doesn't exist."""
         from botocore.exceptions import ClientError
@@ -151,11 +467,99 @@ class StorageService:
 
 # Singleton instance
 _storage_service = None
+_storage_service_lock = threading.Lock()
 
 
 def get_storage_service() -> StorageService:
     """Get singleton StorageService instance."""
     global _storage_service
     if _storage_service is None:
-        _storage_service = StorageService()
+        # First use can come from several storage threads at once
+        with _storage_service_lock:
+            if _storage_service is None:
+                _storage_service = StorageService()
     return _storage_service
+
+
+class AsyncStorage:
+    """
+    Async front-end for the storage backend
+    
+    Every call runs on a dedicated pool of STORAGE_IO_WORKERS threads. That
+    pool bounds concurrent storage calls and keeps them off both the event
+    loop and the threadpool that serves sync endpoints.
+    
+    Usage:
+        storage_key = await async_storage.upload_file(file.file, file.filename, folder="orgs/1")
+        await async_storage.delete_files([key, thumbnail_key])
+        await async_storage.run(writer.write, chunk)
+    """
+    
+    def __init__(self, max_workers: int, backend: Optional[StorageBackend] = None):
+        self.max_workers = max_workers
+        self._backend = backend
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._calls = 0
+    
+    @property
+    def backend(self) -> StorageBackend:
+        return self._backend or get_storage_service()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="storage-io"
+                )
+            return self._executor
+    
+    async def run(self, func, *args, **kwargs):
+        """Run any blocking storage call (e.g. StorageWriter.write) on the storage pool"""
+        executor = self._get_executor()
+        with self._lock:
+            self._in_flight += 1
+            self._calls += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    async def upload_file(
+        self,
+        file: BinaryIO,
+        filename: str,
+        folder: str = "",
+        content_type: Optional[str] = None
+    ) -> str:
+        return await self.run(self.backend.upload_file, file, filename, folder, content_type)
+    
+    async def upload_bytes(self, data: bytes, storage_key: str, content_type: Optional[str] = None) -> str:
+        return await self.run(self.backend.upload_bytes, data, storage_key, content_type)
+    
+    async def read_bytes(self, storage_key: str) -> Optional[bytes]:
+        return await self.run(self.backend.read_bytes, storage_key)
+    
+    async def delete_files(self, storage_keys: Iterable[str]) -> int:
+        return await self.run(self.backend.delete_files, list(storage_keys))
+    
+    async def delete_prefix(self, prefix: str, keep: Optional[str] = None) -> int:
+        return await self.run(self.backend.delete_prefix, prefix, keep)
+    
+    async def files_exist(self, storage_keys: Iterable[str]) -> Dict[str, bool]:
+        return await self.run(self.backend.files_exist, list(storage_keys))
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": self.max_workers, "in_flight": self._in_flight, "calls": self._calls}
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+async_storage = AsyncStorage(max_workers=settings.STORAGE_IO_WORKERS)
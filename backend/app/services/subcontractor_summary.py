@@ -0,0 +1,158 @@
+"""
+Subcontractor Summary - job counts, quantities and profit computed in SQL
+
+One query per call: subcontractor jobs in the period grouped by
+(subcontractor_id, status), each group summing quantity, company price and
+subcontractor price. Per-subcontractor totals, profit and the status
+histogram are then folded from those few rows in one pass, so the cost no
+longer grows with the number of jobs loaded into Python.
+
+The same grouping serves a single subcontractor's summary and the
+org-wide leaderboard.
+"""
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from app.models import Job, Subcontractor
+
+LEADERBOARD_SORT_KEYS = ("profit", "total_company_price", "total_jobs", "total_quantity")
+
+# NULLIF(..., 0) keeps the previous `a or b` fallbacks: a zero actual
+# quantity / override falls through to the planned quantity / list price.
+_quantity = func.coalesce(func.nullif(Job.actual_qty, 0), Job.planned_qty, 0)
+# Use manual_override_total if set so reports reflect what the customer is billed
+_company_price = func.coalesce(func.nullif(Job.manual_override_total, 0), Job.pricing_total, 0)
+_subcontractor_price = func.coalesce(Job.subcontractor_price_total, 0)
+
+
+def _empty_totals() -> Dict:
+    return {
+        "total_jobs": 0,
+        "total_quantity": Decimal(0),
+        "total_company_price": Decimal(0),
+        "total_subcontractor_price": Decimal(0),
+        "jobs_by_status": {},
+    }
+
+
+def aggregate_jobs(
+    db: Session,
+    org_id: int,
+    subcontractor_ids: Optional[Iterable[int]] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> Dict[int, Dict]:
+    """
+    Totals per subcontractor id: job count, quantity, company / subcontractor
+    price and a {status: count} histogram. Subcontractors without jobs in
+    the period are absent.
+    """
+    filters = [
+        Job.org_id == org_id,
+        Job.is_subcontractor == True,
+        Job.subcontractor_id.isnot(None),
+    ]
+    if subcontractor_ids is not None:
+        filters.append(Job.subcontractor_id.in_(list(subcontractor_ids)))
+    if from_date:
+        filters.append(Job.scheduled_date >= from_date)
+    if to_date:
+        filters.append(Job.scheduled_date <= to_date)
+
+    stmt = (
+        select(
+            Job.subcontractor_id,
+            Job.status,
+            func.count(Job.id).label("jobs"),
+            func.sum(_quantity).label("quantity"),
+            func.sum(_company_price).label("company_price"),
+            func.sum(_subcontractor_price).label("subcontractor_price"),
+        )
+        .where(and_(*filters))
+        .group_by(Job.subcontractor_id, Job.status)
+    )
+
+    totals: Dict[int, Dict] = {}
+    for row in db.execute(stmt):
+        entry = totals.get(row.subcontractor_id)
+        if entry is None:
+            entry = totals[row.subcontractor_id] = _empty_totals()
+        entry["total_jobs"] += row.jobs
+        entry["total_quantity"] += row.quantity
+        entry["total_company_price"] += row.company_price
+        entry["total_subcontractor_price"] += row.subcontractor_price
+        entry["jobs_by_status"][row.status.value] = row.jobs
+    return totals
+
+
+def financials(totals: Dict) -> Dict:
+    """Company price, subcontractor price, profit and margin as floats"""
+    profit = totals["total_company_price"] - totals["total_subcontractor_price"]
+    company_price = totals["total_company_price"]
+    return {
+        "total_company_price": float(company_price),
+        "total_subcontractor_price": float(totals["total_subcontractor_price"]),
+        "profit": float(profit),
+        "profit_margin_pct": float(profit / company_price * 100) if company_price > 0 else 0.0,
+    }
+
+
+def subcontractor_summary(
+    db: Session,
+    org_id: int,
+    subcontractor_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> Dict:
+    """statistics / financials blocks of GET /subcontractors/{id}/summary"""
+    totals = aggregate_jobs(db, org_id, [subcontractor_id], from_date, to_date).get(
+        subcontractor_id, _empty_totals()
+    )
+    return {
+        "statistics": {
+            "total_jobs": totals["total_jobs"],
+            "total_quantity": float(totals["total_quantity"]),
+            "jobs_by_status": totals["jobs_by_status"],
+        },
+        "financials": financials(totals),
+    }
+
+
+def subcontractor_leaderboard(
+    db: Session,
+    org_id: int,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    sort_by: str = "profit",
+    limit: int = 10,
+) -> List[Dict]:
+    """Subcontractors with jobs in the period, best first by sort_by"""
+    if sort_by not in LEADERBOARD_SORT_KEYS:
+        raise ValueError(f"sort_by must be one of: {', '.join(LEADERBOARD_SORT_KEYS)}")
+
+    totals = aggregate_jobs(db, org_id, from_date=from_date, to_date=to_date)
+    names = dict(
+        db.query(Subcontractor.id, Subcontractor.name).filter(
+            Subcontractor.org_id == org_id,
+            Subcontractor.id.in_(list(totals)),
+        )
+    ) if totals else {}
+
+    entries = [
+        {
+            "subcontractor_id": subcontractor_id,
+            "subcontractor_name": names.get(subcontractor_id, ""),
+            "total_jobs": entry["total_jobs"],
+            "total_quantity": float(entry["total_quantity"]),
+            "jobs_by_status": entry["jobs_by_status"],
+            **financials(entry),
+        }
+        for subcontractor_id, entry in totals.items()
+    ]
+    entries.sort(key=lambda e: (-e[sort_by], e["subcontractor_id"]))
+    for rank, entry in enumerate(entries[:limit], start=1):
+        entry["rank"] = rank
+    return entries[:limit]
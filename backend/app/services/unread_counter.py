@@ -0,0 +1,156 @@
+"""
+Unread alert counter - in-process, incrementally maintained badge counts
+
+A user's unread count is the sum of three disjoint buckets:
+- ("user", user_id, role): alerts for this user not also targeted at their role
+- ("role", role): alerts for the user's role (shared by everyone in it)
+- ("broadcast",): alerts with no user and no role
+
+Each bucket is a cheap single-branch COUNT on an inbox index, cached per org
+with a TTL. AlertService adjusts cached buckets in place when it changes a
+single alert, and bulk operations (sweeps, auto-resolve, cleanup) invalidate.
+The TTL bounds staleness from alerts expiring by time and from writes made by
+other worker processes.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple, Union
+from uuid import UUID
+import threading
+import time
+
+from app.core.config import settings
+from app.models.alert import Alert, AlertStatus
+
+BucketKey = Tuple
+OrgId = Union[int, UUID]
+
+
+class UnreadCounter:
+    """Per-(org, user) / per-(org, role) / per-org unread counters with a TTL"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        # Keyed by str(org_id) so int, UUID and JSON-decoded ids all match
+        self._buckets: Dict[str, Dict[BucketKey, Tuple[int, float]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket_keys(user_id: Optional[int], user_role: Optional[str]) -> list:
+        keys = [("broadcast",)]
+        if user_id:
+            keys.append(("user", user_id, user_role or None))
+        if user_role:
+            keys.append(("role", user_role))
+        return keys
+
+    @staticmethod
+    def _bucket_filter(key: BucketKey):
+        if key[0] == "user":
+            _, user_id, user_role = key
+            if user_role is None:
+                return Alert.created_for_user_id == user_id
+            return (Alert.created_for_user_id == user_id) & or_(
+                Alert.created_for_role.is_(None),
+                Alert.created_for_role != user_role
+            )
+        if key[0] == "role":
+            return Alert.created_for_role == key[1]
+        return Alert.created_for_user_id.is_(None) & Alert.created_for_role.is_(None)
+
+    @staticmethod
+    def _bucket_matches(key: BucketKey, alert: Alert) -> bool:
+        if key[0] == "user":
+            _, user_id, user_role = key
+            return alert.created_for_user_id == user_id and (
+                user_role is None or alert.created_for_role != user_role
+            )
+        if key[0] == "role":
+            return alert.created_for_role == key[1]
+        return alert.created_for_user_id is None and alert.created_for_role is None
+
+    def _count_stmt(self, org_id: OrgId, key: BucketKey):
+        return select(func.count(Alert.id)).where(
+            Alert.org_id == org_id,
+            Alert.status == AlertStatus.UNREAD.value,
+            self._bucket_filter(key),
+            or_(
+                Alert.expires_at.is_(None),
+                Alert.expires_at > datetime.utcnow()
+            )
+        )
+
+    def _cached(self, org_id: OrgId, key: BucketKey, now: float) -> Optional[int]:
+        with self._lock:
+            cached = self._buckets.get(str(org_id), {}).get(key)
+        return cached[0] if cached and cached[1] > now else None
+
+    def _store(self, org_id: OrgId, key: BucketKey, count: int, now: float) -> None:
+        with self._lock:
+            self._buckets.setdefault(str(org_id), {})[key] = (count, now + self.ttl_seconds)
+
+    def get(
+        self,
+        db: Session,
+        org_id: OrgId,
+        user_id: Optional[int],
+        user_role: Optional[str]
+    ) -> int:
+        """Unread count for a user, computing only the buckets missing from cache"""
+        now = time.monotonic()
+        total = 0
+        for key in self._bucket_keys(user_id, user_role):
+            count = self._cached(org_id, key, now)
+            if count is None:
+                count = db.execute(self._count_stmt(org_id, key)).scalar() or 0
+                self._store(org_id, key, count, now)
+            total += count
+        return total
+
+    async def get_async(
+        self,
+        db: AsyncSession,
+        org_id: OrgId,
+        user_id: Optional[int],
+        user_role: Optional[str]
+    ) -> int:
+        """get() through an AsyncSession"""
+        now = time.monotonic()
+        total = 0
+        for key in self._bucket_keys(user_id, user_role):
+            count = self._cached(org_id, key, now)
+            if count is None:
+                count = (await db.execute(self._count_stmt(org_id, key))).scalar() or 0
+                self._store(org_id, key, count, now)
+            total += count
+        return total
+
+    def record(self, alert: Alert, delta: int) -> None:
+        """Adjust every cached bucket the alert belongs to (+1 new unread, -1 no longer unread)"""
+        if alert.expires_at is not None:
+            expires_at = alert.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at <= datetime.now(timezone.utc):
+                return
+
+        with self._lock:
+            buckets = self._buckets.get(str(alert.org_id))
+            if not buckets:
+                return
+            for key, (count, expires) in list(buckets.items()):
+                if self._bucket_matches(key, alert):
+                    buckets[key] = (max(count + delta, 0), expires)
+
+    def invalidate(self, org_id: Optional[OrgId] = None) -> None:
+        """Drop cached counts for one org, or for all orgs"""
+        with self._lock:
+            if org_id is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(str(org_id), None)
+
+
+unread_counter = UnreadCounter(ttl_seconds=settings.ALERT_UNREAD_COUNT_TTL_SECONDS)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dispatch board full ORM job graphs (GET /jobs) vs slim board view (GET /jobs/board)
+
+Usage:
+    python scripts/bench_board_view.py --org-id 1 --from-date 2026-01-01 --to-date 2026-01-31
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy.orm import joinedload
+
+from app.core.database import SessionLocal
+from app.models import Job
+from app.api.v1.endpoints.jobs import (
+    JobResponse,
+    JobBoardPage,
+    _apply_job_filters,
+    _board_select,
+    _load_status_events,
+)
+
+
+def run_orm_path(db, args):
+    """Current path: full Job objects with eager-loaded relations and status events"""
+    query = db.query(Job).options(
+        joinedload(Job.status_events),
+        joinedload(Job.customer),
+        joinedload(Job.from_site),
+        joinedload(Job.to_site),
+        joinedload(Job.material),
+        joinedload(Job.driver),
+        joinedload(Job.truck)
+    ).filter(Job.org_id == args.org_id)
+    query = _apply_job_filters(query, None, args.from_date, args.to_date, None, None, None)
+    jobs = query.order_by(Job.scheduled_date, Job.id).limit(args.limit).all()
+    payload = "[" + ",".join(JobResponse.model_validate(job).model_dump_json() for job in jobs) + "]"
+    db.expunge_all()
+    return len(jobs), len(payload)
+
+
+def run_board_path(db, args, include_events):
+    """Board view: column projection, optional batched status events"""
+    stmt = _apply_job_filters(_board_select(args.org_id), None, args.from_date, args.to_date, None, None, None)
+    rows = [dict(row) for row in db.execute(stmt.order_by(Job.scheduled_date, Job.id).limit(args.limit)).mappings().all()]
+    if include_events:
+        events_by_job = _load_status_events(db, [row["id"] for row in rows])
+        for row in rows:
+            row["status_events"] = events_by_job[row["id"]]
+    payload = JobBoardPage(items=rows).model_dump_json()
+    return len(rows), len(payload)
+
+
+def measure(label, fn, repeat):
+    timings = []
+    result = (0, 0)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{label:<28} rows={result[0]:<6} payload={result[1] / 1024:>8.1f} KB  "
+        f"p50={statistics.median(timings):>8.1f} ms  max={max(timings):>8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--org-id", type=int, required=True)
+    parser.add_argument("--from-date", help="YYYY-MM-DD")
+    parser.add_argument("--to-date", help="YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("\n" + "=" * 60)
+        print("Dispatch board: ORM graph vs board view")
+        print("=" * 60 + "\n")
+        # Warm up connection pool and caches
+        run_board_path(db, args, False)
+
+        measure("ORM JobResponse", lambda: run_orm_path(db, args), args.repeat)
+        measure("board view", lambda: run_board_path(db, args, False), args.repeat)
+        measure("board view + events", lambda: run_board_path(db, args, True), args.repeat)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-document render time of the PDF generators
+
+Renders synthetic delivery notes, statements and subcontractor reports
+with realistic repetition (a handful of customers, sites and materials
+across many lines). No database needed.
+
+Usage:
+    python scripts/bench_pdf_render.py [--repeat 30] [--lines 200]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import time
+
+from app.services.pdf_generator import DeliveryNotePDF, StatementPDF, SubcontractorPaymentPDF, DailyJobsPDF
+
+CUSTOMERS = ["חברת בנייה אלון", "ש.ב. עבודות עפר", "קבוצת מגדלי הים"]
+SITES = ["מחצבת נשר", "אתר בנייה רמת גן", "מטמנת דודאים", "פרויקט מגדלי הצפון"]
+MATERIALS = ["חצץ", "חול מחצבה", "מצע סוג א", "עפר"]
+PLATES = ["12-345-67", "23-456-78", "34-567-89"]
+
+
+def delivery_note_data(i):
+    return {
+        "id": 1000 + i,
+        "status": "DELIVERED",
+        "customer_name": CUSTOMERS[i % len(CUSTOMERS)],
+        "customer_contact": "משה כהן",
+        "customer_phone": "050-1234567",
+        "from_site_name": SITES[i % len(SITES)],
+        "from_site_address": "אזור תעשייה",
+        "to_site_name": SITES[(i + 1) % len(SITES)],
+        "to_site_address": "רחוב הרצל 1",
+        "material_name": MATERIALS[i % len(MATERIALS)],
+        "planned_qty": 20,
+        "actual_qty": 19.5,
+        "unit": "TON",
+        "driver_name": "יוסי לוי",
+        "driver_phone": "052-7654321",
+        "truck_plate": PLATES[i % len(PLATES)],
+        "truck_model": "וולוו FH",
+        "notes": "לפרוק בכניסה הצפונית",
+    }
+
+
+def statement_data(lines):
+    return {
+        "number": "ST-2026-0001",
+        "issued_at": "01/10/2026",
+        "customer_name": CUSTOMERS[0],
+        "period": "09/2026",
+        "subtotal": "10000.00", "tax": "1800.00", "total": "11800.00", "balance": "11800.00",
+        "org_name": "הובלות הצפון",
+        "lines": [
+            {
+                "job_id": 5000 + i,
+                "truck_plate": PLATES[i % len(PLATES)],
+                "material_name": MATERIALS[i % len(MATERIALS)],
+                "qty": 20, "unit_price": 50, "total": 1000,
+            }
+            for i in range(lines)
+        ],
+    }
+
+
+def subcontractor_data(lines):
+    return {
+        "subcontractor_name": "קבלן משנה בע\"מ",
+        "subcontractor_phone": "054-0000000",
+        "subcontractor_plate": PLATES[0],
+        "period_from": "01/09/2026", "period_to": "30/09/2026", "generated_at": "01/10/2026",
+        "totals": {"total_jobs": lines, "total_quantity": lines * 20, "total_amount": lines * 1000},
+        "lines": [
+            {
+                "job_id": 5000 + i, "date": "01/09/2026", "price": 1000, "quantity": 20, "unit": "TON",
+                "material": MATERIALS[i % len(MATERIALS)],
+                "from_site": SITES[i % len(SITES)],
+                "to_site": SITES[(i + 1) % len(SITES)],
+                "customer": CUSTOMERS[i % len(CUSTOMERS)],
+            }
+            for i in range(lines)
+        ],
+    }
+
+
+def daily_jobs_data(lines):
+    return {
+        "date": "01/10/2026",
+        "lines": [
+            {
+                "job_id": 5000 + i, "customer": CUSTOMERS[i % len(CUSTOMERS)], "driver": "יוסי לוי",
+                "truck": PLATES[i % len(PLATES)], "from_site": SITES[i % len(SITES)],
+                "to_site": SITES[(i + 1) % len(SITES)], "material": MATERIALS[i % len(MATERIALS)],
+                "quantity": 20, "unit": "TON", "status": "DELIVERED",
+            }
+            for i in range(lines)
+        ],
+    }
+
+
+def measure(label, fn, repeat):
+    timings = []
+    size = 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        size = len(fn(i).getvalue())
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<32} p50={statistics.median(timings):>8.1f} ms  min={min(timings):>8.1f} ms  size={size / 1024:>6.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--lines", type=int, default=200)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print(f"PDF render time per document ({args.repeat} runs, {args.lines} lines)")
+    print("=" * 60 + "\n")
+
+    measure("delivery note", lambda i: DeliveryNotePDF().generate(delivery_note_data(i)), args.repeat)
+    statement = statement_data(args.lines)
+    measure("statement", lambda i: StatementPDF().generate(statement), args.repeat)
+    report = subcontractor_data(args.lines)
+    measure("subcontractor payment", lambda i: SubcontractorPaymentPDF().generate(report, {"org_name": "הובלות הצפון"}), args.repeat)
+    daily = daily_jobs_data(args.lines)
+    measure("daily jobs report", lambda i: DailyJobsPDF().generate(daily), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
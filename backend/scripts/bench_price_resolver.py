@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-quote price list lookup - SQL queries vs the in-memory PriceResolver
+
+Replays quotes for every (customer, material, unit, route) combination found
+in the org's price lists, plus general-customer fallbacks, through both
+paths and checks they pick the same price list.
+
+Usage:
+    python scripts/bench_price_resolver.py --org-id 1 [--repeat 5]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import nulls_last
+
+from app.core.database import SessionLocal
+from app.models import Customer, PriceList
+from app.services.price_resolver import price_resolver
+
+
+def sql_quote(db, org_id, customer_id, material_id, unit, from_site_id, to_site_id):
+    """The per-request lookup the quote endpoint used to run (NULL customers last)"""
+    now = datetime.now(timezone.utc)
+    query = db.query(PriceList).filter(
+        PriceList.org_id == org_id,
+        PriceList.material_id == material_id,
+        PriceList.unit == unit,
+        PriceList.valid_from <= now,
+        (PriceList.valid_to.is_(None)) | (PriceList.valid_to >= now),
+        (PriceList.customer_id == customer_id) | (PriceList.customer_id.is_(None)),
+    )
+    order = (nulls_last(PriceList.customer_id.desc()), PriceList.valid_from.desc())
+    price_list = None
+    if from_site_id and to_site_id:
+        price_list = query.filter(
+            PriceList.from_site_id == from_site_id,
+            PriceList.to_site_id == to_site_id,
+        ).order_by(*order).first()
+    if not price_list:
+        price_list = query.filter(
+            PriceList.from_site_id.is_(None),
+            PriceList.to_site_id.is_(None),
+        ).order_by(*order).first()
+    return price_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--org-id", type=int, required=True)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    price_lists = db.query(PriceList).filter(PriceList.org_id == args.org_id).all()
+    customer_ids = [c.id for c in db.query(Customer.id).filter(Customer.org_id == args.org_id).limit(20)]
+    quotes = set()
+    for pl in price_lists:
+        for customer_id in {pl.customer_id, *customer_ids[:3]} - {None}:
+            quotes.add((customer_id, pl.material_id, pl.unit.value, pl.from_site_id, pl.to_site_id))
+    quotes = sorted(quotes, key=str)
+    if not quotes:
+        print(f"No price lists for org {args.org_id}")
+        return
+
+    print("\n" + "=" * 60)
+    print(f"Price list lookup: {len(quotes)} quotes x {args.repeat}, {len(price_lists)} price lists")
+    print("=" * 60 + "\n")
+
+    mismatches = 0
+    for quote in quotes:
+        expected = sql_quote(db, args.org_id, *quote)
+        resolved = price_resolver.resolve_quote(db, args.org_id, *quote)
+        if (expected.id if expected else None) != (resolved.id if resolved else None):
+            mismatches += 1
+
+    sql_times, resolver_times = [], []
+    for _ in range(args.repeat):
+        for quote in quotes:
+            start = time.perf_counter()
+            sql_quote(db, args.org_id, *quote)
+            sql_times.append((time.perf_counter() - start) * 1e6)
+            start = time.perf_counter()
+            price_resolver.resolve_quote(db, args.org_id, *quote)
+            resolver_times.append((time.perf_counter() - start) * 1e6)
+
+    print(f"{'SQL queries':<20} p50={statistics.median(sql_times):>9.1f} us")
+    print(f"{'PriceResolver':<20} p50={statistics.median(resolver_times):>9.1f} us")
+    print(f"\nMismatches: {mismatches}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial pywebpush.webpush loop vs concurrent dispatch_push fan-out
+
+Starts a local stub push server (HTTP, configurable latency) that accepts
+every message with 201, except endpoints under /gone/ which answer 410 the
+way real push services do for expired subscriptions. No database and no
+real push service are needed.
+
+Usage:
+    python scripts/bench_push_fanout.py [--subs 300] [--latency-ms 80] [--gone 10] [--workers 16]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid
+from pywebpush import webpush, WebPushException
+
+from app.services.push_service import dispatch_push
+
+
+def make_stub_server(latency_ms):
+    class StubPushHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        connections = set()
+
+        def do_POST(self):
+            StubPushHandler.connections.add(self.client_address)
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency_ms / 1000)
+            status = 410 if self.path.startswith("/gone/") else 201
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPushHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, StubPushHandler
+
+
+def b64url(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def make_targets(base_url, count, gone):
+    targets = []
+    for i in range(count):
+        key = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+        )
+        path = "gone" if i < gone else "push"
+        targets.append({
+            "id": i,
+            "endpoint": f"{base_url}/{path}/{i}",
+            "p256dh": b64url(key),
+            "auth": b64url(os.urandom(16)),
+        })
+    return targets
+
+
+def run_serial(targets, data, private_key):
+    sent = 0
+    for target in targets:
+        try:
+            webpush(
+                subscription_info={
+                    "endpoint": target["endpoint"],
+                    "keys": {"p256dh": target["p256dh"], "auth": target["auth"]},
+                },
+                data=data,
+                vapid_private_key=private_key,
+                vapid_claims={"sub": "mailto:bench@example.invalid"},
+            )
+            sent += 1
+        except WebPushException:
+            pass
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subs", type=int, default=300)
+    parser.add_argument("--latency-ms", type=int, default=80)
+    parser.add_argument("--gone", type=int, default=10, help="How many subscriptions answer 410")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    server, handler = make_stub_server(args.latency_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    vapid = Vapid()
+    vapid.generate_keys()
+    private_key = b64url(vapid.private_key.private_numbers().private_value.to_bytes(32, "big"))
+
+    targets = make_targets(base_url, args.subs, args.gone)
+    data = json.dumps({"title": "TruckFlow", "body": "bench"}, ensure_ascii=False)
+
+    print("\n" + "=" * 60)
+    print(f"Web Push fan-out: {args.subs} subscriptions, {args.latency_ms} ms push-service latency")
+    print("=" * 60 + "\n")
+
+    handler.connections.clear()
+    start = time.perf_counter()
+    sent = run_serial(targets, data, private_key)
+    serial_s = time.perf_counter() - start
+    print(f"{'serial webpush()':<28} sent={sent:<5} time={serial_s:>7.2f} s  connections={len(handler.connections)}")
+
+    handler.connections.clear()
+    start = time.perf_counter()
+    result = dispatch_push(targets, data, vapid_private_key=private_key, max_workers=args.workers)
+    concurrent_s = time.perf_counter() - start
+    print(
+        f"{'dispatch_push()':<28} sent={len(result.sent):<5} time={concurrent_s:>7.2f} s  "
+        f"connections={len(handler.connections)}  pruned={len(result.gone)}  failed={len(result.failed)}"
+    )
+
+    print(f"\nSpeedup: {serial_s / concurrent_s:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: S3 storage throughput - sequential vs pooled / batched calls
+
+Runs against any S3-compatible endpoint: a local MinIO, or with --moto a
+moto server started as a subprocess (pip install "moto[server]"), so
+nothing real is touched. Measures:
+
+- small uploads: one after another (the old inline pattern) vs concurrent
+  through async_storage
+- a large streamed upload (StorageWriter): 1 part in flight vs
+  S3_TRANSFER_CONCURRENCY
+- deletes: delete_file() per key vs one delete_files() batch
+- existence checks: file_exists() per key vs files_exist()
+
+Numbers against moto are CPU-bound and only comparable with each other;
+run against MinIO for realistic absolute throughput.
+
+Usage:
+    python scripts/bench_storage.py --moto [--files 200] [--file-kb 256] [--large-mb 64]
+    S3_ENDPOINT=http://localhost:9000 python scripts/bench_storage.py [--bucket bench-storage]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import io
+import subprocess
+import time
+import urllib.request
+
+
+def start_moto(port):
+    # A separate process, so the server does not compete for this one's GIL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/moto-api/", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"moto server on port {port} did not start")
+
+
+def timed(label, func, total_bytes=None, ops=None):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    rate = ""
+    if total_bytes:
+        rate = f"{total_bytes / elapsed / 1024 / 1024:>8.1f} MB/s"
+    elif ops:
+        rate = f"{ops / elapsed:>8.0f} ops/s"
+    print(f"  {label:<44}{elapsed * 1000:>9.0f} ms {rate}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moto", action="store_true", help="Start a moto S3 server subprocess")
+    parser.add_argument("--moto-port", type=int, default=5055)
+    parser.add_argument("--bucket", default="bench-storage")
+    parser.add_argument("--files", type=int, default=200, help="Small files per run")
+    parser.add_argument("--file-kb", type=int, default=256)
+    parser.add_argument("--large-mb", type=int, default=64, help="Size of the streamed upload")
+    args = parser.parse_args()
+
+    server = None
+    if args.moto:
+        server = start_moto(args.moto_port)
+        os.environ["S3_ENDPOINT"] = f"http://127.0.0.1:{args.moto_port}"
+        os.environ.setdefault("S3_ACCESS_KEY", "bench")
+        os.environ.setdefault("S3_SECRET_KEY", "bench")
+    os.environ["USE_S3_STORAGE"] = "true"
+    os.environ["S3_BUCKET"] = args.bucket
+
+    from app.core.config import settings
+    from app.services.storage import async_storage, get_storage_service
+
+    storage = get_storage_service()
+    payload = os.urandom(args.file_kb * 1024)
+    small_bytes = args.files * len(payload)
+
+    print("\n" + "=" * 60)
+    print(f"Storage: {storage.endpoint} bucket {args.bucket}")
+    print(f"pool {settings.S3_MAX_POOL_CONNECTIONS} connections, {settings.STORAGE_IO_WORKERS} io workers, "
+          f"part {storage.part_size // (1024 * 1024)} MB x {storage.transfer_concurrency}")
+    print("=" * 60 + "\n")
+
+    try:
+        print(f"Upload {args.files} x {args.file_kb} KB")
+        sequential_keys = timed(
+            "sequential upload_file()",
+            lambda: [storage.upload_file(io.BytesIO(payload), "bench.bin", "bench/seq") for _ in range(args.files)],
+            total_bytes=small_bytes,
+        )
+
+        async def concurrent_uploads():
+            return await asyncio.gather(*(
+                async_storage.upload_file(io.BytesIO(payload), "bench.bin", "bench/async")
+                for _ in range(args.files)
+            ))
+
+        async_keys = timed("concurrent async_storage.upload_file()", lambda: asyncio.run(concurrent_uploads()),
+                           total_bytes=small_bytes)
+
+        print(f"\nStreamed upload of {args.large_mb} MB in 1 MB chunks")
+        chunk = os.urandom(1024 * 1024)
+        large_keys = []
+
+        def streamed(concurrency):
+            storage.transfer_concurrency = concurrency
+            writer = storage.open_writer("large.bin", "bench/large")
+            for _ in range(args.large_mb):
+                writer.write(chunk)
+            large_keys.append(writer.commit())
+
+        configured = settings.S3_TRANSFER_CONCURRENCY
+        timed("1 part in flight", lambda: streamed(1), total_bytes=args.large_mb * 1024 * 1024)
+        timed(f"{configured} parts in flight", lambda: streamed(configured), total_bytes=args.large_mb * 1024 * 1024)
+        storage.transfer_concurrency = configured
+
+        all_keys = sequential_keys + list(async_keys)
+        print(f"\nExists x {len(all_keys)}")
+        timed("file_exists() per key", lambda: [storage.file_exists(key) for key in all_keys], ops=len(all_keys))
+        found = timed("files_exist()", lambda: storage.files_exist(all_keys), ops=len(all_keys))
+        assert all(found.values())
+
+        print(f"\nDelete x {args.files} each")
+        timed("delete_file() per key", lambda: [storage.delete_file(key) for key in sequential_keys], ops=args.files)
+        timed("delete_files() batch", lambda: storage.delete_files(list(async_keys)), ops=args.files)
+        storage.delete_files(large_keys)
+        assert not any(storage.files_exist(all_keys).values())
+    finally:
+        async_storage.shutdown()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
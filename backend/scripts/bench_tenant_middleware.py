@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tenant middleware throughput - BaseHTTPMiddleware vs pure ASGI
+
+Serves a minimal endpoint that reads request.state.org_id behind each
+middleware and drives it in-process through httpx's ASGI transport, so
+the numbers isolate middleware + logging overhead from the database.
+
+Both variants log through the root logger to --log-file, as a deployment
+logging at INFO would. The legacy variant reproduces the previous
+function middleware (per-request INFO log, the ERROR-level debug line,
+public path list built per call) behind BaseHTTPMiddleware.
+
+Usage:
+    python scripts/bench_tenant_middleware.py [--requests 5000] [--concurrency 50] [--log-file /tmp/bench.log]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from jose import jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.middleware.access_log import access_log
+from app.middleware.tenant import TenantMiddleware, _error_response
+
+legacy_logger = logging.getLogger("app.middleware.tenant")
+
+
+async def legacy_tenant_middleware(request: Request, call_next):
+    """The previous tenant_middleware hot path (error branches trimmed)"""
+    legacy_logger.info(f"Tenant middleware processing: {request.method} {request.url.path}")
+    if request.method == "OPTIONS":
+        return await call_next(request)
+    public_paths = [
+        "/", "/health", "/api/health", "/docs", "/api/docs", "/openapi.json",
+        "/api/openapi.json", "/redoc", "/api/redoc", "/api/auth/login",
+        "/api/auth/driver-login", "/api/v1/auth/login", "/api/v1/auth/driver-login",
+        "/api/phone-auth/send-otp", "/api/phone-auth/verify-otp",
+        "/api/phone-auth/resend-otp", "/api/phone-auth/login-with-password",
+    ]
+    if request.url.path.startswith("/api/share/") or request.url.path.startswith("/share/"):
+        return await call_next(request)
+    if request.url.path.startswith("/uploads/") or request.url.path.startswith("/api/uploads/"):
+        return await call_next(request)
+    if request.url.path in public_paths or request.url.path.startswith("/static"):
+        return await call_next(request)
+
+    auth_header = request.headers.get("Authorization")
+    token = auth_header.split(" ")[1] if auth_header and auth_header.startswith("Bearer ") else None
+    if not token:
+        return _error_response(status_code=401, detail="Missing or invalid authorization header")
+    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    org_id_value = payload.get("org_id")
+    user_id = payload.get("sub")
+    legacy_logger.error(f"Debug: org_id_value = '{org_id_value}', type = {type(org_id_value)}")
+    org_id = int(org_id_value)
+    legacy_logger.info(f"Converted org_id to Integer: {org_id}")
+    request.state.org_id = org_id
+    request.state.user_id = int(user_id) if user_id else None
+    request.state.is_super_admin = payload.get("is_super_admin", False)
+    request.state.org_role = payload.get("org_role", "user")
+    legacy_logger.debug(f"Request authorized: user={user_id}, org={org_id}")
+    return await call_next(request)
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping(request: Request):
+        return {"org_id": request.state.org_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    if variant == "legacy":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_tenant_middleware)
+    else:
+        app.add_middleware(TenantMiddleware)
+    return app
+
+
+async def drive(app, path, headers, total, concurrency) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(50):
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await client.get(path, headers=headers)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--log-file", default=os.devnull)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, filename=args.log_file, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    access_log.start(logging.FileHandler(args.log_file))
+
+    token = jwt.encode({"sub": "1", "org_id": "1", "org_role": "owner"}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    authed = ("/api/ping", {"Authorization": f"Bearer {token}"})
+    public = ("/health", {})
+
+    print("\n" + "=" * 60)
+    print(f"Tenant middleware: {args.requests} requests, concurrency {args.concurrency}")
+    print("=" * 60 + "\n")
+
+    results = {}
+    for variant in ("legacy", "asgi"):
+        app = build_app(variant)
+        for label, (path, headers) in (("authenticated", authed), ("public", public)):
+            rps = asyncio.run(drive(app, path, headers, args.requests, args.concurrency))
+            results[(variant, label)] = rps
+
+    for label in ("authenticated", "public"):
+        legacy, asgi = results[("legacy", label)], results[("asgi", label)]
+        print(f"{label:<15} legacy {legacy:>8.0f} req/s   asgi {asgi:>8.0f} req/s   x{asgi / legacy:.2f}")
+
+    access_log.stop()
+    print(f"\nAccess log: {access_log.stats()}")
+
+
+if __name__ == "__main__":
+    main()
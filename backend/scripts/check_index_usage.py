@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Check that the hot multi-tenant query shapes use index scans
+
+Seeds a large synthetic dataset inside a transaction, runs ANALYZE and
+EXPLAIN on the dispatch board, statement and alert queries, and reports
+which index each one used. Everything is rolled back at the end, so it is
+safe to run against a dev database that already has real data.
+
+Usage:
+    python scripts/check_index_usage.py [--orgs 20] [--jobs-per-org 10000]
+
+Exit code is 1 if any query misses its index or seq-scans jobs/alerts.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, text
+
+from app.core.database import SessionLocal
+from app.models import Job, StatementLine
+from app.models.alert import Alert, AlertType
+from app.api.v1.endpoints.jobs import _apply_job_filters, _board_select
+
+
+SEED_SQL = [
+    # Organizations (slug/email carry a marker so they can't clash with real rows)
+    """
+    INSERT INTO organizations (name, slug, contact_email, plan_type, status)
+    SELECT 'idx-check ' || g, 'idx-check-' || g, 'idx-check-' || g || '@example.invalid', 'trial', 'active'
+    FROM generate_series(1, :orgs) g
+    """,
+    """
+    INSERT INTO customers (org_id, name, is_active)
+    SELECT o.id, 'customer ' || g, true
+    FROM organizations o, generate_series(1, 20) g
+    WHERE o.slug LIKE 'idx-check-%'
+    """,
+    """
+    INSERT INTO sites (org_id, name, is_active)
+    SELECT o.id, 'site ' || g, true
+    FROM organizations o, generate_series(1, 10) g
+    WHERE o.slug LIKE 'idx-check-%'
+    """,
+    """
+    INSERT INTO materials (org_id, name, billing_unit, is_active)
+    SELECT o.id, 'material', 'TON', true
+    FROM organizations o
+    WHERE o.slug LIKE 'idx-check-%'
+    """,
+    """
+    INSERT INTO jobs (org_id, customer_id, from_site_id, to_site_id, material_id,
+                      scheduled_date, planned_qty, unit, status, priority)
+    SELECT o.id,
+           (SELECT min(id) FROM customers c WHERE c.org_id = o.id) + (g % 20),
+           (SELECT min(id) FROM sites s WHERE s.org_id = o.id),
+           (SELECT min(id) FROM sites s WHERE s.org_id = o.id) + 1,
+           (SELECT min(id) FROM materials m WHERE m.org_id = o.id),
+           now() - interval '365 days' + (g * interval '1 hour') * (365 * 24.0 / :jobs_per_org),
+           10, 'TON',
+           (ARRAY['PLANNED','ASSIGNED','DELIVERED','DELIVERED','CLOSED','CANCELED'])[1 + g % 6]::jobstatus,
+           0
+    FROM organizations o, generate_series(1, :jobs_per_org) g
+    WHERE o.slug LIKE 'idx-check-%'
+    """,
+    """
+    INSERT INTO alerts (org_id, alert_type, severity, category, title, message,
+                        entity_type, entity_id, status, created_for_role, expires_at)
+    SELECT j.org_id, 'JOB_NOT_ASSIGNED', 'CRITICAL', 'OPERATIONAL', 't', 'm',
+           'job', j.id,
+           (ARRAY['UNREAD','READ','RESOLVED','DISMISSED'])[1 + j.id % 4],
+           'dispatcher',
+           j.scheduled_date + interval '2 hours'
+    FROM jobs j JOIN organizations o ON o.id = j.org_id
+    WHERE o.slug LIKE 'idx-check-%'
+    """,
+]
+
+
+def build_checks(db, org_id, customer_id, day):
+    """Query shapes taken from the endpoints and services, with the index (or indexes) each should use"""
+    day_str = day.strftime('%Y-%m-%d')
+    month_start = day.replace(day=1)
+    checks = []
+
+    # GET /jobs/board?date=...
+    stmt = _apply_job_filters(_board_select(org_id), day_str, None, None, None, None, None)
+    checks.append(("jobs per org per day", stmt.order_by(Job.scheduled_date, Job.id).limit(200),
+                   "ix_jobs_org_scheduled_id"))
+
+    # GET /jobs/board?status=PLANNED&from_date=...&to_date=...
+    stmt = _apply_job_filters(_board_select(org_id), None, month_start.strftime('%Y-%m-%d'), day_str, "PLANNED", None, None)
+    checks.append(("jobs per org by status", stmt, "ix_jobs_org_status_scheduled"))
+
+    # GET /jobs/board?customer_id=...&from_date=...
+    stmt = _apply_job_filters(_board_select(org_id), None, month_start.strftime('%Y-%m-%d'), day_str, None, customer_id, None)
+    checks.append(("jobs per org by customer", stmt, "ix_jobs_org_customer_scheduled"))
+
+    # POST /statements/generate - unbilled delivered jobs for a customer
+    already_billed = db.query(StatementLine.job_id).filter(StatementLine.job_id == Job.id)
+    query = db.query(Job).filter(
+        Job.org_id == org_id,
+        Job.customer_id == customer_id,
+        Job.status == "DELIVERED",
+        Job.scheduled_date >= month_start,
+        Job.scheduled_date <= day,
+        ~already_billed.exists(),
+    )
+    checks.append(("unbilled delivered jobs", query.statement, "ix_jobs_delivered_customer_scheduled"))
+
+    # alert_jobs dedup - open alert for an entity
+    query = db.query(Alert).filter(
+        Alert.org_id == org_id,
+        Alert.alert_type == AlertType.JOB_NOT_ASSIGNED.value,
+        Alert.entity_type == "job",
+        Alert.entity_id == 12345,
+        Alert.status.in_(["UNREAD", "READ"]),
+    )
+    checks.append(("open alerts per entity", query.statement, "ix_alerts_open_entity"))
+
+    # AlertService.get_unread_count for a dispatcher
+    query = db.query(Alert).filter(
+        Alert.org_id == org_id,
+        Alert.status == "UNREAD",
+        or_(
+            Alert.created_for_role == "dispatcher",
+            and_(Alert.created_for_user_id.is_(None), Alert.created_for_role.is_(None)),
+        ),
+    )
+    # The broadcast branch (no user, no role) can be served by either inbox index
+    checks.append(("unread count by role", query.statement, ("ix_alerts_org_role_status", "idx_alerts_org_user")))
+
+    # AlertService.cleanup_expired_alerts
+    query = db.query(Alert).filter(Alert.expires_at.isnot(None), Alert.expires_at < day - timedelta(days=300))
+    checks.append(("expired alerts", query.statement, "idx_alerts_expiry"))
+
+    return checks
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(db, stmt):
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    conn = db.connection()
+    result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params)
+    raw = result.scalar()
+    plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+    return list(plan_nodes(plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--jobs-per-org", type=int, default=10000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        print("\n" + "=" * 60)
+        print(f"Seeding {args.orgs} orgs x {args.jobs_per_org} jobs (rolled back at the end)")
+        print("=" * 60 + "\n")
+        for sql in SEED_SQL:
+            db.execute(text(sql), {"orgs": args.orgs, "jobs_per_org": args.jobs_per_org})
+        for table in ("organizations", "customers", "sites", "jobs", "alerts", "statement_lines"):
+            db.execute(text(f"ANALYZE {table}"))
+
+        org_id = db.execute(text("SELECT min(id) FROM organizations WHERE slug LIKE 'idx-check-%'")).scalar()
+        customer_id = db.execute(text("SELECT min(id) FROM customers WHERE org_id = :org_id"), {"org_id": org_id}).scalar()
+        day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+
+        for label, stmt, expected in build_checks(db, org_id, customer_id, day):
+            expected = (expected,) if isinstance(expected, str) else expected
+            nodes = explain(db, stmt)
+            seq_scans = [n.get("Relation Name") for n in nodes if n["Node Type"] == "Seq Scan"]
+            indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+            # Small lookup tables (customers, sites...) may be seq-scanned; the big ones may not
+            ok = bool(set(expected) & set(indexes)) and not ({"jobs", "alerts"} & set(seq_scans))
+            failures += 0 if ok else 1
+            status = "✅" if ok else "❌"
+            print(f"{status} {label:<28} expected={' | '.join(expected):<38} used={', '.join(indexes) or '-'}")
+            if seq_scans:
+                print(f"   seq scans on: {', '.join(seq_scans)}")
+    finally:
+        db.rollback()
+        db.close()
+
+    print(f"\n{'All queries use index scans' if not failures else f'{failures} queries did not use the expected index'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
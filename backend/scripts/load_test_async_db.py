@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Load test: hot driver endpoints on the sync vs the async (asyncpg) database path
+
+Starts the API twice with uvicorn - ASYNC_DB_ENABLED=false, then true - and
+runs the same load against each: concurrent simulated drivers polling their
+job list and alert badge, listing alerts, and posting status updates on
+their own jobs. Prints p50 / p99 latency per endpoint for both runs.
+
+Drivers are the org's drivers that have a user account; with fewer drivers
+than --concurrency, tokens are reused. Status updates re-post each job's
+current status with a marker note; those events are deleted afterwards.
+
+Usage:
+    python scripts/load_test_async_db.py --org-id 1 [--concurrency 50] [--duration 20] [--port 8790]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+
+import httpx
+
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.models import Driver, JobStatusEvent
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MARKER_NOTE = "load-test"
+REQUEST_TIMEOUT_SECONDS = 30
+
+
+def driver_tokens(org_id):
+    db = SessionLocal()
+    try:
+        user_ids = [row.user_id for row in db.query(Driver.user_id).filter(
+            Driver.org_id == org_id,
+            Driver.user_id.isnot(None),
+        )]
+    finally:
+        db.close()
+    return [
+        create_access_token({"sub": str(user_id), "org_id": str(org_id), "org_role": "driver"})
+        for user_id in user_ids
+    ]
+
+
+def start_server(port, async_db):
+    env = dict(os.environ, ASYNC_DB_ENABLED="true" if async_db else "false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+async def simulated_driver(client, token, deadline, latencies, errors, rng):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def timed(name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=headers, **kwargs)
+        except httpx.TimeoutException:
+            # A stalled request counts at the time it was given up on
+            response = None
+        latencies[name].append((time.perf_counter() - start) * 1000)
+        if response is None or response.status_code >= 400:
+            errors[name] += 1
+        return response
+
+    jobs = []
+    while time.monotonic() < deadline:
+        response = await timed("GET /jobs", "GET", "/api/jobs?limit=50")
+        if response is not None and response.status_code == 200:
+            jobs = response.json()
+        await timed("GET /alerts/unread-count", "GET", "/api/alerts/unread-count")
+        if rng.random() < 0.3:
+            await timed("GET /alerts", "GET", "/api/alerts?limit=20")
+        if jobs and rng.random() < 0.3:
+            job = rng.choice(jobs)
+            await timed(
+                "POST /jobs/{id}/status", "POST", f"/api/jobs/{job['id']}/status",
+                json={"status": job["status"], "note": MARKER_NOTE},
+            )
+        await asyncio.sleep(rng.random() * 0.05)
+
+
+async def run_load(port, tokens, concurrency, duration):
+    latencies, errors = defaultdict(list), defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=REQUEST_TIMEOUT_SECONDS) as client:
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(
+            simulated_driver(client, tokens[i % len(tokens)], deadline, latencies, errors, random.Random(i))
+            for i in range(concurrency)
+        ))
+    return latencies, errors
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def cleanup_events(org_id):
+    db = SessionLocal()
+    try:
+        deleted = db.query(JobStatusEvent).filter(
+            JobStatusEvent.org_id == org_id,
+            JobStatusEvent.note == MARKER_NOTE,
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--org-id", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, default=50, help="Simulated drivers")
+    parser.add_argument("--duration", type=int, default=20, help="Seconds per run")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+
+    tokens = driver_tokens(args.org_id)
+    if not tokens:
+        print(f"No drivers with user accounts in org {args.org_id}")
+        return
+
+    print("\n" + "=" * 60)
+    print(f"Driver load: {args.concurrency} drivers ({len(tokens)} accounts), {args.duration} s per run")
+    print("=" * 60 + "\n")
+
+    results = {}
+    for async_db in (False, True):
+        process = start_server(args.port, async_db)
+        try:
+            results[async_db] = asyncio.run(run_load(args.port, tokens, args.concurrency, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"{'endpoint':<28}{'sync p50':>10}{'p99':>9}{'async p50':>11}{'p99':>9}{'requests':>16}")
+    for name in sorted(results[False][0]):
+        sync_ms, async_ms = results[False][0][name], results[True][0].get(name, [0])
+        print(
+            f"{name:<28}{percentile(sync_ms, 50):>10.1f}{percentile(sync_ms, 99):>9.1f}"
+            f"{percentile(async_ms, 50):>11.1f}{percentile(async_ms, 99):>9.1f}"
+            f"{len(sync_ms):>8}/{len(async_ms):<7}"
+        )
+    for async_db, label in ((False, "sync"), (True, "async")):
+        latencies, errors = results[async_db]
+        total = sum(len(v) for v in latencies.values())
+        print(f"\n{label}: {total / args.duration:.0f} req/s, mean {statistics.mean(sum(latencies.values(), [])):.1f} ms, "
+              f"errors {dict(errors) or 0}")
+
+    print(f"\nRemoved {cleanup_events(args.org_id)} load-test status events")
+
+
+if __name__ == "__main__":
+    main()
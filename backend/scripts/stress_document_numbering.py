@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Stress test: parallel document number generators against document_counters
+
+Worker threads allocate numbers for one org in their own transactions:
+single numbers, pre-allocated blocks, and a share of transactions that
+roll back. Afterwards the committed numbers must be exactly 1..N - no
+duplicates and no gaps - and the counter must point at N + 1.
+
+Uses a throwaway document type so real ST/DN counters are untouched; the
+counter row is deleted at the end.
+
+Usage:
+    python scripts/stress_document_numbering.py --org-id 1 [--workers 16] [--txns 200] [--max-block 5] [--rollback-pct 10]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.database import SessionLocal
+from app.models import DocumentCounter
+from app.services.numbering_service import allocate_numbers
+
+DOC_TYPE = "STRESS"
+
+
+def worker(args, committed, lock, seed):
+    rng = random.Random(seed)
+    rolled_back = 0
+    for _ in range(args.txns):
+        db = SessionLocal()
+        try:
+            count = rng.randint(1, args.max_block)
+            numbers = allocate_numbers(db, args.org_id, DOC_TYPE, count)
+            # Hold the row a little, like a generator inserting its document
+            time.sleep(rng.random() / 1000)
+            if rng.randrange(100) < args.rollback_pct:
+                db.rollback()
+                rolled_back += 1
+                continue
+            db.commit()
+            with lock:
+                committed.extend(numbers)
+        finally:
+            db.close()
+    return rolled_back
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--org-id", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--txns", type=int, default=200, help="Transactions per worker")
+    parser.add_argument("--max-block", type=int, default=5, help="Largest block allocated at once")
+    parser.add_argument("--rollback-pct", type=int, default=10)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    db.query(DocumentCounter).filter(
+        DocumentCounter.org_id == args.org_id,
+        DocumentCounter.doc_type == DOC_TYPE,
+    ).delete()
+    db.commit()
+
+    print("\n" + "=" * 60)
+    print(f"Document numbering: {args.workers} workers x {args.txns} transactions, org {args.org_id}")
+    print("=" * 60 + "\n")
+
+    committed = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        rolled_back = sum(pool.map(lambda seed: worker(args, committed, lock, seed), range(args.workers)))
+    elapsed = time.perf_counter() - start
+
+    counter = db.query(DocumentCounter).filter(
+        DocumentCounter.org_id == args.org_id,
+        DocumentCounter.doc_type == DOC_TYPE,
+    ).first()
+    next_value = counter.next_value if counter else 1
+
+    total_txns = args.workers * args.txns
+    duplicates = len(committed) - len(set(committed))
+    expected = set(range(1, len(committed) + 1))
+    gaps = sorted(expected - set(committed))
+
+    print(f"transactions      {total_txns} ({rolled_back} rolled back) in {elapsed:.2f} s "
+          f"({total_txns / elapsed:.0f} txn/s)")
+    print(f"numbers committed {len(committed)}")
+    print(f"duplicates        {duplicates}")
+    print(f"gaps              {len(gaps)}{' e.g. ' + str(gaps[:5]) if gaps else ''}")
+    print(f"counter next      {next_value} (expected {len(committed) + 1})")
+
+    if counter:
+        db.delete(counter)
+    db.commit()
+    db.close()
+
+    ok = duplicates == 0 and not gaps and next_value == len(committed) + 1
+    print("\nOK" if ok else "\nFAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()